@@ -4,6 +4,8 @@ import sys
 import asyncio
 
 from process import start
+from src.utils.config import get_config
+from src.utils.log_setup import setup_logging
 
 import asyncio
 import platform
@@ -14,24 +16,17 @@ if platform.system() == "Windows":
 
 async def main():
     configuration()
-    await start()
+    try:
+        await start()
+    finally:
+        # Дожидаемся, пока очередь логов будет записана
+        await logger.complete()
+        logger.remove()
 
 
 def configuration():
     urllib3.disable_warnings()
-    logger.remove()
-    logger.add(
-        sys.stdout,
-        colorize=True,
-        format="<light-cyan>{time:HH:mm:ss}</light-cyan> | <level>{level: <8}</level> | <fg #ffffff>{name}:{line}</fg #ffffff> - <bold>{message}</bold>",
-    )
-    logger.add(
-        "logs/app.log",
-        rotation="10 MB",
-        retention="1 month",
-        format="{time:YYYY-MM-DD HH:mm:ss} | {level} | {name}:{line} - {message}",
-        level="INFO",
-    )
+    setup_logging(get_config())
 
 
 if __name__ == "__main__":
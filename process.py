@@ -1,130 +1,310 @@
 import asyncio
 import random
+from array import array
+from typing import FrozenSet
 
 from loguru import logger
 
 from src.model.disperse_from_one.instance import DisperseFromOneWallet
 from src.model.disperse_one_one.instance import DisperseOneOne
+from src.model.farm_faucet import FarmFaucetPipeline
 import src.utils
-from src.utils.logs import report_error, report_success
+from src.utils.logs import (
+    RESULT_WRITER,
+    JsonLinesResultSink,
+    TextFilesSink,
+    report_error,
+    report_success,
+)
 from src.utils.output import show_dev_info, show_logo
+from src.utils.metrics import dump_metrics, start_metrics_server
+from src.utils.context import current_account
+from src.utils.tracing import TRACER, sleep, span
+from src.utils.retry import RetryPolicy, reset_last_error, start_retry_budget
+from src.utils.circuit_breaker import configure_circuit_breakers
+from src.utils.client import CLIENT_POOL
+from src.utils.proxy_checker import PROXY_CHECKER
+from src.utils.account_store import ACCOUNT_STORE, FAUCET, MAIN
+from src.model.monad_xyz.token_pool import close_turnstile_pool, expect_faucet_accounts
+from src.model.help.captcha import log_captcha_traffic
+from src.model.help.stats import FleetStatsCollector
+from src.model.help.preflight import (
+    EMPTY,
+    AddressIndex,
+    FleetPreflight,
+    build_preflight_checks,
+    has_account_work,
+    prune_tasks,
+)
+from src.utils.email_parser import close_email_checkers
 import src.model
 from src.utils.statistics import print_wallets_stats
 
 
-async def start():
-    async def launch_wrapper(index, proxy, private_key, discord_token, email):
-        async with semaphore:
-            await account_flow(
-                index,
-                proxy,
-                private_key,
-                discord_token,
-                email,
-                config,
-                lock,
-            )
+# Порядок аккаунтов в лог выводится только для небольших запусков
+MAX_LOGGED_ORDER = 1000
+
 
+async def start():
     show_logo()
     show_dev_info()
     config = src.utils.get_config()
 
-    # Читаем все файлы
-    proxies = src.utils.read_txt_file("proxies", "data/proxies.txt")
-    if len(proxies) == 0:
-        logger.error("No proxies found in data/proxies.txt")
-        return
-    
-    if "disperse_farm_accounts" in config.FLOW.TASKS:
-        main_keys = src.utils.read_txt_file("private keys", "data/private_keys.txt")
-        farm_keys = src.utils.read_txt_file("private keys", "data/keys_for_faucet.txt")
-        disperse_one_one = DisperseOneOne(main_keys, farm_keys, proxies, config)
-        await disperse_one_one.disperse()
-        return
-    elif "disperse_from_one_wallet" in config.FLOW.TASKS:
-        main_keys = src.utils.read_txt_file("private keys", "data/private_keys.txt")
-        farm_keys = src.utils.read_txt_file("private keys", "data/keys_for_faucet.txt")
-        disperse_one_wallet = DisperseFromOneWallet(farm_keys[0], main_keys, proxies, config)
-        await disperse_one_wallet.disperse()
-        return
-
-
-    if "farm_faucet" in config.FLOW.TASKS:
-        private_keys = src.utils.read_txt_file("private keys", "data/keys_for_faucet.txt")
-    else:
-        private_keys = src.utils.read_txt_file("private keys", "data/private_keys.txt")
-
-    # Определяем диапазон аккаунтов
-    start_index = config.SETTINGS.ACCOUNTS_RANGE[0]
-    end_index = config.SETTINGS.ACCOUNTS_RANGE[1]
-
-    # Если оба 0, проверяем EXACT_ACCOUNTS_TO_USE
-    if start_index == 0 and end_index == 0:
-        if config.SETTINGS.EXACT_ACCOUNTS_TO_USE:
-            # Преобразуем номера аккаунтов в индексы (номер - 1)
-            selected_indices = [i - 1 for i in config.SETTINGS.EXACT_ACCOUNTS_TO_USE]
-            accounts_to_process = [private_keys[i] for i in selected_indices]
-            logger.info(
-                f"Using specific accounts: {config.SETTINGS.EXACT_ACCOUNTS_TO_USE}"
+    configure_circuit_breakers(
+        config.CIRCUIT_BREAKER.FAILURE_THRESHOLD,
+        config.CIRCUIT_BREAKER.RECOVERY_TIMEOUT,
+    )
+    CLIENT_POOL.configure(
+        config.CLIENT_POOL.MAX_CLIENTS, config.CLIENT_POOL.IDLE_TIMEOUT
+    )
+
+    result_sinks = []
+    if config.RESULTS.TEXT_FILES:
+        result_sinks.append(TextFilesSink())
+    if config.RESULTS.JSON_PATH:
+        result_sinks.append(JsonLinesResultSink(config.RESULTS.JSON_PATH))
+    if config.ACCOUNT_STORE.ENABLED:
+        ACCOUNT_STORE.open(config.ACCOUNT_STORE.PATH)
+        result_sinks.append(ACCOUNT_STORE)
+    RESULT_WRITER.configure(
+        result_sinks, config.RESULTS.FLUSH_INTERVAL, config.RESULTS.BATCH_SIZE
+    )
+
+    if config.TRACING.ENABLED:
+        TRACER.configure(config.TRACING.PATH)
+
+    metrics_server = None
+    if config.METRICS.ENABLED:
+        metrics_server = await start_metrics_server(
+            config.METRICS.HOST, config.METRICS.PORT
+        )
+
+    try:
+        # Читаем все файлы
+        proxies = src.utils.read_txt_file("proxies", "data/proxies.txt")
+        if len(proxies) == 0:
+            logger.error("No proxies found in data/proxies.txt")
+            return
+
+        PROXY_CHECKER.configure(proxies, config.PROXY_CHECK)
+        if config.PROXY_CHECK.ENABLED:
+            await PROXY_CHECKER.preflight()
+            PROXY_CHECKER.start()
+
+        if "disperse_farm_accounts" in config.FLOW.TASKS:
+            main_keys = src.utils.read_txt_file("private keys", "data/private_keys.txt")
+            farm_keys = src.utils.read_txt_file("private keys", "data/keys_for_faucet.txt")
+            disperse_one_one = DisperseOneOne(main_keys, farm_keys, proxies, config)
+            await disperse_one_one.disperse()
+            return
+        elif "disperse_from_one_wallet" in config.FLOW.TASKS:
+            main_keys = src.utils.read_txt_file("private keys", "data/private_keys.txt")
+            farm_keys = src.utils.read_txt_file("private keys", "data/keys_for_faucet.txt")
+            disperse_one_wallet = DisperseFromOneWallet(farm_keys[0], main_keys, proxies, config)
+            await disperse_one_wallet.disperse()
+            return
+
+
+        # Ключи не читаются в память целиком: по номеру строки через mmap
+        if "farm_faucet" in config.FLOW.TASKS:
+            private_keys = src.utils.LineIndex("private keys", "data/keys_for_faucet.txt")
+        else:
+            private_keys = src.utils.LineIndex("private keys", "data/private_keys.txt")
+
+        # Определяем диапазон аккаунтов
+        start_index = config.SETTINGS.ACCOUNTS_RANGE[0]
+        end_index = config.SETTINGS.ACCOUNTS_RANGE[1]
+
+        if config.ACCOUNT_STORE.ENABLED:
+            # Выборка аккаунтов - запрос к базе, а не срез списка
+            kind = FAUCET if "farm_faucet" in config.FLOW.TASKS else MAIN
+            await asyncio.to_thread(ACCOUNT_STORE.sync_keys, kind, private_keys)
+            account_numbers = ACCOUNT_STORE.select(
+                kind,
+                start_index,
+                end_index,
+                config.SETTINGS.EXACT_ACCOUNTS_TO_USE,
+                config.ACCOUNT_STORE.NOT_DONE_TASK,
+                config.ACCOUNT_STORE.NOT_DONE_HOURS,
+                config.ACCOUNT_STORE.SKIP_BALANCE_ABOVE,
+                config.ACCOUNT_STORE.SKIP_NONCE_ABOVE,
+                config.ACCOUNT_STORE.HISTORY_HOURS,
             )
+            if config.ACCOUNT_STORE.NOT_DONE_TASK:
+                logger.info(
+                    f"Selected {len(account_numbers)} accounts without successful "
+                    f"{config.ACCOUNT_STORE.NOT_DONE_TASK} in the last {config.ACCOUNT_STORE.NOT_DONE_HOURS} hours"
+                )
+            if config.ACCOUNT_STORE.SKIP_BALANCE_ABOVE or config.ACCOUNT_STORE.SKIP_NONCE_ABOVE:
+                logger.info(
+                    f"Selected {len(account_numbers)} accounts below "
+                    f"{config.ACCOUNT_STORE.SKIP_BALANCE_ABOVE} MON / {config.ACCOUNT_STORE.SKIP_NONCE_ABOVE} txs "
+                    f"in wallet history"
+                )
+            if not account_numbers:
+                logger.info("No accounts to process")
+                return
+            start_index = account_numbers[0]
+            end_index = account_numbers[-1]
+
+        # Если оба 0, проверяем EXACT_ACCOUNTS_TO_USE
+        elif start_index == 0 and end_index == 0:
+            if config.SETTINGS.EXACT_ACCOUNTS_TO_USE:
+                account_numbers = list(config.SETTINGS.EXACT_ACCOUNTS_TO_USE)
+                logger.info(
+                    f"Using specific accounts: {config.SETTINGS.EXACT_ACCOUNTS_TO_USE}"
+                )
 
-            # Для совместимости с остальным кодом
-            start_index = min(config.SETTINGS.EXACT_ACCOUNTS_TO_USE)
-            end_index = max(config.SETTINGS.EXACT_ACCOUNTS_TO_USE)
+                # Для совместимости с остальным кодом
+                start_index = min(config.SETTINGS.EXACT_ACCOUNTS_TO_USE)
+                end_index = max(config.SETTINGS.EXACT_ACCOUNTS_TO_USE)
+            else:
+                # Если список пустой, берем все аккаунты как раньше
+                start_index = 1
+                end_index = len(private_keys)
+                account_numbers = range(start_index, end_index + 1)
         else:
-            # Если список пустой, берем все аккаунты как раньше
-            accounts_to_process = private_keys
-            start_index = 1
-            end_index = len(private_keys)
-    else:
-        # Python slice не включает последний элемент, поэтому +1
-        accounts_to_process = private_keys[start_index - 1 : end_index]
-
-    
-    discord_tokens = [""] * len(accounts_to_process)
-    emails = [""] * len(accounts_to_process)
-
-    threads = config.SETTINGS.THREADS
-
-    # Подготавливаем прокси для выбранных аккаунтов
-    cycled_proxies = [
-        proxies[i % len(proxies)] for i in range(len(accounts_to_process))
-    ]
-
-    # Создаем список индексов и перемешиваем его
-    shuffled_indices = list(range(len(accounts_to_process)))
-    random.shuffle(shuffled_indices)
-
-    # Создаем строку с порядком аккаунтов
-    account_order = " ".join(str(start_index + idx) for idx in shuffled_indices)
-    logger.info(
-        f"Starting with accounts {start_index} to {end_index} in random order..."
-    )
-    logger.info(f"Accounts order: {account_order}")
-
-    lock = asyncio.Lock()
-    semaphore = asyncio.Semaphore(value=threads)
-    tasks = []
-
-    # Используем перемешанные индексы для создания задач
-    for shuffled_idx in shuffled_indices:
-        tasks.append(
-            asyncio.create_task(
-                launch_wrapper(
-                    start_index + shuffled_idx,
-                    cycled_proxies[shuffled_idx],
-                    accounts_to_process[shuffled_idx],
-                    discord_tokens[shuffled_idx],
-                    emails[shuffled_idx],
+            # Номера за концом файла отбрасываем, как это делал срез списка
+            account_numbers = range(start_index, min(end_index, len(private_keys)) + 1)
+
+        threads = config.SETTINGS.THREADS
+
+        if "farm_faucet" in config.FLOW.TASKS:
+            # Отдельный конвейер без пауз и семафора аккаунтов
+            pipeline = FarmFaucetPipeline(config)
+            await pipeline.run(private_keys, proxies, account_numbers)
+            return
+
+        def selected_accounts():
+            for account_number in account_numbers:
+                yield account_number, private_keys[account_number - 1]
+
+        collect_stats = task_exists_in_config("logs", config.FLOW.TASKS)
+        stats_collector = FleetStatsCollector(config) if collect_stats else None
+
+        if config.FLOW.TASKS == ["logs"]:
+            # Только статистика: аккаунты не запускаем, сразу собираем батчами
+            stats = await stats_collector.collect(selected_accounts())
+            print_wallets_stats(stats, stats_collector.export_path)
+            stats_collector.log_history_change()
+            return
+
+        done_tasks = {}
+        addresses = None
+        preflight_checks = build_preflight_checks(config)
+        if config.PREFLIGHT.ENABLED and preflight_checks:
+            addresses = AddressIndex(len(account_numbers))
+            done_tasks = await FleetPreflight(config, preflight_checks).sweep(
+                selected_accounts(), addresses
+            )
+
+        # Аккаунты, у которых после preflight не осталось задач, не запускаем.
+        # Наборы выполненных задач повторяются, поэтому проверка кэшируется
+        has_work = {}
+        for done in set(done_tasks.values()):
+            has_work[done] = has_account_work(prune_tasks(config.FLOW.TASKS, done))
+
+        # Перемешиваем позиции, а не сами аккаунты: 4 байта на аккаунт
+        shuffled_positions = array(
+            "I",
+            (
+                position
+                for position in range(len(account_numbers))
+                if has_work.get(done_tasks.get(account_numbers[position], EMPTY), True)
+            ),
+        )
+        if len(shuffled_positions) < len(account_numbers):
+            logger.info(
+                f"Skipping {len(account_numbers) - len(shuffled_positions)} accounts "
+                f"with all tasks already done"
+            )
+        random.shuffle(shuffled_positions)
+
+        if config.FAUCET.MONAD_XYZ:
+            # Пул капчи крана не решает токены сверх числа аккаунтов, которым
+            # кран еще предстоит. Кран в группе [a, b] может и не выпасть,
+            # такие аккаунты получают токен по запросу
+            goes_to_faucet = {}
+            for done in set(done_tasks.values()) | {EMPTY}:
+                goes_to_faucet[done] = any(
+                    not isinstance(task, list) and task.lower() == "faucet"
+                    for task in prune_tasks(config.FLOW.TASKS, done)
+                )
+            expect_faucet_accounts(
+                sum(
+                    goes_to_faucet[done_tasks.get(account_numbers[position], EMPTY)]
+                    for position in shuffled_positions
                 )
             )
+
+        logger.info(
+            f"Starting with accounts {start_index} to {end_index} in random order..."
         )
+        if len(shuffled_positions) <= MAX_LOGGED_ORDER:
+            account_order = " ".join(
+                str(account_numbers[position]) for position in shuffled_positions
+            )
+            logger.info(f"Accounts order: {account_order}")
 
-    await asyncio.gather(*tasks)
+        stats_task = None
+        if collect_stats and config.STATS.INTERVAL > 0:
+            stats_task = asyncio.create_task(
+                stats_collector.run_periodically(selected_accounts, config.STATS.INTERVAL)
+            )
+
+        lock = asyncio.Lock()
+
+        async def worker(positions):
+            # Аккаунт берется из общего итератора только когда воркер свободен
+            for position in positions:
+                account_number = account_numbers[position]
+                await account_flow(
+                    account_number,
+                    # Прокси по кругу для выбранных аккаунтов
+                    proxies[position % len(proxies)],
+                    private_keys[account_number - 1],
+                    "",
+                    "",
+                    config,
+                    lock,
+                    done_tasks.get(account_number, EMPTY),
+                    addresses.get(position) if addresses else "",
+                )
 
-    logger.success("Saved accounts and private keys to a file.")
-    
-    print_wallets_stats(config)
+        positions = iter(shuffled_positions)
+        try:
+            await asyncio.gather(
+                *(worker(positions) for _ in range(min(threads, len(shuffled_positions))))
+            )
+        finally:
+            if stats_task is not None:
+                stats_task.cancel()
+                # Дожидаемся закрытия файла экспорта перед финальным сбором
+                await asyncio.gather(stats_task, return_exceptions=True)
+
+        stats = None
+        if collect_stats:
+            stats = await stats_collector.collect(selected_accounts())
+
+        logger.success("Saved accounts and private keys to a file.")
+
+        print_wallets_stats(stats, stats_collector.export_path if stats_collector else "")
+        if stats_collector:
+            stats_collector.log_history_change()
+    finally:
+        await RESULT_WRITER.close()
+        log_captcha_traffic()
+        PROXY_CHECKER.log_report()
+        await PROXY_CHECKER.close()
+        if config.METRICS.ENABLED:
+            dump_metrics(config.METRICS.DUMP_PATH)
+        if metrics_server:
+            metrics_server.close()
+        await close_turnstile_pool()
+        await close_email_checkers()
+        CLIENT_POOL.close()
+        ACCOUNT_STORE.close()
+        TRACER.close()
 
 
 async def account_flow(
@@ -135,48 +315,79 @@ async def account_flow(
     email: str,
     config: src.utils.config.Config,
     lock: asyncio.Lock,
+    done_tasks: FrozenSet[str] = frozenset(),
+    address: str = "",
 ):
-    try:
-        pause = random.randint(
-            config.SETTINGS.RANDOM_INITIALIZATION_PAUSE[0],
-            config.SETTINGS.RANDOM_INITIALIZATION_PAUSE[1],
-        )
-        logger.info(f"[{account_index}] Sleeping for {pause} seconds before start...")
-        await asyncio.sleep(pause)
+    current_account.set(account_index)
+    start_retry_budget(config.RETRY.BUDGET_PER_ACCOUNT)
+    if config.PROXY_CHECK.ENABLED:
+        # Прокси выбирается в момент старта аккаунта по текущему состоянию
+        proxy = PROXY_CHECKER.assign(account_index)
+    with span("account_flow", "account", account=account_index):
+        try:
+            pause = random.randint(
+                config.SETTINGS.RANDOM_INITIALIZATION_PAUSE[0],
+                config.SETTINGS.RANDOM_INITIALIZATION_PAUSE[1],
+            )
+            logger.info(f"[{account_index}] Sleeping for {pause} seconds before start...")
+            await sleep(pause, "initialization_pause")
 
-        report = False
+            report = False
 
-        instance = src.model.Start(
-            account_index, proxy, private_key, discord_token, email, config
-        )
+            instance = src.model.Start(
+                account_index, proxy, private_key, discord_token, email, config, done_tasks, address
+            )
 
-        result = await wrapper(instance.initialize, config)
-        if not result:
-            report = True
+            result = await wrapper(instance.initialize, config)
+            if not result:
+                report = True
+
+            async def switch_proxy():
+                """Переводит аккаунт на другой прокси, если его прокси в карантине"""
+                if not config.PROXY_CHECK.ENABLED or PROXY_CHECKER.is_healthy(instance.proxy):
+                    return
+                old_proxy = instance.proxy
+                instance.proxy = PROXY_CHECKER.reassign(account_index)
+                CLIENT_POOL.release(account_index)
+                instance.session = await CLIENT_POOL.acquire(
+                    instance.proxy, scope=account_index
+                )
+                logger.warning(
+                    f"[{account_index}] Proxy {old_proxy.rsplit('@', 1)[-1]} is quarantined, "
+                    f"switched to {instance.proxy.rsplit('@', 1)[-1]}"
+                )
 
-        result = await wrapper(instance.flow, config)
-        if not result:
-            report = True
+            await switch_proxy()
+            result = await wrapper(instance.flow, config, on_retry=switch_proxy)
+            if not result:
+                report = True
 
-        if report:
-            await report_error(lock, private_key, proxy, discord_token)
-        else:
-            await report_success(lock, private_key, proxy, discord_token)
+            if report:
+                await report_error(lock, private_key, instance.proxy, discord_token)
+            else:
+                await report_success(lock, private_key, instance.proxy, discord_token)
 
-        pause = random.randint(
-            config.SETTINGS.RANDOM_PAUSE_BETWEEN_ACCOUNTS[0],
-            config.SETTINGS.RANDOM_PAUSE_BETWEEN_ACCOUNTS[1],
-        )
-        logger.info(f"Sleeping for {pause} seconds before next account...")
-        await asyncio.sleep(pause)
+            pause = random.randint(
+                config.SETTINGS.RANDOM_PAUSE_BETWEEN_ACCOUNTS[0],
+                config.SETTINGS.RANDOM_PAUSE_BETWEEN_ACCOUNTS[1],
+            )
+            logger.info(f"Sleeping for {pause} seconds before next account...")
+            await sleep(pause, "pause_between_accounts")
 
-    except Exception as err:
-        logger.error(f"{account_index} | Account flow failed: {err}")
+        except Exception as err:
+            logger.error(f"{account_index} | Account flow failed: {err}")
+        finally:
+            CLIENT_POOL.release(account_index)
+            if config.PROXY_CHECK.ENABLED:
+                PROXY_CHECKER.release(account_index)
 
 
-async def wrapper(function, config: src.utils.config.Config, *args, **kwargs):
-    attempts = config.SETTINGS.ATTEMPTS
-    for attempt in range(attempts):
+async def wrapper(
+    function, config: src.utils.config.Config, *args, on_retry=None, **kwargs
+):
+    policy = RetryPolicy(config)
+    for attempt in range(policy.attempts):
+        reset_last_error()
         result = await function(*args, **kwargs)
         if isinstance(result, tuple) and result and isinstance(result[0], bool):
             if result[0]:
@@ -185,15 +396,11 @@ async def wrapper(function, config: src.utils.config.Config, *args, **kwargs):
             if result:
                 return True
 
-        if attempt < attempts - 1:  # Don't sleep after the last attempt
-            pause = random.randint(
-                config.SETTINGS.PAUSE_BETWEEN_ATTEMPTS[0],
-                config.SETTINGS.PAUSE_BETWEEN_ATTEMPTS[1],
-            )
-            logger.info(
-                f"Sleeping for {pause} seconds before next attempt {attempt+1}/{config.SETTINGS.ATTEMPTS}..."
-            )
-            await asyncio.sleep(pause)
+        # Причину неудачи функция сохраняет через note_error
+        if not await policy.should_retry(None, attempt, function.__name__):
+            break
+        if on_retry is not None:
+            await on_retry()
 
     return result
 
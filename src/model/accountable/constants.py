@@ -1,3 +1,5 @@
+ACCOUNTABLE_NFT_ADDRESS = "0xfa67a16ccC5d2C3d80e5DaF692DDfbb53F8D7Cfd"
+
 ACCOUNTABLE_ABI = [
     {
         "inputs": [
@@ -9,8 +9,10 @@ from web3.contract import Contract
 from src.utils.constants import EXPLORER_URL, RPC_URL
 from src.utils.client import create_client
 from src.utils.config import Config
+from src.utils.provider import create_web3
+from src.utils.retry import RetryPolicy
 from loguru import logger
-from src.model.accountable.constants import ACCOUNTABLE_ABI
+from src.model.accountable.constants import ACCOUNTABLE_ABI, ACCOUNTABLE_NFT_ADDRESS
 
 
 class Accountable:
@@ -26,12 +28,13 @@ class Accountable:
         self.proxy = proxy
         self.private_key = private_key
         self.config = config
+        self.retry_policy = RetryPolicy(config)
         self.session = session
 
         self.account: Account = Account.from_key(private_key=private_key)
-        self.web3 = AsyncWeb3(AsyncWeb3.AsyncHTTPProvider(RPC_URL))
+        self.web3 = create_web3(RPC_URL)
 
-        self.nft_contract_address = "0xfa67a16ccC5d2C3d80e5DaF692DDfbb53F8D7Cfd"
+        self.nft_contract_address = ACCOUNTABLE_NFT_ADDRESS
         self.nft_contract = self.web3.eth.contract(
             address=self.nft_contract_address,
             abi=ACCOUNTABLE_ABI
@@ -178,11 +181,8 @@ class Accountable:
                     logger.error(f"[{self.account_index}] Insufficient funds to cover gas costs")
                     return False
                 
-                random_pause = random.randint(
-                    self.config.SETTINGS.RANDOM_PAUSE_BETWEEN_ACTIONS[0],
-                    self.config.SETTINGS.RANDOM_PAUSE_BETWEEN_ACTIONS[1]
-                )
-                logger.error(f"[{self.account_index}] Error minting NFT: {str(e)}. Sleeping for {random_pause} seconds")
-                await asyncio.sleep(random_pause)
+                logger.error(f"[{self.account_index}] Error minting NFT: {str(e)}")
+                if not await self.retry_policy.should_retry(e, retry, "accountable"):
+                    break
 
         return False
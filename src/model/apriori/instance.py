@@ -1,4 +1,3 @@
-import asyncio
 from decimal import Decimal
 import random
 from eth_account import Account
@@ -9,6 +8,8 @@ from typing import Dict
 
 from src.utils.config import Config
 from src.utils.constants import EXPLORER_URL, RPC_URL
+from src.utils.provider import create_web3
+from src.utils.retry import RetryPolicy
 from .constants import STAKE_ABI, STAKE_ADDRESS
 
 
@@ -25,10 +26,11 @@ class Apriori:
         self.proxy = proxy
         self.private_key = private_key
         self.config = config
+        self.retry_policy = RetryPolicy(config)
         self.session = session
 
         self.account: Account = Account.from_key(private_key=private_key)
-        self.web3 = AsyncWeb3(AsyncWeb3.AsyncHTTPProvider(RPC_URL))
+        self.web3 = create_web3(RPC_URL)
 
     async def get_gas_params(self) -> Dict[str, int]:
         """Get current gas parameters from the network."""
@@ -89,7 +91,7 @@ class Apriori:
 
                 # Оцениваем газ
                 estimated_gas = await self.estimate_gas(transaction)
-                logger.info(f"[{self.account_index}] Estimated gas: {estimated_gas}")
+                logger.debug("[{}] Estimated gas: {}", self.account_index, estimated_gas)
 
                 # Добавляем остальные параметры транзакции
                 transaction.update(
@@ -111,8 +113,8 @@ class Apriori:
                 )
 
                 # Ждем подтверждения транзакции
-                logger.info(
-                    f"[{self.account_index}] Waiting for transaction confirmation..."
+                logger.debug(
+                    "[{}] Waiting for transaction confirmation...", self.account_index
                 )
                 await self.web3.eth.wait_for_transaction_receipt(tx_hash)
 
@@ -122,14 +124,11 @@ class Apriori:
                 return True
 
             except Exception as e:
-                random_pause = random.randint(
-                    self.config.SETTINGS.PAUSE_BETWEEN_ATTEMPTS[0],
-                    self.config.SETTINGS.PAUSE_BETWEEN_ATTEMPTS[1],
-                )
                 logger.error(
-                    f"[{self.account_index}] | Error in stake_mon on Apriori: {e}. Sleeping for {random_pause} seconds"
+                    f"[{self.account_index}] | Error in stake_mon on Apriori: {e}"
                 )
-                await asyncio.sleep(random_pause)
+                if not await self.retry_policy.should_retry(e, retry, "apriori"):
+                    break
         return False
 
     async def get_token_balance(self, token_symbol: str) -> Decimal:
@@ -6,8 +6,11 @@ from eth_account.messages import encode_defunct
 from loguru import logger
 from primp import AsyncClient
 from web3 import AsyncWeb3, Web3
+from src.utils.circuit_breaker import get_breaker
 from src.utils.config import Config
 from src.utils.constants import RPC_URL, EXPLORER_URL
+from src.utils.provider import create_web3
+from src.utils.retry import RetryPolicy
 from .constants import (
     FAUCET_ADDRESS,
     FAUCET_ABI,
@@ -32,13 +35,20 @@ class Bima:
         self.proxy = proxy
         self.private_key = private_key
         self.config = config
+        self.retry_policy = RetryPolicy(config)
         self.session = session
 
         self.account: Account = Account.from_key(private_key=private_key)
-        self.web3 = AsyncWeb3(AsyncWeb3.AsyncHTTPProvider(RPC_URL))
+        self.web3 = create_web3(RPC_URL)
 
     async def login(self):
+        breaker = get_breaker("Bima API")
         for retry in range(self.config.SETTINGS.ATTEMPTS):
+            if not breaker.allow():
+                logger.warning(
+                    f"[{self.account_index}] Bima API is unavailable for all accounts, retry in {breaker.retry_in:.0f}s. Skipping login."
+                )
+                return False
             try:
                 message_to_sign, timestamp = await self._get_nonce()
 
@@ -75,22 +85,21 @@ class Bima:
                     json=json_data,
                 )
 
+                if response.status_code >= 500:
+                    breaker.record_failure()
                 if response.status_code != 200:
                     raise Exception(f"Status code: {response.status_code}")
 
+                breaker.record_success()
                 logger.success(f"[{self.account_index}] Successfully logged in to Bima")
                 return True
 
             except Exception as e:
-                random_pause = random.uniform(
-                    self.config.SETTINGS.RANDOM_PAUSE_BETWEEN_ACTIONS[0],
-                    self.config.SETTINGS.RANDOM_PAUSE_BETWEEN_ACTIONS[1],
-                )
                 logger.error(
-                    f"[{self.account_index}] Error in login Bima: {e}. Sleeping for {random_pause} seconds"
+                    f"[{self.account_index}] Error in login Bima: {e}"
                 )
-                await asyncio.sleep(random_pause)
-                continue
+                if not await self.retry_policy.should_retry(e, retry, "bima"):
+                    break
         return False
 
     async def lend(self):
@@ -168,7 +177,7 @@ class Bima:
 
                 # Оцениваем газ
                 estimated_gas = await self._estimate_gas(transaction)
-                logger.info(f"[{self.account_index}] Estimated gas: {estimated_gas}")
+                logger.debug("[{}] Estimated gas: {}", self.account_index, estimated_gas)
 
                 # Добавляем остальные параметры транзакции
                 transaction.update(
@@ -201,15 +210,11 @@ class Bima:
                 return True
 
             except Exception as e:
-                random_pause = random.uniform(
-                    self.config.SETTINGS.RANDOM_PAUSE_BETWEEN_ACTIONS[0],
-                    self.config.SETTINGS.RANDOM_PAUSE_BETWEEN_ACTIONS[1],
-                )
                 logger.error(
-                    f"[{self.account_index}] Error in lend Bima: {e}. Sleeping for {random_pause} seconds"
+                    f"[{self.account_index}] Error in lend Bima: {e}"
                 )
-                await asyncio.sleep(random_pause)
-                continue
+                if not await self.retry_policy.should_retry(e, retry, "bima"):
+                    break
 
         return False
 
@@ -230,7 +235,7 @@ class Bima:
         }
 
         estimated_gas = await self._estimate_gas(transaction)
-        logger.info(f"[{self.account_index}] Estimated gas: {estimated_gas}")
+        logger.debug("[{}] Estimated gas: {}", self.account_index, estimated_gas)
 
         transaction.update(
             {
@@ -284,7 +289,7 @@ class Bima:
 
                 # Оцениваем газ
                 estimated_gas = await self._estimate_gas(transaction)
-                logger.info(f"[{self.account_index}] Estimated gas: {estimated_gas}")
+                logger.debug("[{}] Estimated gas: {}", self.account_index, estimated_gas)
 
                 # Добавляем остальные параметры транзакции
                 transaction.update(
@@ -306,8 +311,8 @@ class Bima:
                 )
 
                 # Ждем подтверждения транзакции
-                logger.info(
-                    f"[{self.account_index}] Waiting for transaction confirmation..."
+                logger.debug(
+                    "[{}] Waiting for transaction confirmation...", self.account_index
                 )
                 await self.web3.eth.wait_for_transaction_receipt(tx_hash)
 
@@ -317,19 +322,18 @@ class Bima:
                 return True
 
             except Exception as e:
-                random_pause = random.uniform(
-                    self.config.SETTINGS.RANDOM_PAUSE_BETWEEN_ACTIONS[0],
-                    self.config.SETTINGS.RANDOM_PAUSE_BETWEEN_ACTIONS[1],
-                )
                 logger.error(
-                    f"[{self.account_index}] Error in get_faucet_tokens Bima: {e}. Sleeping for {random_pause} seconds"
+                    f"[{self.account_index}] Error in get_faucet_tokens Bima: {e}"
                 )
-                await asyncio.sleep(random_pause)
-                continue
+                if not await self.retry_policy.should_retry(e, retry, "bima"):
+                    break
         return False
 
     async def _get_nonce(self):
+        breaker = get_breaker("Bima API")
         for retry in range(self.config.SETTINGS.ATTEMPTS):
+            if breaker.is_open:
+                return "", ""
             try:
                 headers = {
                     "Accept": "application/json, text/plain, */*",
@@ -352,6 +356,8 @@ class Bima:
                     headers=headers,
                 )
 
+                if response.status_code >= 500:
+                    breaker.record_failure()
                 if response.status_code != 200:
                     raise Exception(f"Status code: {response.status_code}")
 
@@ -359,15 +365,11 @@ class Bima:
                 return data["data"]["tip_info"], data["data"]["timestamp"]
 
             except Exception as e:
-                random_pause = random.uniform(
-                    self.config.SETTINGS.RANDOM_PAUSE_BETWEEN_ACTIONS[0],
-                    self.config.SETTINGS.RANDOM_PAUSE_BETWEEN_ACTIONS[1],
-                )
                 logger.error(
-                    f"[{self.account_index}] Error in _get_nonce Bima: {e}. Sleeping for {random_pause} seconds"
+                    f"[{self.account_index}] Error in _get_nonce Bima: {e}"
                 )
-                await asyncio.sleep(random_pause)
-                continue
+                if not await self.retry_policy.should_retry(e, retry, "bima"):
+                    break
         return "", ""
 
     async def _get_gas_params(self) -> Dict[str, int]:
@@ -1,4 +1,3 @@
-import asyncio
 import random
 from eth_account import Account
 from primp import AsyncClient
@@ -7,8 +6,12 @@ from web3.contract import Contract
 
 from src.utils.constants import EXPLORER_URL, RPC_URL
 from src.utils.config import Config
+from src.utils.provider import create_web3
+from src.utils.retry import RetryPolicy
 from loguru import logger
 
+DEMASK_CONTRACT = "0x2CDd146Aa75FFA605ff7c5Cc5f62D3B52C140f9c"  # Updated contract address for DeMask
+
 # Обновляем ABI для контракта NFT с дополнительными методами
 ERC1155_ABI = [
     {
@@ -58,12 +61,13 @@ class Demask:
         self.proxy = proxy
         self.private_key = private_key
         self.config = config
+        self.retry_policy = RetryPolicy(config)
         self.session = session
 
         self.account: Account = Account.from_key(private_key=private_key)
-        self.web3 = AsyncWeb3(AsyncWeb3.AsyncHTTPProvider(RPC_URL))
+        self.web3 = create_web3(RPC_URL)
 
-        self.nft_contract_address = "0x2CDd146Aa75FFA605ff7c5Cc5f62D3B52C140f9c"  # Updated contract address for DeMask
+        self.nft_contract_address = DEMASK_CONTRACT
         self.nft_contract: Contract = self.web3.eth.contract(
             address=self.nft_contract_address, abi=ERC1155_ABI
         )
@@ -207,13 +211,10 @@ class Demask:
                     return False
 
             except Exception as e:
-                random_pause = random.randint(
-                    self.config.SETTINGS.RANDOM_PAUSE_BETWEEN_ACTIONS[0],
-                    self.config.SETTINGS.RANDOM_PAUSE_BETWEEN_ACTIONS[1],
-                )
                 logger.error(
-                    f"[{self.account_index}] Error in mint on DeMask: {e}. Sleeping for {random_pause} seconds"
+                    f"[{self.account_index}] Error in mint on DeMask: {e}"
                 )
-                await asyncio.sleep(random_pause)
+                if not await self.retry_policy.should_retry(e, retry, "demask"):
+                    break
 
         return False
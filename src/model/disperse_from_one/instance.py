@@ -1,12 +1,45 @@
 import asyncio
+from dataclasses import dataclass
 from loguru import logger
-from web3 import AsyncHTTPProvider, AsyncWeb3
-from typing import List
+from web3 import AsyncWeb3
+from typing import Dict, List, Optional
 import random
+import time
 
 from src.utils.config import Config
-from src.utils.constants import RPC_URL
-from .utils import get_monad_balance, WalletInfo
+from src.utils.constants import EXPLORER_URL, RPC_URL
+from src.utils.provider import create_web3, record_receipt
+from .multisend import ensure_multisend, pack_recipients
+from .utils import get_balances_batched, get_monad_balance, get_receipts_batched, WalletInfo
+
+
+# Перевод на EOA всегда стоит 21000 газа, estimate_gas не нужен
+TRANSFER_GAS = 21000
+# Ответы ноды, после которых транзакция все равно в мемпуле
+ALREADY_SENT_ERRORS = ("already known", "nonce too low", "known transaction")
+# Пауза между опросами подтверждений отправленных переводов, секунды
+RECEIPT_POLL_INTERVAL = 1.0
+
+
+@dataclass
+class PlannedTransfer:
+    address: str
+    amount_wei: int
+    nonce: Optional[int] = None
+    raw: Optional[bytes] = None
+    tx_hash: Optional[bytes] = None
+    status: Optional[int] = None
+    # Для транзакции multisend: адрес контракта, calldata и число получателей
+    data: bytes = b""
+    gas: int = TRANSFER_GAS
+    recipients: int = 1
+    gas_used: int = 0
+
+    @property
+    def description(self) -> str:
+        if self.data:
+            return f"{self.recipients} wallets via multisend"
+        return f"{self.address[:8]}..."
 
 
 class DisperseFromOneWallet:
@@ -17,9 +50,14 @@ class DisperseFromOneWallet:
         self.main_keys = main_keys
         self.proxies = proxies
         self.config = config
-        self.web3 = AsyncWeb3(AsyncHTTPProvider(RPC_URL))
+        self.web3 = create_web3(RPC_URL)
 
     async def disperse(self):
+        if self.config.DISPERSE.MULTISEND:
+            return await self.disperse_multisend()
+        if self.config.DISPERSE.PIPELINED:
+            return await self.disperse_pipelined()
+
         try:
             logger.info("Starting disperse from one wallet process")
             # Get farm wallet account
@@ -171,3 +209,332 @@ class DisperseFromOneWallet:
         except Exception as e:
             logger.error(f"Error processing transfer to {to_address[:8]}...: {str(e)}")
             return False
+
+    async def disperse_pipelined(self) -> bool:
+        """
+        Все балансы одним проходом батчами, план переводов, подпись подряд
+        идущими nonce и отправка пачками по BURST_SIZE без ожидания каждого
+        receipt. Receipts ждутся вместе в конце, пропавшие транзакции
+        отправляются повторно, чтобы в nonce не оставалось дыр.
+        """
+        try:
+            logger.info("Starting pipelined disperse from one wallet process")
+            started = time.monotonic()
+            farm_account, farm_balance_wei, nonce, gas_price = await self.get_farm_state()
+            main_addresses, balances = await self.get_main_balances(farm_balance_wei)
+
+            transfers = self.plan_transfers(main_addresses, balances, farm_balance_wei, gas_price)
+            if not transfers:
+                logger.info("No transfers needed")
+                return True
+
+            await self.send_in_bursts(transfers, nonce, gas_price)
+            await self.wait_for_receipts(transfers, farm_account.address)
+
+            return self.log_summary("pipelined", started, transfers, len(transfers)) > 0
+
+        except Exception as e:
+            logger.error(f"Error in pipelined disperse from one: {str(e)}")
+            return False
+
+    async def get_farm_state(self):
+        """(аккаунт, баланс в wei, pending nonce, gas price) фарм кошелька одним батчем"""
+        farm_account = self.web3.eth.account.from_key(self.farm_key)
+        logger.info(f"Farm wallet address: {farm_account.address[:8]}...")
+
+        async with self.web3.batch_requests() as batch:
+            batch.add(self.web3.eth.get_balance(farm_account.address))
+            batch.add(self.web3.eth.get_transaction_count(farm_account.address, "pending"))
+            batch.add(self.web3.eth.gas_price)
+            farm_balance_wei, nonce, gas_price = await batch.async_execute()
+        return farm_account, farm_balance_wei, nonce, gas_price
+
+    async def get_main_balances(self, farm_balance_wei: int):
+        main_addresses = [
+            self.web3.eth.account.from_key(main_key).address for main_key in self.main_keys
+        ]
+        balances = await get_balances_batched(
+            self.web3, main_addresses, self.config.DISPERSE.BATCH_SIZE
+        )
+        logger.info(
+            f"Farm wallet balance: {self.web3.from_wei(farm_balance_wei, 'ether')} MON, "
+            f"got balances of {len(main_addresses)} main wallets"
+        )
+        return main_addresses, balances
+
+    async def disperse_multisend(self) -> bool:
+        """
+        До MULTISEND_BATCH получателей в одной транзакции через контракт
+        multisend. План тот же, что и в конвейерном режиме, транзакции
+        отправляются и подтверждаются тем же кодом.
+        """
+        try:
+            logger.info("Starting multisend disperse from one wallet process")
+            started = time.monotonic()
+            farm_account, farm_balance_wei, nonce, gas_price = await self.get_farm_state()
+            main_addresses, balances = await self.get_main_balances(farm_balance_wei)
+
+            transfers = self.plan_transfers(main_addresses, balances, farm_balance_wei, gas_price)
+            if not transfers:
+                logger.info("No transfers needed")
+                return True
+
+            contract, nonce = await ensure_multisend(
+                self.web3,
+                self.farm_key,
+                self.config.DISPERSE.MULTISEND_CONTRACT_PATH,
+                gas_price,
+                nonce,
+            )
+
+            batch_size = max(self.config.DISPERSE.MULTISEND_BATCH, 1)
+            batches = []
+            for start in range(0, len(transfers), batch_size):
+                chunk = transfers[start : start + batch_size]
+                data = pack_recipients([(transfer.address, transfer.amount_wei) for transfer in chunk])
+                value = sum(transfer.amount_wei for transfer in chunk)
+                gas = await self.web3.eth.estimate_gas(
+                    {"from": farm_account.address, "to": contract, "value": value, "data": data}
+                )
+                batches.append(
+                    PlannedTransfer(
+                        contract, value, data=data, gas=int(gas * 1.1), recipients=len(chunk)
+                    )
+                )
+
+            await self.send_in_bursts(batches, nonce, gas_price)
+            await self.wait_for_receipts(batches, farm_account.address)
+
+            return self.log_summary("multisend", started, batches, len(transfers)) > 0
+
+        except Exception as e:
+            logger.error(f"Error in multisend disperse from one: {str(e)}")
+            return False
+
+    def log_summary(
+        self, mode: str, started: float, transactions: List[PlannedTransfer], planned: int
+    ) -> int:
+        """
+        Итог disperse в одном виде для обоих режимов: время и газ на перевод.
+        Газ сравнивается с оценкой success * TRANSFER_GAS, а не с замером
+        переводов по одному; время с другим режимом не сравнивается, его
+        видно по такой же строке от запуска в другом режиме.
+        Возвращает число успешных.
+        """
+        elapsed = time.monotonic() - started
+        confirmed = [transaction for transaction in transactions if transaction.status == 1]
+        success_count = sum(transaction.recipients for transaction in confirmed)
+        logger.info(
+            f"Disperse ({mode}) completed in {elapsed:.1f}s. "
+            f"Success: {success_count}/{planned} transfers in {len(transactions)} transactions"
+        )
+        if not success_count:
+            return 0
+
+        gas_used = sum(transaction.gas_used for transaction in confirmed)
+        baseline = success_count * TRANSFER_GAS
+        if gas_used == baseline:
+            comparison = "same as the estimate for separate transfers"
+        else:
+            difference = abs(gas_used - baseline) / baseline * 100
+            comparison = (
+                f"{difference:.1f}% {'less' if gas_used < baseline else 'more'} "
+                f"than the estimated {baseline:,} for separate transfers"
+            )
+        logger.info(
+            f"Disperse ({mode}): {elapsed / success_count:.3f}s and "
+            f"{gas_used / success_count:,.0f} gas per transfer. "
+            f"Total gas {gas_used:,}, {comparison}"
+        )
+        return success_count
+
+    def plan_transfers(
+        self,
+        addresses: List[str],
+        balances: List[Optional[int]],
+        farm_balance_wei: int,
+        gas_price: int,
+    ) -> List[PlannedTransfer]:
+        """Переводы до случайного целевого баланса, пока хватает баланса фарм кошелька"""
+        min_balance_range = self.config.DISPERSE.MIN_BALANCE_FOR_DISPERSE
+        fee = TRANSFER_GAS * gas_price
+        available = farm_balance_wei
+        transfers = []
+
+        for address, balance in zip(addresses, balances):
+            if balance is None:
+                logger.error(f"Failed to get balance for wallet {address[:8]}...")
+                continue
+
+            target_wei = self.web3.to_wei(
+                random.uniform(min_balance_range[0], min_balance_range[1]), "ether"
+            )
+            if balance >= target_wei:
+                continue
+
+            amount_wei = target_wei - balance
+            if amount_wei + fee > available:
+                logger.warning(
+                    f"Farm wallet doesn't have enough balance ({self.web3.from_wei(available, 'ether')} MON) "
+                    f"for transfer of {self.web3.from_wei(amount_wei, 'ether')} MON to {address[:8]}..."
+                )
+                continue
+
+            available -= amount_wei + fee
+            transfers.append(PlannedTransfer(address, amount_wei))
+
+        logger.info(
+            f"Planned {len(transfers)} transfers, "
+            f"{len(addresses) - len(transfers)} wallets skipped"
+        )
+        return transfers
+
+    def sign_transfer(self, transfer: PlannedTransfer, nonce: int, gas_price: int) -> None:
+        signed_txn = self.web3.eth.account.sign_transaction(
+            {
+                "to": transfer.address,
+                "value": transfer.amount_wei,
+                "data": transfer.data,
+                "nonce": nonce,
+                "gas": transfer.gas,
+                "gasPrice": gas_price,
+                "chainId": 10143,
+            },
+            self.farm_key,
+        )
+        transfer.nonce = nonce
+        transfer.raw = signed_txn.raw_transaction
+        transfer.tx_hash = signed_txn.hash
+
+    async def send_in_bursts(
+        self, transfers: List[PlannedTransfer], nonce: int, gas_price: int
+    ) -> None:
+        """
+        Транзакции подписываются непосредственно перед отправкой, nonce растет
+        только после того, как нода приняла транзакцию. Если перевод так и не
+        принят, следующий получает его nonce и дыры не появляется.
+        """
+        burst_size = max(self.config.DISPERSE.BURST_SIZE, 1)
+        for start in range(0, len(transfers), burst_size):
+            burst = transfers[start : start + burst_size]
+            for transfer in burst:
+                for attempt in range(self.config.SETTINGS.ATTEMPTS):
+                    self.sign_transfer(transfer, nonce, gas_price)
+                    try:
+                        await self.web3.eth.send_raw_transaction(transfer.raw)
+                        break
+                    except Exception as e:
+                        if any(error in str(e).lower() for error in ALREADY_SENT_ERRORS):
+                            # Запрос ушел, но ответ потерялся: транзакция уже в сети
+                            break
+                        logger.warning(
+                            f"Failed to send transfer to {transfer.description} "
+                            f"(nonce {nonce}, attempt {attempt + 1}): {str(e)}"
+                        )
+                        if "underpriced" in str(e).lower():
+                            gas_price = int(gas_price * 1.2)
+                else:
+                    logger.error(f"Transfer to {transfer.description} was not sent")
+                    transfer.tx_hash = None
+                    transfer.status = 0
+                    continue
+                nonce += 1
+
+            sent = sum(1 for transfer in burst if transfer.tx_hash)
+            logger.info(
+                f"Sent {sent}/{len(burst)} transfers "
+                f"({min(start + burst_size, len(transfers))}/{len(transfers)})"
+            )
+            if start + burst_size < len(transfers):
+                pause = random.uniform(
+                    self.config.DISPERSE.PAUSE_BETWEEN_BURSTS[0],
+                    self.config.DISPERSE.PAUSE_BETWEEN_BURSTS[1],
+                )
+                await asyncio.sleep(pause)
+
+    async def wait_for_receipts(
+        self, transfers: List[PlannedTransfer], farm_address: str
+    ) -> None:
+        """
+        Ждет receipts всех отправленных переводов. Если часть не
+        подтвердилась (транзакция выпала из мемпула), переотправляет сырые
+        транзакции начиная с nonce, на котором остановилась сеть.
+        """
+        for round_number in range(self.config.SETTINGS.ATTEMPTS):
+            pending = [
+                transfer for transfer in transfers if transfer.tx_hash and transfer.status is None
+            ]
+            if not pending:
+                return
+
+            await self.poll_receipts(pending, farm_address)
+
+            missing: Dict[int, PlannedTransfer] = {
+                transfer.nonce: transfer
+                for transfer in pending
+                if transfer.status is None
+            }
+            if not missing:
+                return
+
+            # Все nonce ниже подтвержденного уже в блоках: переотправляем с него
+            confirmed_nonce = await self.web3.eth.get_transaction_count(farm_address, "latest")
+            gap = sorted(nonce for nonce in missing if nonce >= confirmed_nonce)
+            logger.warning(
+                f"{len(missing)} transfers not confirmed, network nonce {confirmed_nonce}, "
+                f"rebroadcasting {len(gap)} (round {round_number + 1})"
+            )
+            for nonce in gap:
+                try:
+                    await self.web3.eth.send_raw_transaction(missing[nonce].raw)
+                except Exception as e:
+                    if not any(error in str(e).lower() for error in ALREADY_SENT_ERRORS):
+                        logger.warning(f"Failed to rebroadcast nonce {nonce}: {str(e)}")
+
+        for transfer in transfers:
+            if transfer.tx_hash and transfer.status is None:
+                logger.error(f"Transfer to {transfer.description} was not confirmed")
+                transfer.status = 0
+
+    async def poll_receipts(
+        self, pending: List[PlannedTransfer], farm_address: str
+    ) -> None:
+        """
+        Один eth_getTransactionCount за тик вместо опроса каждой транзакции.
+        Квитанции запрашиваются батчем и только для nonce ниже подтвержденного:
+        такие транзакции уже в блоках. Ждет не дольше RECEIPT_TIMEOUT.
+        """
+        deadline = time.monotonic() + self.config.DISPERSE.RECEIPT_TIMEOUT
+        waiting = list(pending)
+        while waiting and time.monotonic() < deadline:
+            await asyncio.sleep(RECEIPT_POLL_INTERVAL)
+            try:
+                confirmed_nonce = await self.web3.eth.get_transaction_count(
+                    farm_address, "latest"
+                )
+            except Exception as e:
+                logger.warning(f"Failed to get farm wallet nonce: {str(e)}")
+                continue
+
+            mined = [transfer for transfer in waiting if transfer.nonce < confirmed_nonce]
+            if not mined:
+                continue
+            receipts = await get_receipts_batched(
+                self.web3,
+                [transfer.tx_hash for transfer in mined],
+                max(self.config.DISPERSE.BATCH_SIZE, 1),
+            )
+            for transfer, receipt in zip(mined, receipts):
+                if receipt is None:
+                    continue
+                transfer.status = receipt["status"]
+                transfer.gas_used = receipt["gasUsed"]
+                record_receipt(receipt)
+                if transfer.status == 1:
+                    logger.success(
+                        f"Successfully transferred {self.web3.from_wei(transfer.amount_wei, 'ether')} MON "
+                        f"to {transfer.description} TX: {EXPLORER_URL}{transfer.tx_hash.hex()}"
+                    )
+                else:
+                    logger.error(f"Transaction failed for {transfer.description}")
+            waiting = [transfer for transfer in waiting if transfer.status is None]
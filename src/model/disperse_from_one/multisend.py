@@ -0,0 +1,149 @@
+import os
+from typing import List, Optional, Sequence, Tuple, Union
+
+from eth_account import Account
+from loguru import logger
+from web3 import AsyncWeb3
+
+from src.utils.constants import EXPLORER_URL
+
+
+# Минимальный multisend без ABI. Calldata - подряд идущие 32-байтные слова
+# (address << 96 | amount), amount - uint96 в wei. Для каждого слова делается
+# CALL с value, при любой ошибке вся транзакция откатывается, остаток
+# баланса контракта возвращается вызывающему.
+_RUNTIME_ASM: List[Union[str, int, Tuple[str, str]]] = [
+    "PUSH1", 0,                      # [i]
+    ("label", "loop"),
+    "JUMPDEST",
+    "DUP1", "CALLDATASIZE", "GT",    # [size > i, i]
+    "ISZERO", ("push", "done"), "JUMPI",
+    "DUP1", "CALLDATALOAD",          # [word, i]
+    "PUSH1", 0, "PUSH1", 0, "PUSH1", 0, "PUSH1", 0,
+    "DUP5", "PUSH12", (1 << 96) - 1, "AND",         # value = word & (2^96 - 1)
+    "DUP6", "PUSH1", 96, "SHR",                    # to = word >> 96
+    "GAS", "CALL",                   # [success, word, i]
+    "ISZERO", ("push", "fail"), "JUMPI",
+    "POP", "PUSH1", 32, "ADD",       # [i + 32]
+    ("push", "loop"), "JUMP",
+    ("label", "done"),
+    "JUMPDEST",
+    "PUSH1", 0, "PUSH1", 0, "PUSH1", 0, "PUSH1", 0,
+    "SELFBALANCE", "CALLER", "GAS", "CALL",
+    "ISZERO", ("push", "fail"), "JUMPI",
+    "STOP",
+    ("label", "fail"),
+    "JUMPDEST",
+    "PUSH1", 0, "DUP1", "REVERT",
+]
+
+_OPCODES = {
+    "STOP": 0x00, "ADD": 0x01, "GT": 0x11, "ISZERO": 0x15, "AND": 0x16,
+    "SHR": 0x1C, "CALLER": 0x33, "CALLDATALOAD": 0x35, "CALLDATASIZE": 0x36,
+    "CODECOPY": 0x39, "SELFBALANCE": 0x47, "POP": 0x50, "JUMP": 0x56,
+    "JUMPI": 0x57, "GAS": 0x5A, "JUMPDEST": 0x5B, "PUSH1": 0x60, "PUSH12": 0x6B,
+    "DUP1": 0x80, "DUP5": 0x84, "DUP6": 0x85, "CALL": 0xF1, "RETURN": 0xF3,
+    "REVERT": 0xFD,
+}
+
+
+def assemble(program: Sequence[Union[str, int, Tuple[str, str]]]) -> bytes:
+    """
+    Собирает байткод: имя опкода, число - аргумент предыдущего PUSH,
+    ("label", имя) - метка, ("push", имя) - PUSH1 с адресом метки.
+    """
+    labels = {}
+    size = 0
+    for item in program:
+        if isinstance(item, tuple):
+            if item[0] == "label":
+                labels[item[1]] = size
+            else:
+                size += 2
+        elif isinstance(item, str):
+            size += 1 + (_OPCODES[item] - 0x5F if item.startswith("PUSH") else 0)
+
+    code = bytearray()
+    push_size = 0
+    for item in program:
+        if isinstance(item, tuple):
+            if item[0] == "push":
+                code += bytes([_OPCODES["PUSH1"], labels[item[1]]])
+        elif isinstance(item, str):
+            code.append(_OPCODES[item])
+            push_size = _OPCODES[item] - 0x5F if item.startswith("PUSH") else 0
+        else:
+            code += item.to_bytes(push_size, "big")
+    return bytes(code)
+
+
+RUNTIME_CODE = assemble(_RUNTIME_ASM)
+# Копирует runtime код в память и возвращает его: 11 байт перед runtime
+INIT_CODE = (
+    assemble(
+        [
+            "PUSH1", len(RUNTIME_CODE), "DUP1", "PUSH1", 11, "PUSH1", 0, "CODECOPY",
+            "PUSH1", 0, "RETURN",
+        ]
+    )
+    + RUNTIME_CODE
+)
+
+MAX_AMOUNT = (1 << 96) - 1
+
+
+def pack_recipients(recipients: Sequence[Tuple[str, int]]) -> bytes:
+    """(адрес, сумма в wei) -> calldata для multisend"""
+    data = bytearray()
+    for address, amount_wei in recipients:
+        if amount_wei > MAX_AMOUNT:
+            raise ValueError(f"Amount {amount_wei} for {address} does not fit in uint96")
+        data += ((int(address, 16) << 96) | amount_wei).to_bytes(32, "big")
+    return bytes(data)
+
+
+async def ensure_multisend(
+    web3: AsyncWeb3, private_key: str, path: str, gas_price: int, nonce: int
+) -> Tuple[str, int]:
+    """
+    Адрес контракта multisend: из файла, если код по адресу совпадает,
+    иначе деплоится новый и адрес сохраняется в файл.
+    Возвращает (адрес, следующий nonce).
+    """
+    address = _load_address(path)
+    if address and bytes(await web3.eth.get_code(address)) == RUNTIME_CODE:
+        logger.info(f"Using multisend contract {address}")
+        return address, nonce
+
+    account = Account.from_key(private_key)
+    transaction = {
+        "from": account.address,
+        "data": INIT_CODE,
+        "nonce": nonce,
+        "gasPrice": gas_price,
+        "chainId": 10143,
+    }
+    transaction["gas"] = int(await web3.eth.estimate_gas(transaction) * 1.2)
+    signed_txn = web3.eth.account.sign_transaction(transaction, private_key)
+    tx_hash = await web3.eth.send_raw_transaction(signed_txn.raw_transaction)
+    receipt = await web3.eth.wait_for_transaction_receipt(tx_hash)
+    if receipt["status"] != 1 or not receipt.get("contractAddress"):
+        raise Exception(f"Multisend contract deployment failed. TX: {EXPLORER_URL}{tx_hash.hex()}")
+
+    address = web3.to_checksum_address(receipt["contractAddress"])
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(address + "\n")
+    logger.success(
+        f"Deployed multisend contract {address} ({receipt['gasUsed']} gas). "
+        f"TX: {EXPLORER_URL}{tx_hash.hex()}"
+    )
+    return address, nonce + 1
+
+
+def _load_address(path: str) -> Optional[str]:
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        address = f.read().strip()
+    return AsyncWeb3.to_checksum_address(address) if address else None
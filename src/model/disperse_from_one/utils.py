@@ -63,4 +63,45 @@ async def get_all_balances(
     results = await asyncio.gather(*tasks)
 
     # Filter out None results and return valid WalletInfo objects
-    return [result for result in results if result is not None] 
\ No newline at end of file
+    return [result for result in results if result is not None] 
+
+async def get_balances_batched(
+    web3: AsyncWeb3, addresses: List[str], batch_size: int
+) -> List[int | None]:
+    """Balances in wei for many addresses, batch_size eth_getBalance per JSON-RPC batch."""
+    balances: List[int | None] = []
+    for start in range(0, len(addresses), batch_size):
+        chunk = addresses[start : start + batch_size]
+        try:
+            async with web3.batch_requests() as batch:
+                for address in chunk:
+                    batch.add(web3.eth.get_balance(address))
+                balances.extend(await batch.async_execute())
+        except Exception as e:
+            logger.error(f"Failed to get balances for {len(chunk)} wallets in batch: {str(e)}")
+            balances.extend([None] * len(chunk))
+    return balances
+
+
+async def get_receipts_batched(
+    web3: AsyncWeb3, tx_hashes: List[bytes], batch_size: int
+) -> List[dict | None]:
+    """Receipts for many transactions, batch_size eth_getTransactionReceipt per JSON-RPC batch."""
+    receipts: List[dict | None] = []
+    for start in range(0, len(tx_hashes), batch_size):
+        chunk = tx_hashes[start : start + batch_size]
+        try:
+            async with web3.batch_requests() as batch:
+                for tx_hash in chunk:
+                    batch.add(web3.eth.get_transaction_receipt(tx_hash))
+                receipts.extend(await batch.async_execute())
+        except Exception:
+            # Батч падает целиком, если хоть одной квитанции еще нет
+            results = await asyncio.gather(
+                *(web3.eth.get_transaction_receipt(tx_hash) for tx_hash in chunk),
+                return_exceptions=True,
+            )
+            receipts.extend(
+                None if isinstance(receipt, Exception) else receipt for receipt in results
+            )
+    return receipts
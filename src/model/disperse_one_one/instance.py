@@ -1,12 +1,23 @@
 from loguru import logger
-from web3 import AsyncHTTPProvider, AsyncWeb3
+from web3 import AsyncWeb3
 import random
 import asyncio
 from typing import List
 
 from src.utils.constants import RPC_URL
 from src.utils.config import Config
-from .utils import get_all_balances, WalletInfo, WalletGroup, process_single_transfer
+from src.utils.provider import create_web3
+from src.utils.retry import RetryPolicy
+from .utils import (
+    GasPriceCache,
+    get_all_balances,
+    plan_wallet_groups,
+    process_single_transfer,
+    sweep_farm_wallet,
+    TxRateLimiter,
+    WalletGroup,
+    WalletInfo,
+)
 
 
 class DisperseOneOne:
@@ -15,7 +26,7 @@ class DisperseOneOne:
         self.farm_keys = farm_keys
         self.proxies = proxies
         self.config = config
-        self.web3 = AsyncWeb3(AsyncHTTPProvider(RPC_URL))
+        self.web3 = create_web3(RPC_URL)
 
     async def disperse(self):
         try:
@@ -73,9 +84,53 @@ class DisperseOneOne:
 
         return all(results)  # Return True only if all transfers succeeded
 
+    async def sweep_concurrently(self, wallet_groups: List[WalletGroup]) -> List[bool]:
+        """
+        Переводы всех групп без пауз между ними: у фарм кошельков свои nonce.
+        Одновременно в работе не больше THREADS кошельков, темп отправки
+        ограничивает общий TX_PER_SECOND. Возвращает результат по каждой группе.
+        """
+        limiter = TxRateLimiter(
+            self.config.DISPERSE.TX_PER_SECOND, self.config.DISPERSE.TX_BURST
+        )
+        gas_price = GasPriceCache(self.web3)
+        semaphore = asyncio.Semaphore(self.config.SETTINGS.THREADS)
+        retry_policy = RetryPolicy(self.config)
+        transfers = [
+            sweep_farm_wallet(
+                self.web3,
+                farm_wallet,
+                group.main_wallet.address,
+                gas_price,
+                limiter,
+                semaphore,
+                retry_policy,
+                self.config.DISPERSE.RECEIPT_TIMEOUT,
+            )
+            for group in wallet_groups
+            for farm_wallet in group.farm_wallets
+        ]
+        logger.info(
+            f"Sweeping {len(transfers)} farm wallets concurrently "
+            f"({self.config.SETTINGS.THREADS} at a time, limit {self.config.DISPERSE.TX_PER_SECOND} tx/s)"
+        )
+        transfer_results = iter(await asyncio.gather(*transfers))
+        return [
+            all([next(transfer_results) for _ in group.farm_wallets])
+            for group in wallet_groups
+        ]
+
     async def start_disperse(self, wallet_groups: List[WalletGroup]) -> bool:
         """Start the disperse process for all wallet groups concurrently."""
         try:
+            if self.config.DISPERSE.CONCURRENT_SWEEP:
+                results = await self.sweep_concurrently(wallet_groups)
+                success_count = sum(1 for result in results if result)
+                logger.info(
+                    f"Disperse completed. Success: {success_count}/{len(wallet_groups)} groups"
+                )
+                return success_count > 0
+
             semaphore = asyncio.Semaphore(self.config.SETTINGS.THREADS)
 
             # Create tasks for each wallet group to process concurrently
@@ -110,54 +165,12 @@ class DisperseOneOne:
         self, main_wallets: List[WalletInfo], farm_wallets: List[WalletInfo]
     ) -> List[WalletGroup]:
         """Create groups of wallets for dispersing funds."""
-        # Filter out farm wallets with zero balance and copy the list
-        available_farm_wallets = [
-            wallet for wallet in farm_wallets if wallet.balance_eth > 0
-        ]
-        wallet_groups = []
-
-        min_balance_range = self.config.DISPERSE.MIN_BALANCE_FOR_DISPERSE
-
-        for main_wallet in main_wallets:
-            # Get random target balance between min and max from config
-            target_balance = random.uniform(min_balance_range[0], min_balance_range[1])
-
-            # Skip if main wallet already has enough balance
-            if main_wallet.balance_eth >= target_balance:
-                continue
-
-            needed_balance = target_balance - main_wallet.balance_eth
-            current_farm_wallets = []
-            current_sum = 0
-
-            # Try to find enough farm wallets to reach target balance
-            for farm_wallet in available_farm_wallets[:]:
-                current_farm_wallets.append(farm_wallet)
-                current_sum += farm_wallet.balance_eth
-                available_farm_wallets.remove(farm_wallet)
-
-                if current_sum >= needed_balance:
-                    break
-
-            # Create group even if we didn't reach target balance but have some funds
-            if current_sum > 0:
-                group = WalletGroup(
-                    main_wallet=main_wallet,
-                    farm_wallets=current_farm_wallets,
-                    target_balance=target_balance,
-                )
-                wallet_groups.append(group)
-                if current_sum < needed_balance:
-                    logger.warning(
-                        f"Insufficient balance for main wallet {main_wallet.address[:8]}... "
-                        f"(needed: {needed_balance}, found: {current_sum}, but proceeding anyway)"
-                    )
-            else:
-                # Return farm wallets back to pool if we couldn't get any balance
-                available_farm_wallets.extend(current_farm_wallets)
-                logger.warning(
-                    f"No available farm wallets with balance for main wallet "
-                    f"{main_wallet.address[:8]}..."
-                )
-
+        wallet_groups, underfunded = plan_wallet_groups(
+            main_wallets, farm_wallets, self.config.DISPERSE.MIN_BALANCE_FOR_DISPERSE
+        )
+        transfers = sum(len(group.farm_wallets) for group in wallet_groups)
+        logger.info(
+            f"Planned {transfers} transfers from {len(farm_wallets)} farm wallets "
+            f"to {len(wallet_groups)} main wallets ({underfunded} not fully covered)"
+        )
         return wallet_groups
@@ -1,11 +1,20 @@
+from bisect import bisect_left
 from dataclasses import dataclass
 from loguru import logger
 from web3 import AsyncWeb3
 import asyncio
-from typing import List
+from typing import List, Tuple
 import random
+import time
 
+from src.model.disperse_from_one.instance import ALREADY_SENT_ERRORS, TRANSFER_GAS
 from src.utils.config import Config
+from src.utils.retry import RetryPolicy
+
+
+# Как часто перечитывается цена газа и опрашивается квитанция при sweep
+GAS_PRICE_REFRESH = 30
+RECEIPT_POLL_INTERVAL = 1.0
 
 
 @dataclass
@@ -30,6 +39,165 @@ class WalletGroup:
         )
 
 
+class TxRateLimiter:
+    """
+    Общий на все кошельки лимит отправки транзакций (token bucket):
+    rate транзакций в секунду в среднем, не больше burst подряд.
+    rate <= 0 - без лимита.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        # Ожидание под замком: ждущие получают токены по очереди
+        async with self._lock:
+            self._refill()
+            if self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= 1
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+
+class GasPriceCache:
+    """Цена газа, общая на все переводы sweep, перечитывается раз в refresh секунд"""
+
+    def __init__(self, web3: AsyncWeb3, refresh: float = GAS_PRICE_REFRESH):
+        self.web3 = web3
+        self.refresh = refresh
+        self.price = 0
+        self._updated = float("-inf")
+        self._lock = asyncio.Lock()
+
+    async def get(self) -> int:
+        if time.monotonic() - self._updated >= self.refresh:
+            async with self._lock:
+                if time.monotonic() - self._updated >= self.refresh:
+                    self.price = await self.web3.eth.gas_price
+                    self._updated = time.monotonic()
+        return self.price
+
+    def bump(self) -> None:
+        # Нода отклонила цену как заниженную: поднимаем до следующего чтения
+        self.price = int(self.price * 1.2)
+        self._updated = time.monotonic()
+
+
+class UnusedIndex:
+    """
+    Неиспользованные позиции отсортированного списка: ближайшая свободная
+    справа и слева от позиции. Два DSU со сжатием путей, удаление за O(1),
+    поиск почти за O(1), вместо list.remove за O(n).
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        # next_free[i] - кандидат на свободную позицию >= i, size - нет такой
+        self.next_free = list(range(size + 1))
+        # prev_free[i + 1] - кандидат на свободную позицию <= i, 0 - нет такой
+        self.prev_free = list(range(size + 1))
+
+    def next(self, index: int) -> int:
+        """Первая свободная позиция >= index или size"""
+        root = index
+        while self.next_free[root] != root:
+            root = self.next_free[root]
+        while self.next_free[index] != root:
+            self.next_free[index], index = root, self.next_free[index]
+        return root
+
+    def prev(self, index: int) -> int:
+        """Последняя свободная позиция <= index или -1"""
+        root = index + 1
+        while self.prev_free[root] != root:
+            root = self.prev_free[root]
+        index += 1
+        while self.prev_free[index] != root:
+            self.prev_free[index], index = root, self.prev_free[index]
+        return root - 1
+
+    def take(self, index: int) -> None:
+        self.next_free[index] = index + 1
+        self.prev_free[index + 1] = index
+
+
+def plan_wallet_groups(
+    main_wallets: List[WalletInfo],
+    farm_wallets: List[WalletInfo],
+    min_balance_range: Tuple[float, float],
+) -> Tuple[List[WalletGroup], int]:
+    """
+    Распределяет фарм кошельки (каждый отдает весь баланс) по недостачам
+    главных. Недостачи обрабатываются от большей к меньшей, для каждой берется
+    самый маленький фарм кошелек, который закрывает ее целиком (best fit),
+    а если такого нет - самый большой из оставшихся, и так до покрытия.
+    Возвращает группы в порядке главных кошельков и число недопокрытых.
+    """
+    farm = sorted(
+        (wallet for wallet in farm_wallets if wallet.balance_wei > 0),
+        key=lambda wallet: wallet.balance_wei,
+    )
+    farm_balances = [wallet.balance_wei for wallet in farm]
+    unused = UnusedIndex(len(farm))
+
+    deficits = []
+    for position, main_wallet in enumerate(main_wallets):
+        # Get random target balance between min and max from config
+        target_balance = random.uniform(min_balance_range[0], min_balance_range[1])
+        target_wei = AsyncWeb3.to_wei(target_balance, "ether")
+        if main_wallet.balance_wei < target_wei:
+            deficits.append((target_wei - main_wallet.balance_wei, position, target_balance))
+    deficits.sort(reverse=True)
+
+    groups = []
+    underfunded = 0
+    for needed, position, target_balance in deficits:
+        selected = []
+        remaining = needed
+        while remaining > 0:
+            index = unused.next(bisect_left(farm_balances, remaining))
+            if index == len(farm):
+                # Ни один кошелек не закрывает остаток: берем самый большой
+                index = unused.prev(len(farm) - 1)
+                if index < 0:
+                    break
+            unused.take(index)
+            selected.append(farm[index])
+            remaining -= farm_balances[index]
+
+        main_wallet = main_wallets[position]
+        if not selected:
+            logger.warning(
+                f"No available farm wallets with balance for main wallet "
+                f"{main_wallet.address[:8]}..."
+            )
+            continue
+        if remaining > 0:
+            underfunded += 1
+            logger.warning(
+                f"Insufficient balance for main wallet {main_wallet.address[:8]}... "
+                f"(needed: {AsyncWeb3.from_wei(needed, 'ether')}, "
+                f"found: {AsyncWeb3.from_wei(needed - remaining, 'ether')}, but proceeding anyway)"
+            )
+        groups.append(
+            (position, WalletGroup(main_wallet, selected, target_balance))
+        )
+
+    groups.sort(key=lambda item: item[0])
+    return [group for _, group in groups], underfunded
+
+
 async def get_monad_balance(
     web3: AsyncWeb3, address: str
 ) -> tuple[int, float] | tuple[None, None]:
@@ -137,3 +305,91 @@ async def process_single_transfer(
                 f"Error processing transfer from {farm_wallet.address[:8]}...: {str(e)}"
             )
             return False
+
+
+async def sweep_farm_wallet(
+    web3: AsyncWeb3,
+    farm_wallet: WalletInfo,
+    main_address: str,
+    gas_price: GasPriceCache,
+    limiter: TxRateLimiter,
+    semaphore: asyncio.Semaphore,
+    retry_policy: RetryPolicy,
+    receipt_timeout: float,
+) -> bool:
+    """
+    Перевод всего баланса фарм кошелька без estimate_gas: обычный перевод
+    всегда стоит TRANSFER_GAS. Лимит берется до чтения nonce, повторная
+    отправка идет с тем же nonce, поэтому дубля перевода не будет.
+    """
+    async with semaphore:
+        nonce = None
+        tx_hash = None
+        for attempt in range(retry_policy.attempts):
+            try:
+                await limiter.acquire()
+                if nonce is None:
+                    nonce = await web3.eth.get_transaction_count(
+                        farm_wallet.address, "pending"
+                    )
+                price = await gas_price.get()
+                value = farm_wallet.balance_wei - TRANSFER_GAS * price
+                if value <= 0:
+                    logger.warning(
+                        f"Balance of {farm_wallet.address[:8]}... does not cover the gas fee, skipping"
+                    )
+                    return False
+
+                transaction = {
+                    "from": farm_wallet.address,
+                    "to": main_address,
+                    "value": value,
+                    "nonce": nonce,
+                    "gas": TRANSFER_GAS,
+                    "gasPrice": price,
+                    "chainId": 10143,
+                }
+                signed_txn = web3.eth.account.sign_transaction(
+                    transaction, farm_wallet.private_key
+                )
+                try:
+                    tx_hash = await web3.eth.send_raw_transaction(
+                        signed_txn.raw_transaction
+                    )
+                except Exception as e:
+                    # Прошлая попытка дошла до ноды, хотя ответ потерялся
+                    if not any(error in str(e).lower() for error in ALREADY_SENT_ERRORS):
+                        raise
+                    tx_hash = signed_txn.hash
+                break
+
+            except Exception as e:
+                if "underpriced" in str(e).lower():
+                    gas_price.bump()
+                if not await retry_policy.should_retry(e, attempt, "disperse"):
+                    logger.error(
+                        f"Error processing transfer from {farm_wallet.address[:8]}...: {str(e)}"
+                    )
+                    return False
+
+        if tx_hash is None:
+            return False
+
+        try:
+            receipt = await web3.eth.wait_for_transaction_receipt(
+                tx_hash, timeout=receipt_timeout, poll_latency=RECEIPT_POLL_INTERVAL
+            )
+        except Exception as e:
+            logger.error(
+                f"No receipt for transfer from {farm_wallet.address[:8]}...: {str(e)}"
+            )
+            return False
+
+        if receipt["status"] == 1:
+            logger.success(
+                f"Successfully transferred {web3.from_wei(value, 'ether')} "
+                f"MON from {farm_wallet.address[:8]}... to {main_address[:8]}..."
+            )
+            return True
+        logger.error(f"Transaction failed for {farm_wallet.address[:8]}...")
+        return False
@@ -0,0 +1 @@
+from .instance import FarmFaucetPipeline
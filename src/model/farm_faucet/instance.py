@@ -0,0 +1,358 @@
+import asyncio
+import json
+import os
+import time
+from dataclasses import dataclass
+from threading import Lock
+from typing import List, Optional, Sequence, Set
+
+from eth_account import Account
+from loguru import logger
+
+from src.model.help import Capsolver
+from src.model.monad_xyz.faucet import (
+    ALREADY_CLAIMED,
+    CLAIMED,
+    FAILED,
+    RETRY,
+    UNAVAILABLE,
+    claim_faucet,
+)
+from src.model.monad_xyz.token_pool import FAUCET_SITEKEY, FAUCET_URL
+from src.utils.account_store import ACCOUNT_STORE
+from src.utils.circuit_breaker import CircuitState, get_breaker
+from src.utils.client import CLIENT_POOL
+from src.utils.config import Config
+from src.utils.context import current_account, current_task
+from src.utils.logs import report_error, report_success
+from src.utils.metrics import REGISTRY
+from src.utils.proxy_checker import PROXY_CHECKER
+from src.utils.tracing import span
+
+
+FARM_QUEUE_DEPTH = REGISTRY.gauge(
+    "farm_faucet_queue_depth", "Accounts waiting in front of a farm_faucet stage", ("stage",)
+)
+FARM_STAGE_RESULTS = REGISTRY.counter(
+    "farm_faucet_stage_total", "Farm faucet stage runs by outcome", ("stage", "result")
+)
+FARM_STAGE_SECONDS = REGISTRY.histogram(
+    "farm_faucet_stage_seconds", "Farm faucet stage latency", ("stage",)
+)
+
+SUCCESS_RESULTS = (CLAIMED, ALREADY_CLAIMED)
+
+
+@dataclass
+class FaucetJob:
+    account_index: int
+    private_key: str
+    proxy: str
+    wallet: Account
+    attempts: int = 0
+    token: Optional[str] = None
+    solved_at: float = 0.0
+
+
+class FaucetResultStore:
+    """
+    Результаты крана в JSONL файле, по одной строке на аккаунт.
+    При повторном запуске уже получившие токены адреса пропускаются.
+    Файл открывается один раз, запись идет из потоков, вне event loop.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+        self._lock = Lock()
+
+    def load_claimed(self) -> Set[str]:
+        claimed = set()
+        if not os.path.exists(self.path):
+            return claimed
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # Строка могла оборваться при аварийной остановке
+                    continue
+                if record.get("result") in SUCCESS_RESULTS:
+                    claimed.add(record["address"].lower())
+        return claimed
+
+    def append(self, job: FaucetJob, result: str) -> None:
+        record = {
+            "ts": round(time.time(), 3),
+            "account": job.account_index,
+            "address": job.wallet.address,
+            "result": result,
+            "attempts": job.attempts,
+        }
+        line = json.dumps(record) + "\n"
+        with self._lock:
+            if self._file is None:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                self._file = open(self.path, "a", encoding="utf-8")
+            self._file.write(line)
+            # Строка должна быть на диске, если запуск оборвется
+            self._file.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class FarmFaucetPipeline:
+    """
+    Кран для большого числа фарм-кошельков без общей машинерии аккаунтов.
+    Капча решается с параллельностью, которую держит провайдер, запросы на
+    кран идут со своей параллельностью. Между стадиями ограниченная очередь:
+    капча не решается сильно раньше, чем ее успеют использовать.
+    """
+
+    def __init__(self, config: Config):
+        self.config = config
+        self.settings = config.FARM_FAUCET
+        self.solver = Capsolver(
+            config.FAUCET.CAPSOLVER_API_KEY,
+            config.FAUCET.PROXY_FOR_CAPTCHA,
+        )
+        self.store = FaucetResultStore(self.settings.RESULTS_PATH)
+        self.breaker = get_breaker("monad.xyz faucet")
+
+        self.captcha_queue: asyncio.Queue = asyncio.Queue()
+        self.claim_queue: asyncio.Queue = asyncio.Queue(
+            maxsize=self.settings.CLAIM_CONCURRENCY
+        )
+        # Сколько аккаунтов одновременно внутри конвейера. Повторные попытки
+        # возвращаются в очередь капчи без нового места, поэтому стадии
+        # не могут заблокировать друг друга
+        self.window = asyncio.Semaphore(
+            self.settings.CAPTCHA_CONCURRENCY * 2 + self.settings.CLAIM_CONCURRENCY
+        )
+        self.lock = asyncio.Lock()
+        self.outstanding = 0
+        # Аккаунты с токеном у claim воркеров и решение капчи для пробного запроса
+        self.claiming = 0
+        self.probe_solving = False
+        self.skipped = 0
+        # Все аккаунты переданы в конвейер, done можно ставить при outstanding == 0
+        self.produced = False
+        self.done = asyncio.Event()
+        self.results = {CLAIMED: 0, ALREADY_CLAIMED: 0, FAILED: 0}
+
+    async def run(
+        self, private_keys: Sequence[str], proxies: List[str], account_numbers: Sequence[int]
+    ):
+        """
+        private_keys - строки файла по номеру (LineIndex), аккаунты создаются
+        по мере того, как в конвейере освобождается место.
+        """
+        claimed = (
+            await asyncio.to_thread(self.store.load_claimed)
+            if self.settings.SKIP_CLAIMED
+            else set()
+        )
+
+        logger.info(
+            f"Starting farm faucet for {len(account_numbers)} wallets: "
+            f"{self.settings.CAPTCHA_CONCURRENCY} captcha workers, "
+            f"{self.settings.CLAIM_CONCURRENCY} claim workers"
+        )
+        started = time.monotonic()
+
+        workers = [
+            asyncio.create_task(self._captcha_worker())
+            for _ in range(self.settings.CAPTCHA_CONCURRENCY)
+        ] + [
+            asyncio.create_task(self._claim_worker())
+            for _ in range(self.settings.CLAIM_CONCURRENCY)
+        ]
+        producer = asyncio.create_task(
+            self._produce(private_keys, proxies, account_numbers, claimed)
+        )
+        try:
+            await self.done.wait()
+        finally:
+            for task in [producer, *workers]:
+                task.cancel()
+            await asyncio.gather(producer, *workers, return_exceptions=True)
+            await asyncio.to_thread(self.store.close)
+
+        if self.skipped:
+            logger.info(f"Skipped {self.skipped} farm wallets that already got tokens from faucet")
+        logger.success(
+            f"Farm faucet finished in {time.monotonic() - started:.0f}s: "
+            f"{self.results[CLAIMED]} claimed, {self.results[ALREADY_CLAIMED]} already claimed, "
+            f"{self.results[FAILED]} failed. Results saved to {self.settings.RESULTS_PATH}"
+        )
+
+    async def _produce(
+        self,
+        private_keys: Sequence[str],
+        proxies: List[str],
+        account_numbers: Sequence[int],
+        claimed: Set[str],
+    ) -> None:
+        for position, number in enumerate(account_numbers):
+            private_key = private_keys[number - 1]
+            wallet = Account.from_key(private_key)
+            if wallet.address.lower() in claimed:
+                self.skipped += 1
+                continue
+
+            await self.window.acquire()
+            self.outstanding += 1
+            job = FaucetJob(number, private_key, proxies[position % len(proxies)], wallet)
+            self._enqueue_captcha(job)
+
+        self.produced = True
+        if self.outstanding == 0:
+            self.done.set()
+
+    def _enqueue_captcha(self, job: FaucetJob) -> None:
+        job.token = None
+        self.captcha_queue.put_nowait(job)
+        FARM_QUEUE_DEPTH.set(self.captcha_queue.qsize(), stage="captcha")
+
+    async def _captcha_worker(self) -> None:
+        while True:
+            job: FaucetJob = await self.captcha_queue.get()
+            FARM_QUEUE_DEPTH.set(self.captcha_queue.qsize(), stage="captcha")
+
+            probe = await self._wait_for_faucet()
+
+            current_account.set(job.account_index)
+            current_task.set("farm_faucet")
+            started = time.monotonic()
+            try:
+                with span("solve_turnstile", "captcha", account=job.account_index):
+                    token = await self.solver.solve_turnstile(
+                        FAUCET_SITEKEY, FAUCET_URL, True
+                    )
+            except Exception as e:
+                logger.error(f"[{job.account_index}] | Failed to solve captcha for faucet: {e}")
+                token = None
+            finally:
+                if probe:
+                    self.probe_solving = False
+            FARM_STAGE_SECONDS.observe(time.monotonic() - started, stage="captcha")
+
+            if not token:
+                FARM_STAGE_RESULTS.inc(stage="captcha", result="failed")
+                await self._retry_or_fail(job)
+                continue
+
+            FARM_STAGE_RESULTS.inc(stage="captcha", result="solved")
+            job.token = token
+            job.solved_at = time.monotonic()
+            # Ждет, пока освободится место перед стадией крана
+            await self.claim_queue.put(job)
+            FARM_QUEUE_DEPTH.set(self.claim_queue.qsize(), stage="claim")
+
+    async def _wait_for_faucet(self) -> bool:
+        """
+        Капча решается только при закрытом предохранителе: пока кран
+        недоступен, токен просто протухнет. В HALF_OPEN решается одна капча
+        для пробного запроса, если ни у одного аккаунта нет готового токена.
+        Возвращает True, если занят слот пробной капчи.
+        """
+        while True:
+            state = self.breaker.state
+            if state == CircuitState.CLOSED:
+                return False
+            if (
+                state == CircuitState.HALF_OPEN
+                and not self.probe_solving
+                and self.claiming == 0
+                and self.claim_queue.empty()
+            ):
+                self.probe_solving = True
+                return True
+            await asyncio.sleep(max(self.breaker.retry_in, 1))
+
+    async def _claim_worker(self) -> None:
+        while True:
+            job: FaucetJob = await self.claim_queue.get()
+            FARM_QUEUE_DEPTH.set(self.claim_queue.qsize(), stage="claim")
+            current_account.set(job.account_index)
+            current_task.set("farm_faucet")
+
+            self.claiming += 1
+            try:
+                await self._claim(job)
+            finally:
+                self.claiming -= 1
+
+    async def _claim(self, job: FaucetJob) -> None:
+        while True:
+            token_left = self.config.FAUCET.TOKEN_TTL - (time.monotonic() - job.solved_at)
+            if token_left <= 0:
+                # Капча протухла в очереди, это не вина аккаунта
+                FARM_STAGE_RESULTS.inc(stage="claim", result="expired")
+                self._enqueue_captcha(job)
+                return
+
+            if self.config.PROXY_CHECK.ENABLED and not PROXY_CHECKER.is_healthy(job.proxy):
+                # Прокси в карантине: берем лучший рабочий, не закрепляя за аккаунтом
+                job.proxy = PROXY_CHECKER.assign(job.account_index, exclude=job.proxy)
+                PROXY_CHECKER.release(job.account_index)
+
+            job.attempts += 1
+            started = time.monotonic()
+            try:
+                session = await CLIENT_POOL.acquire(job.proxy, scope=job.account_index)
+                with span("claim_faucet", "http", account=job.account_index):
+                    result = await claim_faucet(
+                        session, job.account_index, job.wallet, job.token
+                    )
+            except Exception as e:
+                logger.error(f"[{job.account_index}] | Error faucet to monad.xyz: {e}")
+                result = RETRY
+            finally:
+                CLIENT_POOL.release(job.account_index)
+            FARM_STAGE_SECONDS.observe(time.monotonic() - started, stage="claim")
+            FARM_STAGE_RESULTS.inc(stage="claim", result=result)
+
+            if result in SUCCESS_RESULTS:
+                await self._finish(job, result)
+            elif result == FAILED:
+                await self._finish(job, FAILED)
+            elif result == UNAVAILABLE:
+                # Запрос не отправлялся: попытку не считаем, токен не тратим
+                # и ждем предохранитель, пока токен жив
+                job.attempts -= 1
+                await asyncio.sleep(min(max(self.breaker.retry_in, 1), token_left))
+                continue
+            else:
+                await self._retry_or_fail(job, counted=True)
+            return
+
+    async def _retry_or_fail(self, job: FaucetJob, counted: bool = False) -> None:
+        if not counted:
+            job.attempts += 1
+        if job.attempts >= self.config.SETTINGS.ATTEMPTS:
+            await self._finish(job, FAILED)
+        else:
+            self._enqueue_captcha(job)
+
+    def _save(self, job: FaucetJob, result: str) -> None:
+        """Вызывается в потоке: файл результатов и база аккаунтов"""
+        self.store.append(job, result)
+        ACCOUNT_STORE.record_task(job.wallet.address, "farm_faucet", result in SUCCESS_RESULTS)
+
+    async def _finish(self, job: FaucetJob, result: str) -> None:
+        self.results[result] += 1
+        await asyncio.to_thread(self._save, job, result)
+        if result in SUCCESS_RESULTS:
+            await report_success(self.lock, job.private_key, job.proxy, "")
+        else:
+            await report_error(self.lock, job.private_key, job.proxy, "")
+
+        self.window.release()
+        self.outstanding -= 1
+        if self.produced and self.outstanding == 0:
+            self.done.set()
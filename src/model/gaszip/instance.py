@@ -13,6 +13,7 @@ from src.model.gaszip.constants import (
     GASZIP_EXPLORERS
 )
 from src.utils.constants import RPC_URL
+from src.utils.provider import create_web3
 
 
 class Gaszip:
@@ -28,7 +29,7 @@ class Gaszip:
         self.private_key = private_key
         self.config = config
         self.account = Account.from_key(private_key)
-        self.monad_web3 = AsyncWeb3(AsyncWeb3.AsyncHTTPProvider(RPC_URL))
+        self.monad_web3 = create_web3(RPC_URL)
         
     async def get_monad_balance(self) -> float:
         """Get native MON balance."""
@@ -42,7 +43,7 @@ class Gaszip:
     async def get_native_balance(self, network: str) -> float:
         """Get native token balance for a specific network."""
         try:
-            web3 = AsyncWeb3(AsyncWeb3.AsyncHTTPProvider(GASZIP_RPCS[network]))
+            web3 = create_web3(GASZIP_RPCS[network])
             balance_wei = await web3.eth.get_balance(self.account.address)
             return float(web3.from_wei(balance_wei, 'ether'))
         except Exception as e:
@@ -141,7 +142,7 @@ class Gaszip:
                 return False
                 
             network, amount = network_info
-            web3 = AsyncWeb3(AsyncWeb3.AsyncHTTPProvider(GASZIP_RPCS[network]))
+            web3 = create_web3(GASZIP_RPCS[network])
             
             # Get initial MON balance if we're going to wait for it to increase
             initial_balance = 0
@@ -1,3 +1,3 @@
-from .captcha import Capsolver
+from .captcha import BestCaptchaSolver, CaptchaSolver, Capsolver, TwentyFourCaptchaSolver
 
-__all__ = ["Capsolver"]
+__all__ = ["BestCaptchaSolver", "CaptchaSolver", "Capsolver", "TwentyFourCaptchaSolver"]
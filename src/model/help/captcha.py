@@ -1,10 +1,26 @@
 import asyncio
+import json
 from loguru import logger
 from primp import AsyncClient
-import requests
-from typing import Optional, Dict
-from enum import Enum
 import time
+from typing import Optional, Dict, List, Tuple
+from enum import Enum
+
+from src.utils.circuit_breaker import get_breaker
+from src.utils.client import CLIENT_POOL
+from src.utils.metrics import REGISTRY
+
+
+CAPTCHA_API_LATENCY = REGISTRY.histogram(
+    "captcha_api_duration_seconds",
+    "Captcha provider API latency by route (direct or account session)",
+    ("provider", "route"),
+)
+CAPTCHA_API_BYTES = REGISTRY.counter(
+    "captcha_api_bytes_total",
+    "Captcha provider API traffic by route and direction",
+    ("provider", "route", "direction"),
+)
 
 
 class CaptchaError(Exception):
@@ -29,15 +45,196 @@ class ErrorCodes(Enum):
     ERROR_EMPTY_ACTION = "ERROR_EMPTY_ACTION"
 
 
-class BestCaptchaSolver:
+class CaptchaSolver:
+    """
+    Общий асинхронный интерфейс сервисов решения капчи.
+    Наследники реализуют create_task и _check_result, цикл опроса общий.
+    Ожидание можно отменить (task.cancel() или timeout в solve), не блокируя
+    event loop и другие аккаунты.
+    """
+
+    POLL_INTERVAL = 5
+    MAX_POLLS = 30
+    POLL_BATCH = 10
+
+    def __init__(
+        self,
+        api_key: str,
+        proxy: Optional[str] = None,
+        session: AsyncClient = None,
+    ):
+        self.api_key = api_key
+        self.proxy = self._format_proxy(proxy) if proxy else None
+        self.session = session
+
+    def _format_proxy(self, proxy: str):
+        return proxy
+
+    async def _client(self) -> AsyncClient:
+        # Запросы к API сервиса идут напрямую через общий клиент из пула,
+        # прокси нужен только самой задаче (PROXY_FOR_CAPTCHA)
+        return self.session or await CLIENT_POOL.acquire("")
+
+    async def _request(self, method: str, url: str, **kwargs):
+        """Запрос к API сервиса с учетом задержки и трафика по маршруту"""
+        provider = type(self).__name__
+        route = "session" if self.session else "direct"
+        client = await self._client()
+        sent = len(json.dumps(kwargs["json"])) if "json" in kwargs else 0
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        finally:
+            CAPTCHA_API_LATENCY.observe(
+                time.perf_counter() - start, provider=provider, route=route
+            )
+        CAPTCHA_API_BYTES.inc(sent, provider=provider, route=route, direction="sent")
+        CAPTCHA_API_BYTES.inc(
+            len(response.content), provider=provider, route=route, direction="received"
+        )
+        return response
+
+    async def create_task(self, sitekey: str, pageurl: str, **kwargs) -> Optional[str]:
+        raise NotImplementedError
+
+    async def _check_result(self, task_id: str) -> Tuple[bool, Optional[str]]:
+        """Возвращает (готово, токен). Готово с токеном None - решение не получено"""
+        raise NotImplementedError
+
+    async def _check_results(self, task_ids: List[str]) -> Dict[str, Tuple[bool, Optional[str]]]:
+        """
+        Проверяет сразу несколько задач. По умолчанию - по одной, не больше
+        POLL_BATCH запросов одновременно. Провайдеры с multi-id эндпоинтом
+        переопределяют этот метод.
+        """
+        results = {}
+        for start in range(0, len(task_ids), self.POLL_BATCH):
+            chunk = task_ids[start : start + self.POLL_BATCH]
+            checked = await asyncio.gather(*(self._check_result(task_id) for task_id in chunk))
+            results.update(zip(chunk, checked))
+        return results
+
+    def _poller(self) -> "ResultPoller":
+        key = (type(self), self.api_key)
+        poller = _pollers.get(key)
+        if poller is None:
+            poller = ResultPoller(self)
+            _pollers[key] = poller
+        return poller
+
+    async def get_task_result(self, task_id: str) -> Optional[str]:
+        """Получает результат решения капчи через общий опросчик провайдера"""
+        return await self._poller().wait(task_id)
+
+    async def solve(
+        self,
+        sitekey: str,
+        pageurl: str,
+        timeout: Optional[float] = None,
+        **kwargs,
+    ) -> Optional[str]:
+        """Создает задачу и дожидается решения не дольше timeout секунд"""
+        task_id = await self.create_task(sitekey, pageurl, **kwargs)
+        if not task_id:
+            return None
+
+        try:
+            return await asyncio.wait_for(self.get_task_result(task_id), timeout)
+        except asyncio.TimeoutError:
+            logger.error(f"Captcha {task_id} was not solved in {timeout} seconds")
+            return None
+
+
+def log_captcha_traffic() -> None:
+    """Итог по трафику к сервисам капчи: задержка и байты мимо прокси аккаунтов"""
+    for provider in ("Capsolver", "TwentyFourCaptchaSolver", "BestCaptchaSolver"):
+        for route in ("direct", "session"):
+            calls = CAPTCHA_API_LATENCY.count(provider=provider, route=route)
+            if not calls:
+                continue
+            latency = CAPTCHA_API_LATENCY.total(provider=provider, route=route) / calls
+            traffic = sum(
+                CAPTCHA_API_BYTES.value(provider=provider, route=route, direction=direction)
+                for direction in ("sent", "received")
+            )
+            saved = " (not sent through account proxies)" if route == "direct" else ""
+            logger.info(
+                f"{provider} API via {route}: {calls} calls, avg {latency * 1000:.0f} ms, "
+                f"{traffic / 1024:.1f} KB{saved}"
+            )
+
+
+class ResultPoller:
+    """
+    Один цикл опроса на провайдера (и API ключ) для всех ожидающих задач
+    вместо отдельного цикла на каждую капчу. Результаты раздаются ожидающим
+    по мере готовности.
+    """
+
+    def __init__(self, solver: CaptchaSolver):
+        self.solver = solver
+        self.timeout = solver.MAX_POLLS * solver.POLL_INTERVAL
+        # task_id -> (future, крайний срок)
+        self._pending: Dict[str, Tuple[asyncio.Future, float]] = {}
+        self._loop_task: Optional[asyncio.Task] = None
+
+    async def wait(self, task_id: str) -> Optional[str]:
+        waiter = asyncio.get_running_loop().create_future()
+        self._pending[task_id] = (waiter, time.monotonic() + self.timeout)
+        if self._loop_task is None or self._loop_task.done():
+            self._loop_task = asyncio.create_task(self._run())
+
+        try:
+            return await waiter
+        finally:
+            # При отмене ожидающего задача больше не опрашивается
+            entry = self._pending.get(task_id)
+            if entry and entry[0] is waiter:
+                del self._pending[task_id]
+
+    async def _run(self) -> None:
+        while self._pending:
+            # Только что созданная задача не бывает готова сразу
+            await asyncio.sleep(self.solver.POLL_INTERVAL)
+
+            task_ids = list(self._pending)
+            if not task_ids:
+                break
+            try:
+                results = await self.solver._check_results(task_ids)
+            except Exception as e:
+                logger.error(f"Error polling captcha results: {e}")
+                results = {}
+
+            now = time.monotonic()
+            for task_id in task_ids:
+                entry = self._pending.get(task_id)
+                if entry is None:
+                    continue
+                waiter, deadline = entry
+                done, token = results.get(task_id, (False, None))
+                if not done and now < deadline:
+                    continue
+
+                del self._pending[task_id]
+                if not done:
+                    logger.error(f"Max polling time reached without getting a result for {task_id}")
+                if not waiter.done():
+                    waiter.set_result(token)
+
+
+_pollers: Dict[Tuple[type, str], ResultPoller] = {}
+
+
+class BestCaptchaSolver(CaptchaSolver):
     def __init__(
         self,
         proxy: str = "",
         api_key: str = "",
+        session: AsyncClient = None,
     ):
+        super().__init__(api_key, proxy, session)
         self.base_url = "https://bcsapi.xyz/api"
-        self.proxy = self._format_proxy(proxy) if proxy else None
-        self.api_key = api_key
 
     def _format_proxy(self, proxy: str) -> Dict[str, str]:
         if not proxy:
@@ -46,7 +243,7 @@ class BestCaptchaSolver:
             return {"proxy": proxy, "proxy_type": "HTTP"}
         return {"proxy": f"http://{proxy}", "proxy_type": "HTTP"}
 
-    def create_task(
+    async def create_task(
         self,
         sitekey: str,
         pageurl: str,
@@ -71,70 +268,60 @@ class BestCaptchaSolver:
             data.update(self.proxy)
 
         try:
-            response = requests.post(
+            response = await self._request(
+                "POST",
                 f"{self.base_url}/captcha/recaptcha",
                 json=data,
                 timeout=30,
-                verify=False,
-            ).json()
+            )
+            result = response.json()
 
-            if "id" in response:
-                return response["id"]
+            if "id" in result:
+                return result["id"]
 
-            logger.error(f"Error creating task: {response}")
+            logger.error(f"Error creating task: {result}")
             return None
 
         except Exception as e:
             logger.error(f"Error creating task: {e}")
             return None
 
-    def get_task_result(self, task_id: str) -> Optional[str]:
-        """Получает результат решения капчи"""
-        params = {"access_token": self.api_key}
-
-        max_attempts = 30
-        for _ in range(max_attempts):
-            try:
-                response = requests.get(
-                    f"{self.base_url}/captcha/{task_id}",
-                    params=params,
-                    timeout=30,
-                    verify=False,
-                )
-                result = response.json()
-
-                if result.get("status") == "completed":
-                    return result["gresponse"]
-                elif "error" in response.text:
-                    logger.error(f"Error getting result: {response.text}")
-                    return None
-
-                time.sleep(5)
+    async def _check_result(self, task_id: str) -> Tuple[bool, Optional[str]]:
+        try:
+            response = await self._request(
+                "GET",
+                f"{self.base_url}/captcha/{task_id}",
+                params={"access_token": self.api_key},
+                timeout=30,
+            )
+            result = response.json()
 
-            except Exception as e:
-                logger.error(f"Error getting result: {e}")
-                return None
+            if result.get("status") == "completed":
+                return True, result["gresponse"]
+            elif "error" in response.text:
+                logger.error(f"Error getting result: {response.text}")
+                return True, None
 
-        return None
+            return False, None
 
-    def solve_recaptcha(self, sitekey: str, pageurl: str) -> Optional[str]:
-        """Решает hCaptcha и возвращает токен"""
-        task_id = self.create_task(sitekey, pageurl, True, "monad.xyz")
-        if not task_id:
-            return None
+        except Exception as e:
+            logger.error(f"Error getting result: {e}")
+            return True, None
 
-        return self.get_task_result(task_id)
+    async def solve_recaptcha(self, sitekey: str, pageurl: str) -> Optional[str]:
+        """Решает reCAPTCHA и возвращает токен"""
+        return await self.solve(sitekey, pageurl, invisible=True, domain="monad.xyz")
 
 
-class TwentyFourCaptchaSolver:
+class TwentyFourCaptchaSolver(CaptchaSolver):
     def __init__(
         self,
         api_key: str,
         proxy: Optional[str] = None,
+        session: AsyncClient = None,
     ):
-        self.api_key = api_key
+        super().__init__(api_key, proxy, session)
         self.base_url = "https://24captcha.online"
-        self.proxy = self._format_proxy(proxy) if proxy else None
 
     def _format_proxy(self, proxy: str) -> Dict[str, str]:
         if not proxy:
@@ -143,7 +330,7 @@ class TwentyFourCaptchaSolver:
             return {"proxy": proxy, "proxytype": "HTTP"}
         return {"proxy": f"http://{proxy}", "proxytype": "HTTP"}
 
-    def create_task(
+    async def create_task(
         self,
         sitekey: str,
         pageurl: str,
@@ -170,15 +357,16 @@ class TwentyFourCaptchaSolver:
             data.update(self.proxy)
 
         try:
-            response = requests.post(
-                f"{self.base_url}/in.php", json=data, timeout=30, verify=False
-            ).json()
-            logger.debug(f"Create captcha task request.")
+            response = await self._request(
+                "POST", f"{self.base_url}/in.php", json=data, timeout=30
+            )
+            result = response.json()
+            logger.debug("Create captcha task request.")
 
-            if "status" in response and response["status"] == 1:
-                return response["request"]
+            if "status" in result and result["status"] == 1:
+                return result["request"]
 
-            error = response.get("request", "Unknown error")
+            error = result.get("request", "Unknown error")
             if error in ErrorCodes.__members__:
                 logger.error(f"API Error: {error}")
             else:
@@ -189,39 +377,66 @@ class TwentyFourCaptchaSolver:
             logger.error(f"Error creating task: {e}")
             return None
 
-    def get_task_result(self, task_id: str) -> Optional[str]:
-        """Получает результат решения капчи"""
+    async def _check_result(self, task_id: str) -> Tuple[bool, Optional[str]]:
         data = {"key": self.api_key, "action": "get", "id": task_id, "json": 1}
 
-        max_attempts = 30
-        for _ in range(max_attempts):
-            try:
-                response = requests.post(
-                    f"{self.base_url}/res.php", json=data, timeout=30, verify=False
-                ).json()
+        try:
+            response = await self._request(
+                "POST", f"{self.base_url}/res.php", json=data, timeout=30
+            )
+            result = response.json()
 
-                if "status" in response and response["status"] == 1:
-                    return response["request"]
+            if "status" in result and result["status"] == 1:
+                return True, result["request"]
 
-                error = response.get("request", "Unknown error")
-                if error == "CAPCHA_NOT_READY":
-                    time.sleep(5)
-                    continue
+            error = result.get("request", "Unknown error")
+            if error == "CAPCHA_NOT_READY":
+                return False, None
 
-                if error in ErrorCodes.__members__:
-                    logger.error(f"API Error: {error}")
-                else:
-                    logger.error(f"Unknown API Error: {error}")
-                return None
+            if error in ErrorCodes.__members__:
+                logger.error(f"API Error: {error}")
+            else:
+                logger.error(f"Unknown API Error: {error}")
+            return True, None
 
-            except Exception as e:
-                logger.error(f"Error getting result: {e}")
-                return None
+        except Exception as e:
+            logger.error(f"Error getting result: {e}")
+            return True, None
+
+    async def _check_results(self, task_ids: List[str]) -> Dict[str, Tuple[bool, Optional[str]]]:
+        """res.php принимает несколько id сразу и отвечает через |"""
+        if len(task_ids) == 1:
+            return {task_ids[0]: await self._check_result(task_ids[0])}
 
-        logger.error("Max polling attempts reached without getting a result")
-        return None
+        data = {"key": self.api_key, "action": "get", "ids": ",".join(task_ids), "json": 1}
 
-    def solve_hcaptcha(
+        try:
+            response = await self._request(
+                "POST", f"{self.base_url}/res.php", json=data, timeout=30
+            )
+            answers = str(response.json().get("request", "")).split("|")
+        except Exception as e:
+            logger.error(f"Error getting results: {e}")
+            return {}
+
+        if len(answers) != len(task_ids):
+            if answers == ["CAPCHA_NOT_READY"]:
+                return {task_id: (False, None) for task_id in task_ids}
+            logger.error(f"API Error: {'|'.join(answers)}")
+            return {task_id: (True, None) for task_id in task_ids}
+
+        results = {}
+        for task_id, answer in zip(task_ids, answers):
+            if answer == "CAPCHA_NOT_READY":
+                results[task_id] = (False, None)
+            elif answer in ErrorCodes.__members__:
+                logger.error(f"API Error for {task_id}: {answer}")
+                results[task_id] = (True, None)
+            else:
+                results[task_id] = (True, answer)
+        return results
+
+    async def solve_hcaptcha(
         self,
         sitekey: str,
         pageurl: str,
@@ -230,37 +445,58 @@ class TwentyFourCaptchaSolver:
         rqdata: Optional[str] = None,
     ) -> Optional[str]:
         """Решает hCaptcha и возвращает токен"""
-        task_id = self.create_task(
-            sitekey=sitekey,
-            pageurl=pageurl,
+        return await self.solve(
+            sitekey,
+            pageurl,
             invisible=invisible,
             enterprise=enterprise,
             rqdata=rqdata,
         )
-        if not task_id:
-            return None
 
-        return self.get_task_result(task_id)
 
+class Capsolver(CaptchaSolver):
+    POLL_INTERVAL = 3
 
-class Capsolver:
     def __init__(
         self,
         api_key: str,
         proxy: Optional[str] = None,
         session: AsyncClient = None,
     ):
-        self.api_key = api_key
+        super().__init__(api_key, proxy, session)
         self.base_url = "https://api.capsolver.com"
-        self.proxy = self._format_proxy(proxy) if proxy else None
-        self.session = session or AsyncClient(verify=False)
+        # Общий для всех аккаунтов: если Capsolver лежит или кончился баланс,
+        # остальные аккаунты не тратят на него попытки
+        self.breaker = get_breaker("Capsolver")
+
+    async def _create(self, data: dict, kind: str) -> Optional[str]:
+        if not self.breaker.allow():
+            logger.warning(
+                f"Capsolver is unavailable, retry in {self.breaker.retry_in:.0f}s"
+            )
+            return None
 
-    def _format_proxy(self, proxy: str) -> str:
-        if not proxy:
+        try:
+            response = await self._request(
+                "POST",
+                f"{self.base_url}/createTask",
+                json=data,
+                timeout=30,
+            )
+            result = response.json()
+
+            if "taskId" in result:
+                self.breaker.record_success()
+                return result["taskId"]
+
+            self.breaker.record_failure()
+            logger.error(f"Error creating {kind}: {result}")
+            return None
+
+        except Exception as e:
+            self.breaker.record_failure()
+            logger.error(f"Error creating {kind}: {e}")
             return None
-        if "@" in proxy:
-            return proxy
-        return proxy
 
     async def create_task(
         self,
@@ -284,53 +520,33 @@ class Capsolver:
         if self.proxy:
             data["task"]["proxy"] = self.proxy
 
+        return await self._create(data, "task")
+
+    async def _check_result(self, task_id: str) -> Tuple[bool, Optional[str]]:
+        data = {"clientKey": self.api_key, "taskId": task_id}
+
         try:
-            response = await self.session.post(
-                f"{self.base_url}/createTask",
+            response = await self._request(
+                "POST",
+                f"{self.base_url}/getTaskResult",
                 json=data,
                 timeout=30,
             )
             result = response.json()
 
-            if "taskId" in result:
-                return result["taskId"]
+            if result.get("status") == "ready":
+                # Handle both reCAPTCHA and Turnstile responses
+                solution = result.get("solution", {})
+                return True, solution.get("token") or solution.get("gRecaptchaResponse")
+            elif "errorId" in result and result["errorId"] != 0:
+                logger.error(f"Error getting result: {result}")
+                return True, None
 
-            logger.error(f"Error creating task: {result}")
-            return None
+            return False, None
 
         except Exception as e:
-            logger.error(f"Error creating task: {e}")
-            return None
-
-    async def get_task_result(self, task_id: str) -> Optional[str]:
-        """Получает результат решения капчи"""
-        data = {"clientKey": self.api_key, "taskId": task_id}
-
-        max_attempts = 30
-        for _ in range(max_attempts):
-            try:
-                response = await self.session.post(
-                    f"{self.base_url}/getTaskResult",
-                    json=data,
-                    timeout=30,
-                )
-                result = response.json()
-
-                if result.get("status") == "ready":
-                    # Handle both reCAPTCHA and Turnstile responses
-                    solution = result.get("solution", {})
-                    return solution.get("token") or solution.get("gRecaptchaResponse")
-                elif "errorId" in result and result["errorId"] != 0:
-                    logger.error(f"Error getting result: {result}")
-                    return None
-
-                await asyncio.sleep(3)
-
-            except Exception as e:
-                logger.error(f"Error getting result: {e}")
-                return None
-
-        return None
+            logger.error(f"Error getting result: {e}")
+            return True, None
 
     async def solve_recaptcha(
         self,
@@ -339,11 +555,7 @@ class Capsolver:
         invisible: bool = False,
     ) -> Optional[str]:
         """Решает RecaptchaV2 и возвращает токен"""
-        task_id = await self.create_task(sitekey, pageurl, invisible)
-        if not task_id:
-            return None
-
-        return await self.get_task_result(task_id)
+        return await self.solve(sitekey, pageurl, invisible=invisible)
 
     async def create_turnstile_task(
         self,
@@ -369,24 +581,8 @@ class Capsolver:
         #     if cdata:
         #         metadata["cdata"] = cdata
         #     data["task"]["metadata"] = metadata
-        
-        try:
-            response = await self.session.post(
-                f"{self.base_url}/createTask",
-                json=data,
-                timeout=30,
-            )
-            result = response.json()
-
-            if "taskId" in result:
-                return result["taskId"]
 
-            logger.error(f"Error creating Turnstile task: {result}")
-            return None
-
-        except Exception as e:
-            logger.error(f"Error creating Turnstile task: {e}")
-            return None
+        return await self._create(data, "Turnstile task")
 
     async def solve_turnstile(
         self,
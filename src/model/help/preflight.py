@@ -0,0 +1,305 @@
+import asyncio
+from itertools import islice
+from typing import Any, Callable, Dict, FrozenSet, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from eth_abi import decode, encode
+from eth_account import Account
+from loguru import logger
+from web3 import Web3
+
+from src.model.accountable.constants import ACCOUNTABLE_NFT_ADDRESS
+from src.model.demask_mint.instance import DEMASK_CONTRACT
+from src.model.lilchogstars_mint.instance import LILCHOGSTARS_CONTRACT
+from src.model.monadking_mint.instance import MONADKING_CONTRACT, MONADKING_UNLOCKED_CONTRACT
+from src.model.nad_domains.constants import NAD_NFT_ADDRESS
+from src.utils.account_store import ACCOUNT_STORE
+from src.utils.config import Config
+from src.utils.constants import RPC_URL
+from src.utils.provider import create_web3
+
+
+MULTICALL3 = "0xcA11bde05977b3631167028862bE2a173976CA11"
+AGGREGATE3 = "aggregate3((address,bool,bytes)[])"
+
+# Задачи, которые выполняются для всех кошельков разом, а не в аккаунте
+FLEET_TASKS = {"logs"}
+
+EMPTY: FrozenSet[str] = frozenset()
+
+
+def _same(value: Any) -> Any:
+    return value
+
+
+class Probe(NamedTuple):
+    """
+    Один view вызов: контракт, сигнатура, аргументы от адреса, тип результата
+    и приведение результата к значению, которое проверяет задача.
+    """
+
+    target: str
+    signature: str
+    args: Callable[[str], tuple]
+    output: str
+    convert: Callable[[Any], Any] = _same
+
+
+class PreflightCheck(NamedTuple):
+    """
+    Условие "задача уже выполнена". Пробы - альтернативы, как в get_nft_balance
+    модулей: берется результат первой успешной.
+    """
+
+    task: str
+    probes: Sequence[Probe]
+    is_done: Callable[[Any], bool]
+
+
+def _selector(signature: str) -> bytes:
+    return bytes(Web3.keccak(text=signature)[:4])
+
+
+def _calldata(probe: Probe, address: str) -> bytes:
+    types = probe.signature[probe.signature.index("(") + 1 : -1].split(",")
+    return _selector(probe.signature) + encode(types, probe.args(address))
+
+
+def build_preflight_checks(config: Config) -> List[PreflightCheck]:
+    """
+    Проверки для задач из FLOW.TASKS. Для минтов берется верхняя граница
+    MAX_AMOUNT_FOR_EACH_ACCOUNT: меньше нее задача может еще что-то сминтить.
+    MagicEden проверяется только через API при минте, здесь его нет.
+    """
+    tasks = set(flatten_tasks(config.FLOW.TASKS))
+    checks = [
+        PreflightCheck(
+            "nad_domains",
+            [Probe(NAD_NFT_ADDRESS, "balanceOf(address)", lambda a: (a,), "uint256")],
+            lambda balance: balance > 0,
+        ),
+        PreflightCheck(
+            "lilchogstars",
+            [Probe(LILCHOGSTARS_CONTRACT, "mintedCount(address)", lambda a: (a,), "uint256")],
+            lambda count: count >= config.LILCHOGSTARS.MAX_AMOUNT_FOR_EACH_ACCOUNT[1],
+        ),
+        PreflightCheck(
+            "demask",
+            [
+                Probe(DEMASK_CONTRACT, "mintedCountPerWallet(address,uint256)", lambda a: (a, 0), "uint256"),
+                # Тот же токен, что в Demask.get_nft_balance
+                Probe(DEMASK_CONTRACT, "balanceOf(address,uint256)", lambda a: (a, 46917), "uint256"),
+            ],
+            lambda count: count >= config.DEMASK.MAX_AMOUNT_FOR_EACH_ACCOUNT[1],
+        ),
+        PreflightCheck(
+            "monadking",
+            [
+                Probe(MONADKING_CONTRACT, "tokensOfOwner(address)", lambda a: (a,), "uint256[]", len),
+                Probe(MONADKING_CONTRACT, "balanceOf(address,uint256)", lambda a: (a, 0), "uint256"),
+            ],
+            lambda count: count >= config.MONADKING.MAX_AMOUNT_FOR_EACH_ACCOUNT[1],
+        ),
+        PreflightCheck(
+            "monadking_unlocked",
+            [
+                Probe(MONADKING_UNLOCKED_CONTRACT, "tokensOfOwner(address)", lambda a: (a,), "uint256[]", len),
+                Probe(MONADKING_UNLOCKED_CONTRACT, "balanceOf(address,uint256)", lambda a: (a, 0), "uint256"),
+            ],
+            lambda count: count >= config.MONADKING.MAX_AMOUNT_FOR_EACH_ACCOUNT[1],
+        ),
+        PreflightCheck(
+            "accountable",
+            [
+                # Все 7 ID одним вызовом вместо семи balanceOf
+                Probe(
+                    ACCOUNTABLE_NFT_ADDRESS,
+                    "balanceOfBatch(address[],uint256[])",
+                    lambda a: ([a] * 7, list(range(1, 8))),
+                    "uint256[]",
+                )
+            ],
+            lambda balances: all(balance > 0 for balance in balances),
+        ),
+        PreflightCheck(
+            "gaszip",
+            [Probe(MULTICALL3, "getEthBalance(address)", lambda a: (a,), "uint256")],
+            lambda balance: balance >= Web3.to_wei(config.GASZIP.MINIMUM_BALANCE_TO_REFUEL, "ether"),
+        ),
+    ]
+    return [check for check in checks if check.task in tasks]
+
+
+def flatten_tasks(tasks: list) -> Iterator[str]:
+    for task in tasks:
+        if isinstance(task, list):
+            yield from flatten_tasks(task)
+        else:
+            yield task.lower()
+
+
+def prune_tasks(tasks: list, done: FrozenSet[str]) -> list:
+    """
+    FLOW.TASKS без выполненных задач. Из группы [a, b, c] убираются
+    выполненные варианты, пустая группа убирается целиком.
+    """
+    if not done:
+        return tasks
+    pruned = []
+    for task in tasks:
+        if isinstance(task, list):
+            options = [option for option in task if option.lower() not in done]
+            if options:
+                pruned.append(options)
+        elif task.lower() not in done:
+            pruned.append(task)
+    return pruned
+
+
+def has_account_work(tasks: list) -> bool:
+    return any(isinstance(task, list) or task.lower() not in FLEET_TASKS for task in tasks)
+
+
+class AddressIndex:
+    """
+    Адреса выбранных аккаунтов по позиции в выборке. Считаются один раз в
+    preflight и потом отдаются аккаунтам: 20 байт на аккаунт вместо строки.
+    """
+
+    def __init__(self, size: int):
+        self._data = bytearray(20 * size)
+        self._filled = bytearray(size)
+
+    def set(self, position: int, address: str) -> None:
+        self._data[20 * position : 20 * position + 20] = bytes.fromhex(address[2:])
+        self._filled[position] = 1
+
+    def get(self, position: int) -> str:
+        """Пустая строка - адрес не считался"""
+        if not self._filled[position]:
+            return ""
+        return Web3.to_checksum_address(bytes(self._data[20 * position : 20 * position + 20]))
+
+
+def _with_addresses(
+    chunk: List[Tuple[int, int, str]], addresses: Optional[AddressIndex]
+) -> List[Tuple[int, str]]:
+    """(позиция, номер, ключ) -> (номер, адрес), адреса сохраняются в addresses"""
+    result = []
+    for position, number, private_key in chunk:
+        address = Account.from_key(private_key).address
+        if addresses is not None:
+            addresses.set(position, address)
+        result.append((number, address))
+    return result
+
+
+class FleetPreflight:
+    """
+    Состояние всех кошельков до запуска аккаунтов: условия "уже выполнено"
+    из модулей проверяются view вызовами, упакованными в Multicall3
+    aggregate3, по BATCH_SIZE аккаунтов на один eth_call.
+    """
+
+    def __init__(self, config: Config, checks: List[PreflightCheck]):
+        self.config = config
+        self.checks = checks
+        self.w3 = create_web3(RPC_URL)
+        self.accounts_per_batch = max(config.PREFLIGHT.BATCH_SIZE, 1)
+        self.concurrency = config.PREFLIGHT.CONCURRENCY
+        self.calls = 0
+
+    async def sweep(
+        self,
+        accounts: Iterable[Tuple[int, str]],
+        addresses: Optional[AddressIndex] = None,
+    ) -> Dict[int, FrozenSet[str]]:
+        """
+        accounts - (номер, приватный ключ). Возвращает выполненные задачи по
+        номеру аккаунта, аккаунты без выполненных задач не попадают в ответ.
+        addresses заполняется адресами по позиции аккаунта в accounts.
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+        done: Dict[int, FrozenSet[str]] = {}
+        checked = 0
+
+        async def run(chunk: List[Tuple[int, int, str]]) -> None:
+            nonlocal checked
+            try:
+                # Адреса из ключей считаются в потоке, чтобы не держать цикл событий
+                wallets = await asyncio.to_thread(_with_addresses, chunk, addresses)
+                results = await self._fetch(wallets)
+                checked += len(wallets)
+                records = []
+                for (number, address), tasks in zip(wallets, results):
+                    if tasks:
+                        done[number] = tasks
+                        records.extend((address, task, True) for task in tasks)
+                await asyncio.to_thread(ACCOUNT_STORE.record_tasks, records)
+            finally:
+                semaphore.release()
+
+        tasks = []
+        for chunk in self._chunks(accounts):
+            await semaphore.acquire()
+            tasks.append(asyncio.create_task(run(chunk)))
+        await asyncio.gather(*tasks)
+
+        logger.info(
+            f"Preflight: {checked} accounts checked in {self.calls} multicalls, "
+            f"{sum(len(tasks) for tasks in done.values())} tasks already done "
+            f"({', '.join(check.task for check in self.checks)})"
+        )
+        return done
+
+    def _chunks(self, accounts: Iterable[Tuple[int, str]]) -> Iterator[List[Tuple[int, int, str]]]:
+        """(позиция, номер, ключ) пачками по accounts_per_batch"""
+        iterator = ((position, number, key) for position, (number, key) in enumerate(accounts))
+        while True:
+            chunk = list(islice(iterator, self.accounts_per_batch))
+            if not chunk:
+                return
+            yield chunk
+
+    async def _fetch(self, chunk: List[Tuple[int, str]]) -> List[FrozenSet[str]]:
+        calls = [
+            (probe.target, True, _calldata(probe, address))
+            for _, address in chunk
+            for check in self.checks
+            for probe in check.probes
+        ]
+        try:
+            self.calls += 1
+            raw = await self.w3.eth.call(
+                {
+                    "to": MULTICALL3,
+                    "data": _selector(AGGREGATE3) + encode(["(address,bool,bytes)[]"], [calls]),
+                }
+            )
+            (responses,) = decode(["(bool,bytes)[]"], raw)
+        except Exception as e:
+            if len(chunk) == 1:
+                # Не знаем состояние - аккаунт выполняет все задачи как обычно
+                logger.error(f"Preflight failed for {chunk[0][1]}: {e}")
+                return [EMPTY]
+            middle = len(chunk) // 2
+            return await self._fetch(chunk[:middle]) + await self._fetch(chunk[middle:])
+
+        results = []
+        position = 0
+        for _ in chunk:
+            tasks = set()
+            for check in self.checks:
+                value = None
+                for probe in check.probes:
+                    success, data = responses[position]
+                    position += 1
+                    if value is None and success and data:
+                        try:
+                            (decoded,) = decode([probe.output], data)
+                        except Exception:
+                            continue
+                        value = probe.convert(decoded)
+                if value is not None and check.is_done(value):
+                    tasks.add(check.task)
+            results.append(frozenset(tasks))
+        return results
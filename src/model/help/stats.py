@@ -1,12 +1,17 @@
+import asyncio
+import time
+from itertools import islice
 from web3 import AsyncWeb3
 from eth_account import Account
 from loguru import logger
-from typing import Optional, Tuple
+from typing import Callable, Iterable, Iterator, List, Tuple
 from dataclasses import dataclass
-from threading import Lock
 
+from src.utils.account_store import ACCOUNT_STORE
 from src.utils.constants import RPC_URL
 from src.utils.config import Config
+from src.utils.provider import create_web3
+from src.utils.statistics import WalletStatsAggregator, create_stats_exporter
 
 
 @dataclass
@@ -18,56 +23,135 @@ class WalletInfo:
     transactions: int
 
 
-class WalletStats:
+def with_addresses(chunk: List[Tuple[int, str]]) -> List[Tuple[int, str, str]]:
+    """(номер, ключ) -> (номер, ключ, адрес)"""
+    return [
+        (number, private_key, Account.from_key(private_key).address)
+        for number, private_key in chunk
+    ]
+
+
+class FleetStatsCollector:
+    """
+    Баланс и nonce для всех кошельков сразу: адреса упаковываются в JSON-RPC
+    батчи (два запроса на кошелек), несколько батчей идут параллельно.
+    Один AsyncWeb3 на весь запуск вместо отдельного на каждый аккаунт.
+    """
+
     def __init__(self, config: Config):
-        # Используем публичную RPC ноду Base
-        self.w3 = AsyncWeb3(AsyncWeb3.AsyncHTTPProvider(RPC_URL))
         self.config = config
-        self._lock = Lock()
+        self.w3 = create_web3(RPC_URL)
+        # Запросов в батче, по два на кошелек
+        self.wallets_per_batch = max(config.STATS.BATCH_SIZE // 2, 1)
+        self.concurrency = config.STATS.CONCURRENCY
+        self.export_path = ""
 
-    async def get_wallet_stats(
-        self, private_key: str, account_index: int
-    ) -> Optional[bool]:
+    async def collect(self, accounts: Iterable[Tuple[int, str]]) -> WalletStatsAggregator:
+        """
+        accounts - (номер, приватный ключ), читается по частям. Кошельки не
+        копятся в памяти: каждая пачка сразу идет в агрегатор, экспорт и базу.
         """
-        Получает статистику кошелька и сохраняет в конфиг
+        semaphore = asyncio.Semaphore(self.concurrency)
+        stats = WalletStatsAggregator(self.config.STATS.TOP_N)
+        exporter = create_stats_exporter(self.config.STATS.EXPORT_PATH)
+        self.export_path = exporter.path if exporter else ""
+        # Один момент времени на весь снимок истории, даже если сбор идет минуты
+        snapshot_ts = int(time.time())
 
-        Args:
-            private_key: Приватный ключ кошелька
-            account_index: Индекс аккаунта
+        async def run(chunk: List[Tuple[int, str]]) -> None:
+            try:
+                # Адреса из ключей считаются в потоке, чтобы не держать цикл событий
+                wallets = await self._fetch(await asyncio.to_thread(with_addresses, chunk))
+                for wallet in wallets:
+                    stats.add(wallet)
+                if exporter and wallets:
+                    await asyncio.to_thread(exporter.write, wallets)
+                await asyncio.to_thread(
+                    ACCOUNT_STORE.update_wallets,
+                    [(wallet.address, wallet.transactions, wallet.balance) for wallet in wallets],
+                    snapshot_ts,
+                )
+            finally:
+                semaphore.release()
 
-        Returns:
-            bool: True если успешно, False если ошибка
-        """
+        tasks = []
         try:
-            # Получаем адрес из приватного ключа
-            account = Account.from_key(private_key)
-            address = account.address
+            for chunk in self._chunks(accounts):
+                # Ждем свободного места до того, как готовить следующий батч
+                await semaphore.acquire()
+                tasks.append(asyncio.create_task(run(chunk)))
+            await asyncio.gather(*tasks)
+        finally:
+            # При отмене пачки еще могут писать в экспорт: останавливаем их до закрытия файла
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            if exporter:
+                await asyncio.to_thread(exporter.close)
+        return stats
 
-            # Получаем баланс
-            balance_wei = await self.w3.eth.get_balance(address)
-            balance_eth = self.w3.from_wei(balance_wei, "ether")
+    async def run_periodically(
+        self, accounts: Callable[[], Iterable[Tuple[int, str]]], interval: float
+    ) -> None:
+        """Сбор по расписанию во время работы, в лог - только итоговая строка"""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                stats = await self.collect(accounts())
+                logger.info(
+                    f"Fleet stats: {stats.count} wallets, "
+                    f"{stats.total_balance:.4f} MON, "
+                    f"{stats.total_transactions:,} transactions"
+                )
+            except Exception as e:
+                logger.error(f"Error collecting fleet stats: {e}")
 
-            # Получаем количество транзакций (nonce)
-            tx_count = await self.w3.eth.get_transaction_count(address)
+    def log_history_change(self) -> None:
+        """Сравнение с предыдущим снимком из истории: что изменилось с прошлого запуска"""
+        if not ACCOUNT_STORE.enabled:
+            return
+        snapshots = ACCOUNT_STORE.fleet_history()[-2:]
+        if len(snapshots) < 2:
+            return
+        (previous_ts, previous_count, previous_balance, previous_nonce), (
+            _, count, balance, nonce,
+        ) = snapshots
+        logger.info(
+            f"Since the snapshot at {time.strftime('%Y-%m-%d %H:%M', time.localtime(previous_ts))}: "
+            f"wallets {count - previous_count:+,}, balance {balance - previous_balance:+.4f} MON, "
+            f"transactions {nonce - previous_nonce:+,}"
+        )
 
-            wallet_info = WalletInfo(
-                account_index=account_index,
-                private_key=private_key,
-                address=address,
-                balance=float(balance_eth),
-                transactions=tx_count,
-            )
+    def _chunks(self, accounts: Iterable[Tuple[int, str]]) -> Iterator[List[Tuple[int, str]]]:
+        iterator = iter(accounts)
+        while True:
+            chunk = list(islice(iterator, self.wallets_per_batch))
+            if not chunk:
+                return
+            yield chunk
 
-            with self._lock:
-                self.config.WALLETS.wallets.append(wallet_info)
+    async def _fetch(self, chunk: List[Tuple[int, str, str]]) -> List[WalletInfo]:
+        try:
+            async with self.w3.batch_requests() as batch:
+                for _, _, address in chunk:
+                    batch.add(self.w3.eth.get_balance(address))
+                    batch.add(self.w3.eth.get_transaction_count(address))
+                responses = await batch.async_execute()
+        except Exception as e:
+            if len(chunk) == 1:
+                logger.error(f"Error getting wallet stats for {chunk[0][2]}: {e}")
+                return []
+            # Одна ошибка валит весь батч: делим пополам, чтобы найти виновника
+            middle = len(chunk) // 2
+            return await self._fetch(chunk[:middle]) + await self._fetch(chunk[middle:])
 
-            logger.info(
-                f"Wallet {address}: Balance = {balance_eth:.4f} MON, "
-                f"Transactions = {tx_count}"
+        return [
+            WalletInfo(
+                account_index=number,
+                private_key=private_key,
+                address=address,
+                balance=float(self.w3.from_wei(responses[2 * i], "ether")),
+                transactions=responses[2 * i + 1],
             )
-
-            return True
-
-        except Exception as e:
-            logger.error(f"Error getting wallet stats: {e}")
-            return False
+            for i, (number, private_key, address) in enumerate(chunk)
+        ]
@@ -9,6 +9,8 @@ from typing import Dict
 
 from src.utils.config import Config
 from src.utils.constants import EXPLORER_URL, RPC_URL
+from src.utils.provider import create_web3
+from src.utils.retry import RetryPolicy
 from .constants import STAKE_ADDRESS, STAKE_ABI
 
 
@@ -28,7 +30,8 @@ class Kintsu:
         self.session = session
 
         self.account: Account = Account.from_key(private_key=private_key)
-        self.web3 = AsyncWeb3(AsyncWeb3.AsyncHTTPProvider(RPC_URL))
+        self.web3 = create_web3(RPC_URL)
+        self.retry_policy = RetryPolicy(config)
 
     async def get_gas_params(self) -> Dict[str, int]:
         """Get current gas parameters from the network."""
@@ -93,7 +96,7 @@ class Kintsu:
 
                 # Estimate gas
                 estimated_gas = await self.estimate_gas(transaction)
-                logger.info(f"[{self.account_index}] Estimated gas: {estimated_gas}")
+                logger.debug("[{}] Estimated gas: {}", self.account_index, estimated_gas)
 
                 # Add remaining transaction parameters
                 transaction.update(
@@ -115,8 +118,8 @@ class Kintsu:
                 )
 
                 # Wait for transaction confirmation
-                logger.info(
-                    f"[{self.account_index}] Waiting for transaction confirmation..."
+                logger.debug(
+                    "[{}] Waiting for transaction confirmation...", self.account_index
                 )
                 await self.web3.eth.wait_for_transaction_receipt(tx_hash)
 
@@ -135,14 +138,11 @@ class Kintsu:
                     self.config.KINTSU.AMOUNT_TO_STAKE = (0.04, 0.05)
                     continue
 
-                random_pause = random.randint(
-                    self.config.SETTINGS.PAUSE_BETWEEN_ATTEMPTS[0],
-                    self.config.SETTINGS.PAUSE_BETWEEN_ATTEMPTS[1],
-                )
                 logger.error(
-                    f"[{self.account_index}] | Error in stake_mon on Kintsu: {e}. Sleeping for {random_pause} seconds"
+                    f"[{self.account_index}] | Error in stake_mon on Kintsu: {e}"
                 )
-                await asyncio.sleep(random_pause)
+                if not await self.retry_policy.should_retry(e, retry, "kintsu"):
+                    break
         return False
 
     async def get_token_balance(self, token_symbol: str) -> Decimal:
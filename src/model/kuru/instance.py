@@ -9,6 +9,7 @@ from primp import AsyncClient
 from web3 import AsyncWeb3
 from src.utils.config import Config
 from src.utils.constants import RPC_URL
+from src.utils.provider import create_web3
 
 
 class Kuru:
@@ -27,7 +28,7 @@ class Kuru:
         self.session = session
 
         self.account: Account = Account.from_key(private_key=private_key)
-        self.web3 = AsyncWeb3(AsyncWeb3.AsyncHTTPProvider(RPC_URL))
+        self.web3 = create_web3(RPC_URL)
 
     async def create_wallet(self):
         for retry in range(self.config.SETTINGS.ATTEMPTS):
@@ -1,4 +1,3 @@
-import asyncio
 import random
 from eth_account import Account
 from primp import AsyncClient
@@ -7,8 +6,12 @@ from web3.contract import Contract
 
 from src.utils.constants import EXPLORER_URL, RPC_URL
 from src.utils.config import Config
+from src.utils.provider import create_web3
+from src.utils.retry import RetryPolicy
 from loguru import logger
 
+LILCHOGSTARS_CONTRACT = "0xb33D7138c53e516871977094B249C8f2ab89a4F4"  # Updated contract address
+
 # Обновляем ABI для контракта NFT
 ERC1155_ABI = [
     {
@@ -58,14 +61,13 @@ class Lilchogstars:
         self.proxy = proxy
         self.private_key = private_key
         self.config = config
+        self.retry_policy = RetryPolicy(config)
         self.session = session
 
         self.account: Account = Account.from_key(private_key=private_key)
-        self.web3 = AsyncWeb3(AsyncWeb3.AsyncHTTPProvider(RPC_URL))
+        self.web3 = create_web3(RPC_URL)
 
-        self.nft_contract_address = (
-            "0xb33D7138c53e516871977094B249C8f2ab89a4F4"  # Updated contract address
-        )
+        self.nft_contract_address = LILCHOGSTARS_CONTRACT
         self.nft_contract: Contract = self.web3.eth.contract(
             address=self.nft_contract_address, abi=ERC1155_ABI
         )
@@ -152,13 +154,10 @@ class Lilchogstars:
                     return False
 
             except Exception as e:
-                random_pause = random.randint(
-                    self.config.SETTINGS.RANDOM_PAUSE_BETWEEN_ACTIONS[0],
-                    self.config.SETTINGS.RANDOM_PAUSE_BETWEEN_ACTIONS[1],
-                )
                 logger.error(
-                    f"[{self.account_index}] Error in mint on Lilchogstars: {e}. Sleeping for {random_pause} seconds"
+                    f"[{self.account_index}] Error in mint on Lilchogstars: {e}"
                 )
-                await asyncio.sleep(random_pause)
+                if not await self.retry_policy.should_retry(e, retry, "lilchogstars"):
+                    break
 
         return False
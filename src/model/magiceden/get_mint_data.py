@@ -5,6 +5,8 @@ from eth_account import Account
 from eth_account.signers.local import LocalAccount
 from primp import AsyncClient
 
+from src.utils.circuit_breaker import get_breaker
+
 
 async def get_mint_data(
     session: AsyncClient,
@@ -29,10 +31,17 @@ async def get_mint_data(
     """
     error_log_frequency = 5  # Выводить ошибки каждую 5-ю попытку
     error = ""
+    breaker = get_breaker("MagicEden API")
     for attempt in range(1, max_retries + 1):
         should_log = (
             attempt % error_log_frequency == 0 or attempt == 1 or attempt == max_retries
         )
+        if not breaker.allow():
+            logger.warning(
+                f"⚠️ MagicEden API is unavailable for all accounts, retry in {breaker.retry_in:.0f}s. Skipping mint."
+            )
+            return None
+        response = None
         try:
             # Create a random referrer address
             random_wallet = Account.create()
@@ -63,10 +72,15 @@ async def get_mint_data(
                 timeout=30,  # Increase timeout
             )
 
+            if response.status_code >= 500:
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+
             if response.status_code == 200:
                 return response.json()
             
-            if "Token has no eligible mints":
+            if "Token has no eligible mints" in response.text:
                 logger.warning(
                     f"💀 Wait a bit, MagicEden API returned wrong data..."
                 )
@@ -118,6 +132,9 @@ async def get_mint_data(
                     )
 
         except Exception as e:
+            # Сервис виноват, только если ответа нет; ошибка разбора ответа - нет
+            if response is None:
+                breaker.record_failure()
             if attempt < max_retries:
                 wait_time = retry_delay * attempt
                 # Специальная обработка для ошибок подключения
@@ -7,6 +7,8 @@ from web3 import AsyncWeb3
 from src.utils.config import Config
 from src.model.magiceden.get_mint_data import get_mint_data
 from src.utils.constants import EXPLORER_URL, RPC_URL
+from src.utils.provider import create_web3
+from src.utils.retry import note_error
 
 
 class MagicEden:
@@ -19,7 +21,7 @@ class MagicEden:
         self.account = Account.from_key(private_key)
         self.session: AsyncClient = session
 
-        self.web3 = AsyncWeb3(AsyncWeb3.AsyncHTTPProvider(RPC_URL))
+        self.web3 = create_web3(RPC_URL)
 
     async def mint(self) -> bool:
         """
@@ -254,6 +256,7 @@ class MagicEden:
                 return False
 
         except Exception as e:
+            note_error(e)
             logger.error(
                 f"[{self.account_index}] | ❌ Error minting MagicEden NFT: {e}"
             )
@@ -1,4 +1,3 @@
-import asyncio
 import random
 from eth_account import Account
 from primp import AsyncClient
@@ -8,6 +7,8 @@ from typing import Dict
 
 from src.utils.config import Config
 from src.utils.constants import RPC_URL, EXPLORER_URL
+from src.utils.provider import create_web3
+from src.utils.retry import RetryPolicy
 from .constants import STAKE_ADDRESS, STAKE_ABI
 
 
@@ -24,10 +25,11 @@ class Magma:
         self.proxy = proxy
         self.private_key = private_key
         self.config = config
+        self.retry_policy = RetryPolicy(config)
         self.session = session
 
         self.account: Account = Account.from_key(private_key=private_key)
-        self.web3 = AsyncWeb3(AsyncWeb3.AsyncHTTPProvider(RPC_URL))
+        self.web3 = create_web3(RPC_URL)
 
     async def get_gas_params(self) -> Dict[str, int]:
         """Get current gas parameters from the network."""
@@ -84,7 +86,7 @@ class Magma:
 
                 # Оцениваем газ
                 estimated_gas = await self.estimate_gas(transaction)
-                logger.info(f"[{self.account_index}] Estimated gas: {estimated_gas}")
+                logger.debug("[{}] Estimated gas: {}", self.account_index, estimated_gas)
 
                 # Добавляем остальные параметры транзакции
                 transaction.update(
@@ -106,8 +108,8 @@ class Magma:
                 )
 
                 # Ждем подтверждения транзакции
-                logger.info(
-                    f"[{self.account_index}] Waiting for transaction confirmation..."
+                logger.debug(
+                    "[{}] Waiting for transaction confirmation...", self.account_index
                 )
                 await self.web3.eth.wait_for_transaction_receipt(tx_hash)
 
@@ -117,14 +119,10 @@ class Magma:
                 return True
 
             except Exception as e:
-                random_pause = random.randint(
-                    self.config.SETTINGS.RANDOM_PAUSE_BETWEEN_ACTIONS[0],
-                    self.config.SETTINGS.RANDOM_PAUSE_BETWEEN_ACTIONS[1],
-                )
                 logger.error(
-                    f"[{self.account_index}] Error in stake_mon on Magma: {e}. Sleeping for {random_pause} seconds"
+                    f"[{self.account_index}] Error in stake_mon on Magma: {e}"
                 )
-                await asyncio.sleep(random_pause)
-                continue
+                if not await self.retry_policy.should_retry(e, retry, "magma"):
+                    break
 
         return False
@@ -9,6 +9,7 @@ from web3 import AsyncWeb3
 
 from src.utils.config import Config
 from src.utils.constants import RPC_URL
+from src.utils.provider import create_web3
 
 
 class MonadCurvance:
@@ -27,7 +28,7 @@ class MonadCurvance:
         self.session = session
 
         self.account: Account = Account.from_key(private_key=private_key)
-        self.web3 = AsyncWeb3(AsyncWeb3.AsyncHTTPProvider(RPC_URL))
+        self.web3 = create_web3(RPC_URL)
 
 
     async def login(self):
@@ -9,10 +9,11 @@ from src.utils.constants import RPC_URL, EXPLORER_URL, ERC20_ABI
 from src.model.monad_xyz.constants import BEAN_CONTRACT, BEAN_ABI, BEAN_TOKENS
 import time
 from src.utils.config import Config
+from src.utils.provider import create_web3
 
 class BeanDex:
     def __init__(self, private_key: str, proxy: Optional[str] = None, config: Config = None):
-        self.web3 = AsyncWeb3(AsyncWeb3.AsyncHTTPProvider(RPC_URL))
+        self.web3 = create_web3(RPC_URL)
         self.account = Account.from_key(private_key)
         self.proxy = proxy
         self.router_contract = self.web3.eth.contract(
@@ -121,7 +122,7 @@ class BeanDex:
         signed_txn = self.web3.eth.account.sign_transaction(transaction, self.account.key)
         tx_hash = await self.web3.eth.send_raw_transaction(signed_txn.raw_transaction)
         
-        logger.info("Waiting for transaction confirmation...")
+        logger.debug("Waiting for transaction confirmation...")
         receipt = await self.web3.eth.wait_for_transaction_receipt(tx_hash, poll_latency=2)
         
         if receipt['status'] == 1:
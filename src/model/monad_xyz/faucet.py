@@ -3,30 +3,139 @@ import secrets
 import random
 import primp
 from loguru import logger
-from src.model.help import Capsolver
+from src.model.monad_xyz.token_pool import get_turnstile_pool
+from src.utils.circuit_breaker import CircuitState, get_breaker
 from src.utils.config import Config
+from src.utils.tracing import span
 from eth_account import Account
 
 
+# Результаты claim_faucet
+CLAIMED = "claimed"
+ALREADY_CLAIMED = "already_claimed"
+RETRY = "retry"  # стоит повторить с новой капчей
+FAILED = "failed"  # повторять бессмысленно
+UNAVAILABLE = "unavailable"  # кран отключен предохранителем, запрос не отправлялся
+
+FAUCET_HEADERS = {
+    "accept": "*/*",
+    "accept-language": "fr-CH,fr;q=0.9,en-US;q=0.8,en;q=0.7",
+    "content-type": "application/json",
+    "origin": "https://testnet.monad.xyz",
+    "priority": "u=1, i",
+    "referer": "https://testnet.monad.xyz/",
+    "sec-ch-ua": '"Not A(Brand";v="8", "Chromium";v="131", "Google Chrome";v="131"',
+    "sec-ch-ua-mobile": "?0",
+    "sec-ch-ua-platform": '"Windows"',
+    "sec-fetch-dest": "empty",
+    "sec-fetch-mode": "cors",
+    "sec-fetch-site": "same-origin",
+    "user-agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36",
+}
+
+
+async def claim_faucet(
+    session: primp.AsyncClient,
+    account_index: int,
+    wallet: Account,
+    captcha_token: str,
+    allowed: bool = False,
+) -> str:
+    """
+    Отправляет запрос на кран с уже решенной капчей.
+    allowed - вызывающий уже получил разрешение предохранителя через allow()
+    """
+    breaker = get_breaker("monad.xyz faucet")
+    if not allowed and not breaker.allow():
+        logger.warning(
+            f"[{account_index}] | Faucet is unavailable for all accounts, skipping faucet."
+        )
+        return UNAVAILABLE
+
+    json_data = {
+        "address": wallet.address,
+        "visitorId": secrets.token_hex(16),
+        "cloudFlareResponseToken": captcha_token,
+    }
+
+    response = await session.post(
+        "https://testnet.monad.xyz/api/claim",
+        headers=FAUCET_HEADERS,
+        json=json_data,
+    )
+
+    if "Claimed already" in response.text:
+        breaker.record_success()
+        logger.success(f"[{account_index}] | Already claimed tokens from faucet")
+        return ALREADY_CLAIMED
+
+    if response.status_code == 200:
+        breaker.record_success()
+        logger.success(f"[{account_index}] | Successfully got tokens from faucet")
+        return CLAIMED
+
+    if response.status_code >= 500 or any(
+        marker in response.text
+        for marker in (
+            "FUNCTION_INVOCATION_TIMEOUT",
+            "Server error on QuickNode API",
+            "Over Enterprise free quota",
+        )
+    ):
+        breaker.record_failure()
+
+    if "FUNCTION_INVOCATION_TIMEOUT" in response.text:
+        logger.error(
+            f"[{account_index}] | Failed to get tokens from faucet: server is not responding, wait..."
+        )
+    elif "Server error on QuickNode API" in response.text:
+        logger.error(f"[{account_index}] | FAUCET DOES NOT WORK, QUICKNODE IS DOWN")
+    elif "Over Enterprise free quota" in response.text:
+        logger.error(
+            f"[{account_index}] | MONAD IS SHIT, FAUCET DOES NOT WORK, TRY LATER"
+        )
+        return FAILED
+    elif "invalid-keys" in response.text:
+        logger.error(f"[{account_index}] | PLEASE UPDATE THE BOT USING GITHUB")
+        return FAILED
+    else:
+        logger.error(f"[{account_index}] | Failed to get tokens from faucet")
+    return RETRY
+
+
+async def _wait_for_faucet(breaker, account_index: int) -> bool:
+    """True - можно отправлять запрос, False - кран недоступен для всех аккаунтов"""
+    while True:
+        if breaker.state == CircuitState.OPEN:
+            logger.warning(
+                f"[{account_index}] | Faucet is unavailable for all accounts, retry in {breaker.retry_in:.0f}s. Skipping faucet."
+            )
+            return False
+        if breaker.allow():
+            return True
+        await asyncio.sleep(1)
+
+
 async def faucet(
     session: primp.AsyncClient,
     account_index: int,
     config: Config,
     wallet: Account,
 ) -> bool:
+    breaker = get_breaker("monad.xyz faucet")
+    token_pool = get_turnstile_pool(config)
+    token_pool.account_started()
     for retry in range(config.SETTINGS.ATTEMPTS):
+        # Разрешение предохранителя берем до токена, чтобы не тратить капчу:
+        # в HALF_OPEN токен берет только аккаунт с пробным запросом,
+        # остальные ждут его результата
+        if not await _wait_for_faucet(breaker, account_index):
+            return False
         try:
-            solver = Capsolver(
-                config.FAUCET.CAPSOLVER_API_KEY,
-                config.FAUCET.PROXY_FOR_CAPTCHA,
-                session,
-            )
+            # Токены решаются заранее в фоне, здесь берем готовый
             for _ in range(3):
-                result = await solver.solve_turnstile(
-                    "0x4AAAAAAA-3X4Nd7hf3mNGx",
-                    "https://testnet.monad.xyz/",
-                    True,
-                )
+                with span("wait_turnstile_token", "captcha"):
+                    result = await token_pool.get()
                 if result:
                     logger.success(f"{wallet.address} | Captcha solved for faucet")
                     break
@@ -38,73 +147,14 @@ async def faucet(
             if not result:
                 raise Exception("failed to solve captcha for faucet 3 times")
 
-            headers = {
-                "accept": "*/*",
-                "accept-language": "fr-CH,fr;q=0.9,en-US;q=0.8,en;q=0.7",
-                "content-type": "application/json",
-                "origin": "https://testnet.monad.xyz",
-                "priority": "u=1, i",
-                "referer": "https://testnet.monad.xyz/",
-                "sec-ch-ua": '"Not A(Brand";v="8", "Chromium";v="131", "Google Chrome";v="131"',
-                "sec-ch-ua-mobile": "?0",
-                "sec-ch-ua-platform": '"Windows"',
-                "sec-fetch-dest": "empty",
-                "sec-fetch-mode": "cors",
-                "sec-fetch-site": "same-origin",
-                "user-agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36",
-            }
-
-            visitor_id = secrets.token_hex(16)
-
-            json_data = {
-                "address": wallet.address,
-                "visitorId": visitor_id,
-                "cloudFlareResponseToken": result,
-            }
-
-            for _ in range(config.SETTINGS.ATTEMPTS):
-                response = await session.post(
-                    "https://testnet.monad.xyz/api/claim",
-                    headers=headers,
-                    json=json_data,
-                )
-
-                if "Claimed already" in response.text:
-                    logger.success(
-                        f"[{account_index}] | Already claimed tokens from faucet"
-                    )
-                    return True
-
-                if response.status_code == 200:
-                    logger.success(
-                        f"[{account_index}] | Successfully got tokens from faucet"
-                    )
-                    return True
-                else:
-                    if "FUNCTION_INVOCATION_TIMEOUT" in response.text:
-                        logger.error(
-                            f"[{account_index}] | Failed to get tokens from faucet: server is not responding, wait..."
-                        )
-                    elif "Server error on QuickNode API" in response.text:
-                        logger.error(
-                            f"[{account_index}] | FAUCET DOES NOT WORK, QUICKNODE IS DOWN"
-                        )
-                    elif "Over Enterprise free quota" in response.text:
-                        logger.error(
-                            f"[{account_index}] | MONAD IS SHIT, FAUCET DOES NOT WORK, TRY LATER"
-                        )
-                        return False
-                    elif "invalid-keys" in response.text:
-                        logger.error(
-                            f"[{account_index}] | PLEASE UPDATE THE BOT USING GITHUB"
-                        )
-                        return False
-                    else:
-                        logger.error(
-                            f"[{account_index}] | Failed to get tokens from faucet"
-                        )
-                    await asyncio.sleep(3)
-                    break
+            status = await claim_faucet(
+                session, account_index, wallet, result, allowed=True
+            )
+            if status in (CLAIMED, ALREADY_CLAIMED):
+                return True
+            if status in (FAILED, UNAVAILABLE):
+                return False
+            await asyncio.sleep(3)
 
         except Exception as e:
             random_pause = random.randint(
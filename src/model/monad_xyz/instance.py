@@ -10,6 +10,8 @@ from src.model.monad_xyz.izumi import IzumiDex
 from src.model.monad_xyz.uniswap_swaps import MonadSwap
 from src.model.monad_xyz.faucet import faucet
 from src.utils.config import Config
+from src.utils.retry import RetryPolicy
+from src.utils.tracing import sleep
 
 
 class MonadXYZ:
@@ -30,6 +32,7 @@ class MonadXYZ:
         self.session: primp.AsyncClient = session
 
         self.wallet = Account.from_key(private_key)
+        self.retry_policy = RetryPolicy(config)
 
     async def swaps(self, type: str):
         try:
@@ -38,12 +41,12 @@ class MonadXYZ:
                     self.config.FLOW.NUMBER_OF_SWAPS[0], self.config.FLOW.NUMBER_OF_SWAPS[1]
                 )
                 logger.info(f"[{self.account_index}] | Will perform {number_of_swaps} swaps")
+                swapper = MonadSwap(self.private_key, self.proxy)
                 
                 for swap_num in range(number_of_swaps):
                     success = False
                     for retry in range(self.config.SETTINGS.ATTEMPTS):
                         try:
-                            swapper = MonadSwap(self.private_key, self.proxy)
                             amount = random.randint(
                                 self.config.FLOW.PERCENT_OF_BALANCE_TO_SWAP[0],
                                 self.config.FLOW.PERCENT_OF_BALANCE_TO_SWAP[1],
@@ -63,7 +66,7 @@ class MonadXYZ:
                             logger.success(
                                 f"[{self.account_index}] | Swapped {amount}% of balance to {random_token}. Swap {swap_num + 1}/{number_of_swaps}. Next swap in {random_pause} seconds"
                             )
-                            await asyncio.sleep(random_pause)
+                            await sleep(random_pause, "pause_between_swaps")
                             success = True
                             break  # Break retry loop on success
                             
@@ -71,9 +74,8 @@ class MonadXYZ:
                             logger.error(
                                 f"[{self.account_index}] | Error swap in monad.xyz ({retry + 1}/{self.config.SETTINGS.ATTEMPTS}): {e}"
                             )
-                            if retry == self.config.SETTINGS.ATTEMPTS - 1:
-                                raise  # Re-raise if all retries failed
-                            continue
+                            if not await self.retry_policy.should_retry(e, retry, "swap"):
+                                raise  # Re-raise if retrying is pointless
                     
                     if not success:
                         logger.error(f"[{self.account_index}] | Failed to complete swap {swap_num + 1}/{number_of_swaps} after all retries")
@@ -107,7 +109,7 @@ class MonadXYZ:
                             logger.success(
                                 f"[{self.account_index}] | Completed Ambient swap {swap_num + 1}/{number_of_swaps}. Next swap in {random_pause} seconds"
                             )
-                            await asyncio.sleep(random_pause)
+                            await sleep(random_pause, "pause_between_swaps")
                             success = True
                             break  # Break retry loop on success
                             
@@ -115,9 +117,8 @@ class MonadXYZ:
                             logger.error(
                                 f"[{self.account_index}] | Error swap in ambient ({retry + 1}/{self.config.SETTINGS.ATTEMPTS}): {e}"
                             )
-                            if retry == self.config.SETTINGS.ATTEMPTS - 1:
-                                raise  # Re-raise if all retries failed
-                            continue
+                            if not await self.retry_policy.should_retry(e, retry, "swap"):
+                                raise  # Re-raise if retrying is pointless
                     
                     if not success:
                         logger.error(f"[{self.account_index}] | Failed to complete swap {swap_num + 1}/{number_of_swaps} after all retries")
@@ -151,7 +152,7 @@ class MonadXYZ:
                             logger.success(
                                 f"[{self.account_index}] | Completed Bean swap {swap_num + 1}/{number_of_swaps}. Next swap in {random_pause} seconds"
                             )
-                            await asyncio.sleep(random_pause)
+                            await sleep(random_pause, "pause_between_swaps")
                             success = True
                             break  # Break retry loop on success
                             
@@ -159,9 +160,8 @@ class MonadXYZ:
                             logger.error(
                                 f"[{self.account_index}] | Error swap in bean ({retry + 1}/{self.config.SETTINGS.ATTEMPTS}): {e}"
                             )
-                            if retry == self.config.SETTINGS.ATTEMPTS - 1:
-                                raise  # Re-raise if all retries failed
-                            continue
+                            if not await self.retry_policy.should_retry(e, retry, "swap"):
+                                raise  # Re-raise if retrying is pointless
                     
                     if not success:
                         logger.error(f"[{self.account_index}] | Failed to complete swap {swap_num + 1}/{number_of_swaps} after all retries")
@@ -195,7 +195,7 @@ class MonadXYZ:
                             logger.success(
                                 f"[{self.account_index}] | Completed Izumi swap {swap_num + 1}/{number_of_swaps}. Next swap in {random_pause} seconds"
                             )
-                            await asyncio.sleep(random_pause)
+                            await sleep(random_pause, "pause_between_swaps")
                             success = True
                             break  # Break retry loop on success
                             
@@ -203,9 +203,8 @@ class MonadXYZ:
                             logger.error(
                                 f"[{self.account_index}] | Error swap in izumi ({retry + 1}/{self.config.SETTINGS.ATTEMPTS}): {e}"
                             )
-                            if retry == self.config.SETTINGS.ATTEMPTS - 1:
-                                raise  # Re-raise if all retries failed
-                            continue
+                            if not await self.retry_policy.should_retry(e, retry, "swap"):
+                                raise  # Re-raise if retrying is pointless
                     
                     if not success:
                         logger.error(f"[{self.account_index}] | Failed to complete swap {swap_num + 1}/{number_of_swaps} after all retries")
@@ -229,7 +228,7 @@ class MonadXYZ:
                         logger.success(
                             f"[{self.account_index}] | Collected all to monad.xyz. Next collect in {random_pause} seconds"
                         )
-                        await asyncio.sleep(random_pause)
+                        await sleep(random_pause, "pause_between_swaps")
 
                         # Then try collecting via Ambient
                         ambient_swapper = AmbientDex(self.private_key, self.proxy, self.config)
@@ -243,7 +242,7 @@ class MonadXYZ:
                         logger.success(
                             f"[{self.account_index}] | Collected all tokens via Ambient. Next collect in {random_pause} seconds"
                         )
-                        await asyncio.sleep(random_pause)
+                        await sleep(random_pause, "pause_between_swaps")
                         
                         # Then try collecting via Bean
                         bean_swapper = BeanDex(self.private_key, self.proxy, self.config)
@@ -257,7 +256,7 @@ class MonadXYZ:
                         logger.success(
                             f"[{self.account_index}] | Collected all tokens via Bean. Next collect in {random_pause} seconds"
                         )
-                        await asyncio.sleep(random_pause)
+                        await sleep(random_pause, "pause_between_swaps")
 
                         # Then try collecting via Izumi
                         izumi_swapper = IzumiDex(self.private_key, self.proxy, self.config)
@@ -271,21 +270,17 @@ class MonadXYZ:
                         logger.success(
                             f"[{self.account_index}] | Collected all tokens via Izumi. Next collect in {random_pause} seconds"
                         )
-                        await asyncio.sleep(random_pause)
+                        await sleep(random_pause, "pause_between_swaps")
 
                         success = True
                         break  # Break the retry loop on success
                         
                     except Exception as e:
-                        random_pause = random.randint(
-                            self.config.SETTINGS.PAUSE_BETWEEN_ATTEMPTS[0],
-                            self.config.SETTINGS.PAUSE_BETWEEN_ATTEMPTS[1],
-                        )
                         logger.error(
-                            f"[{self.account_index}] | Error collecting tokens ({retry + 1}/{self.config.SETTINGS.ATTEMPTS}): {e}. Next collect in {random_pause} seconds"
+                            f"[{self.account_index}] | Error collecting tokens ({retry + 1}/{self.config.SETTINGS.ATTEMPTS}): {e}"
                         )
-                        await asyncio.sleep(random_pause)
-                        continue
+                        if not await self.retry_policy.should_retry(e, retry, "collect_all_to_monad"):
+                            break
                     
                 return success  # Return True if succeeded, False if all retries failed
         except Exception as e:
@@ -455,6 +450,6 @@ class MonadXYZ:
                 logger.error(
                     f"[{self.account_index}] | Error connect discord to monad.xyz ({retry + 1}/{self.config.SETTINGS.ATTEMPTS}): {e}. Next connect in {random_pause} seconds"
                 )
-                await asyncio.sleep(random_pause)
+                await sleep(random_pause, "pause_between_attempts")
                 continue
         return False
@@ -0,0 +1,174 @@
+import asyncio
+import time
+from collections import deque
+from typing import Deque, Optional, Set, Tuple
+
+from loguru import logger
+
+from src.model.help import Capsolver
+from src.utils.circuit_breaker import CircuitState, get_breaker
+from src.utils.config import Config
+from src.utils.metrics import REGISTRY
+from src.utils.tracing import span
+
+
+FAUCET_SITEKEY = "0x4AAAAAAA-3X4Nd7hf3mNGx"
+FAUCET_URL = "https://testnet.monad.xyz/"
+
+TOKEN_POOL_READY = REGISTRY.gauge(
+    "turnstile_tokens_ready", "Pre-solved faucet captcha tokens waiting in the pool"
+)
+TOKEN_POOL_RESULTS = REGISTRY.counter(
+    "turnstile_tokens_total", "Faucet captcha tokens by outcome", ("result",)
+)
+
+
+class TurnstileTokenPool:
+    """
+    Держит size решенных Turnstile токенов для крана заранее, чтобы аккаунт
+    не ждал решения капчи. Токен одноразовый и живет ограниченное время,
+    поэтому просроченные токены выбрасываются.
+
+    Заранее решается не больше токенов, чем аккаунтов еще не дошло до крана
+    (pending, None - неизвестно), и ничего, пока предохранитель крана не
+    закрыт: такие токены только протухнут. Ожидающим токен решается всегда.
+    """
+
+    # Пауза после неудачного решения, чтобы не крутить платные запросы впустую
+    FAILURE_PAUSE = 10
+
+    def __init__(self, solver: Capsolver, size: int, ttl: float):
+        self.solver = solver
+        self.size = size
+        self.ttl = ttl
+
+        self._tokens: Deque[Tuple[float, str]] = deque()
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._solving = 0
+        self._tasks: Set[asyncio.Task] = set()
+        self._closed = False
+        self.pending: Optional[int] = None
+        self.breaker = get_breaker("monad.xyz faucet")
+
+    def account_started(self) -> None:
+        """Аккаунт дошел до крана: для него больше не нужен заранее решенный токен"""
+        if self.pending is not None:
+            self.pending = max(self.pending - 1, 0)
+
+    async def get(self) -> Optional[str]:
+        """Возвращает готовый токен или ждет ближайший. None - решить не удалось"""
+        self._drop_expired()
+        if self._tokens:
+            _, token = self._tokens.popleft()
+            TOKEN_POOL_READY.set(len(self._tokens))
+            TOKEN_POOL_RESULTS.inc(result="ready")
+            self._refill()
+            return token
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self._refill()
+        try:
+            return await waiter
+        finally:
+            if not waiter.done():
+                self._waiters.remove(waiter)
+
+    async def close(self) -> None:
+        self._closed = True
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        for waiter in self._waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+        self._waiters.clear()
+        if self._tokens:
+            logger.info(f"{len(self._tokens)} pre-solved faucet captcha tokens were not used")
+
+    def _drop_expired(self) -> None:
+        now = time.monotonic()
+        while self._tokens and now - self._tokens[0][0] >= self.ttl:
+            self._tokens.popleft()
+            TOKEN_POOL_RESULTS.inc(result="expired")
+        TOKEN_POOL_READY.set(len(self._tokens))
+
+    def _refill(self) -> None:
+        if self._closed:
+            return
+        ahead = self.size
+        if self.pending is not None:
+            ahead = min(ahead, self.pending)
+        if self.breaker.state != CircuitState.CLOSED:
+            ahead = 0
+        missing = ahead + len(self._waiters) - len(self._tokens) - self._solving
+        for _ in range(max(missing, 0)):
+            self._solving += 1
+            task = asyncio.create_task(self._solve_one())
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _solve_one(self) -> None:
+        token = None
+        try:
+            with span("solve_turnstile", "captcha"):
+                token = await self.solver.solve_turnstile(
+                    FAUCET_SITEKEY, FAUCET_URL, True
+                )
+            if not token:
+                TOKEN_POOL_RESULTS.inc(result="failed")
+                self._deliver(None)
+                await asyncio.sleep(self.FAILURE_PAUSE)
+        finally:
+            self._solving -= 1
+
+        if token:
+            TOKEN_POOL_RESULTS.inc(result="solved")
+            self._deliver(token)
+        self._refill()
+
+    def _deliver(self, token: Optional[str]) -> None:
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(token)
+                return
+
+        if token:
+            self._tokens.append((time.monotonic(), token))
+            TOKEN_POOL_READY.set(len(self._tokens))
+
+
+_pool: Optional[TurnstileTokenPool] = None
+_expected: Optional[int] = None
+
+
+def expect_faucet_accounts(count: int) -> None:
+    """Сколько аккаунтов в запуске пойдут на кран"""
+    global _expected
+    _expected = count
+    if _pool is not None:
+        _pool.pending = count
+
+
+def get_turnstile_pool(config: Config) -> TurnstileTokenPool:
+    """Общий пул токенов крана, создается при первом обращении"""
+    global _pool
+    if _pool is None:
+        solver = Capsolver(
+            config.FAUCET.CAPSOLVER_API_KEY,
+            config.FAUCET.PROXY_FOR_CAPTCHA,
+        )
+        _pool = TurnstileTokenPool(
+            solver, config.FAUCET.PRESOLVE_TOKENS, config.FAUCET.TOKEN_TTL
+        )
+        _pool.pending = _expected
+    return _pool
+
+
+async def close_turnstile_pool() -> None:
+    global _pool, _expected
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
+    _expected = None
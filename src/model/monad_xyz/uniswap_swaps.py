@@ -7,8 +7,10 @@ from typing import Dict, Any, Optional, List, Tuple
 from decimal import Decimal
 from src.utils.constants import TOKENS, ERC20_ABI, RPC_URL, EXPLORER_URL
 from loguru import logger
-from src.utils.client import create_client
+from src.utils.circuit_breaker import get_breaker
+from src.utils.client import CLIENT_POOL
 from src.utils.config import get_config
+from src.utils.provider import create_web3
 
 # Get config singleton
 config = get_config()
@@ -24,7 +26,7 @@ class MonadSwap:
             private_key: Private key for the wallet
             proxy: Optional proxy URL for API requests
         """
-        self.web3 = AsyncWeb3(AsyncWeb3.AsyncHTTPProvider(RPC_URL))
+        self.web3 = create_web3(RPC_URL)
         self.account = Account.from_key(private_key)
         self.proxy = proxy
 
@@ -57,7 +59,7 @@ class MonadSwap:
                     contract = self.web3.eth.contract(address=contract_address, abi=ERC20_ABI)
                     balance_wei = await contract.functions.balanceOf(self.account.address).call()
                     balance_ether = Decimal(self.web3.from_wei(balance_wei, 'ether'))
-                    logger.info(f"Balance: {balance_ether:.4f} {token_out}")
+                    logger.debug("Balance: {:.4f} {}", balance_ether, token_out)
                     return balance_ether
                 
             except Exception as e:
@@ -95,7 +97,7 @@ class MonadSwap:
         balance_wei_percentage = int(balance_wei * percentage)
         balance_ether_percentage = float(round(self.web3.from_wei(balance_wei_percentage, 'ether'), random.randint(2, 8)))
         
-        logger.info(f"Balance: {balance_ether} {balance_token}")
+        logger.debug("Balance: {} {}", balance_ether, balance_token)
         logger.info(f"Swapping {percentage_to_swap}% = {balance_ether_percentage} {balance_token}")
         
         return balance_ether_percentage
@@ -115,44 +117,59 @@ class MonadSwap:
     async def get_swap_quote(self, percentage_to_swap_or_amount: float, token_out: str, token_in: str = None) -> Dict:
         max_retries = 5
         json_data = {'account': self.account.address, 'type': 'transaction'}
-        client = await create_client(self.proxy)
+        # Запросы котировок без cookies, клиент общий для всех аккаунтов с этим прокси
+        client = await CLIENT_POOL.acquire(self.proxy)
 
         if token_out == "native":
             url = await self._generate_url_amount(percentage_to_swap_or_amount, token_in)
         else:
             url = await self._generate_url_percentage(percentage_to_swap_or_amount, token_out)
 
-        async with client:
-            for attempt in range(max_retries):
+        breaker = get_breaker("dial.to")
+        for attempt in range(max_retries):
+            # Пока dial.to недоступен, сразу отказываемся от свапа
+            breaker.check()
+            try:
                 try:
                     response = await client.post(url=url, json=json_data)
-                    response_data = response.json()
-                    
-                    # Check for balance-related error messages
-                    if isinstance(response_data, dict) and 'error' in response_data:
-                        error_msg = str(response_data.get('error', '')).lower()
-                        if 'number greater than' in error_msg:
-                            logger.warning(f"Balance too small for swap, skipping: {response_data['error']}")
-                            return None
-                    
-                    if not response_data.get('transaction'):
-                        raise ValueError(f"No transaction data in response: {response_data}")
-                    
-                    tx_data = json.loads(response_data['transaction'])
-                    return {
-                        "to": self.web3.to_checksum_address(tx_data['to']),
-                        "value": int(tx_data['value'], 16),
-                        "data": tx_data['data'],
-                        "gas": tx_data['gas'],
-                    }
-                except Exception as e:
-                    if attempt == max_retries - 1:
-                        raise Exception(f"Failed to get quote after {max_retries} attempts: {str(e)}")
-                    logger.error(f"Attempt {attempt + 1} failed: {str(e)}")
-                    await asyncio.sleep(random.randint(
-                        config.SETTINGS.PAUSE_BETWEEN_ATTEMPTS[0],
-                        config.SETTINGS.PAUSE_BETWEEN_ATTEMPTS[1]
-                    ))
+                except Exception:
+                    # Таймаут, обрыв соединения - проблема сервиса
+                    breaker.record_failure()
+                    raise
+                if response.status_code >= 500:
+                    breaker.record_failure()
+                    raise Exception(f"dial.to returned HTTP {response.status_code}")
+
+                # Ошибки ниже относятся к запросу аккаунта, предохранитель их не считает
+                response_data = response.json()
+                
+                # Check for balance-related error messages
+                if isinstance(response_data, dict) and 'error' in response_data:
+                    error_msg = str(response_data.get('error', '')).lower()
+                    if 'number greater than' in error_msg:
+                        breaker.record_success()
+                        logger.warning(f"Balance too small for swap, skipping: {response_data['error']}")
+                        return None
+                
+                if not response_data.get('transaction'):
+                    raise ValueError(f"No transaction data in response: {response_data}")
+                
+                breaker.record_success()
+                tx_data = json.loads(response_data['transaction'])
+                return {
+                    "to": self.web3.to_checksum_address(tx_data['to']),
+                    "value": int(tx_data['value'], 16),
+                    "data": tx_data['data'],
+                    "gas": tx_data['gas'],
+                }
+            except Exception as e:
+                if attempt == max_retries - 1:
+                    raise Exception(f"Failed to get quote after {max_retries} attempts: {str(e)}")
+                logger.error(f"Attempt {attempt + 1} failed: {str(e)}")
+                await asyncio.sleep(random.randint(
+                    config.SETTINGS.PAUSE_BETWEEN_ATTEMPTS[0],
+                    config.SETTINGS.PAUSE_BETWEEN_ATTEMPTS[1]
+                ))
 
     async def generate_approve_transaction(self, token: str, amount: float, swap_tx_data: Dict) -> Dict:
         """
@@ -202,7 +219,7 @@ class MonadSwap:
                 "gas": gas_limit
             }
             
-            logger.info(f"Generated approve transaction for {amount} {token} to spender {spender_address} (Gas: {gas_limit})")
+            logger.debug("Generated approve transaction for {} {} to spender {} (Gas: {})", amount, token, spender_address, gas_limit)
             return tx_data
             
         except Exception as e:
@@ -225,7 +242,7 @@ class MonadSwap:
         signed_txn = self.web3.eth.account.sign_transaction(transaction, self.account.key)
         tx_hash = await self.web3.eth.send_raw_transaction(signed_txn.raw_transaction)
         
-        logger.info("Waiting for transaction confirmation...")
+        logger.debug("Waiting for transaction confirmation...")
         receipt = await self.web3.eth.wait_for_transaction_receipt(tx_hash, poll_latency=2)
         
         if receipt['status'] == 1:
@@ -1,4 +1,3 @@
-import asyncio
 import random
 from eth_account import Account
 from primp import AsyncClient
@@ -7,8 +6,13 @@ from web3.contract import Contract
 
 from src.utils.constants import EXPLORER_URL, RPC_URL
 from src.utils.config import Config
+from src.utils.provider import create_web3
+from src.utils.retry import RetryPolicy
 from loguru import logger
 
+MONADKING_CONTRACT = "0x5DCC4Cc8F56295Cb486809C77d476B2ea09a6938"
+MONADKING_UNLOCKED_CONTRACT = "0xeC5Fc06e3C1D5d320199f1930cE3c3de9B262570"
+
 # ABI для Monad King NFT на основе транзакций
 MONAD_KING_ABI = [
     {
@@ -80,9 +84,10 @@ class Monadking:
         self.private_key = private_key
         self.account = Account.from_key(private_key)
         self.config = config
-        self.nft_contract_address = "0x5DCC4Cc8F56295Cb486809C77d476B2ea09a6938"
-        self.unlocked_contract_address = "0xeC5Fc06e3C1D5d320199f1930cE3c3de9B262570"
-        self.web3 = AsyncWeb3(AsyncWeb3.AsyncHTTPProvider(RPC_URL))
+        self.retry_policy = RetryPolicy(config)
+        self.nft_contract_address = MONADKING_CONTRACT
+        self.unlocked_contract_address = MONADKING_UNLOCKED_CONTRACT
+        self.web3 = create_web3(RPC_URL)
         self.nft_contract = self.web3.eth.contract(
             address=self.nft_contract_address, abi=MONAD_KING_ABI
         )
@@ -128,7 +133,7 @@ class Monadking:
         """
         Минтит Monad King NFT
         """
-        for _ in range(self.config.SETTINGS.ATTEMPTS):
+        for retry in range(self.config.SETTINGS.ATTEMPTS):
             try:
                 # Проверяем баланс NFT
                 balance = await self.get_nft_balance()
@@ -203,14 +208,11 @@ class Monadking:
                     return False
 
             except Exception as e:
-                random_pause = random.randint(
-                    self.config.SETTINGS.RANDOM_PAUSE_BETWEEN_ACTIONS[0],
-                    self.config.SETTINGS.RANDOM_PAUSE_BETWEEN_ACTIONS[1],
-                )
                 logger.error(
-                    f"[{self.account_index}] Error in mint on Monad King: {e}. Sleeping for {random_pause} seconds"
+                    f"[{self.account_index}] Error in mint on Monad King: {e}"
                 )
-                await asyncio.sleep(random_pause)
+                if not await self.retry_policy.should_retry(e, retry, "monadking"):
+                    break
 
         return False
 
@@ -218,7 +220,7 @@ class Monadking:
         """
         Минтит Unlocked Monad NFT
         """
-        for _ in range(self.config.SETTINGS.ATTEMPTS):
+        for retry in range(self.config.SETTINGS.ATTEMPTS):
             try:
                 # Проверяем баланс NFT
                 balance = await self.get_nft_balance(self.unlocked_contract)
@@ -295,13 +297,10 @@ class Monadking:
                     return False
 
             except Exception as e:
-                random_pause = random.randint(
-                    self.config.SETTINGS.RANDOM_PAUSE_BETWEEN_ACTIONS[0],
-                    self.config.SETTINGS.RANDOM_PAUSE_BETWEEN_ACTIONS[1],
-                )
                 logger.error(
-                    f"[{self.account_index}] Error in mint on Unlocked Monad: {e}. Sleeping for {random_pause} seconds"
+                    f"[{self.account_index}] Error in mint on Unlocked Monad: {e}"
                 )
-                await asyncio.sleep(random_pause)
+                if not await self.retry_policy.should_retry(e, retry, "monadking"):
+                    break
 
         return False
@@ -1,5 +1,3 @@
-import asyncio
-import random
 from eth_account import Account
 from primp import AsyncClient
 from web3 import AsyncWeb3
@@ -7,6 +5,8 @@ from web3.contract import Contract
 
 from src.utils.constants import EXPLORER_URL, RPC_URL
 from src.utils.config import Config
+from src.utils.provider import create_web3
+from src.utils.retry import RetryPolicy
 from loguru import logger
 
 # Обновляем ABI для ERC1155
@@ -44,10 +44,11 @@ class MonadverseMint:
         self.proxy = proxy
         self.private_key = private_key
         self.config = config
+        self.retry_policy = RetryPolicy(config)
         self.session = session
 
         self.account: Account = Account.from_key(private_key=private_key)
-        self.web3 = AsyncWeb3(AsyncWeb3.AsyncHTTPProvider(RPC_URL))
+        self.web3 = create_web3(RPC_URL)
 
         self.nft_contract_address = "0x3A9acc3Be6E9678FA5D23810488c37a3192aaf75"
         self.nft_contract: Contract = self.web3.eth.contract(
@@ -123,13 +124,10 @@ class MonadverseMint:
                     return False
 
             except Exception as e:
-                random_pause = random.randint(
-                    self.config.SETTINGS.RANDOM_PAUSE_BETWEEN_ACTIONS[0],
-                    self.config.SETTINGS.RANDOM_PAUSE_BETWEEN_ACTIONS[1],
-                )
                 logger.error(
-                    f"[{self.account_index}] Error in mint on Monadverse: {e}. Sleeping for {random_pause} seconds"
+                    f"[{self.account_index}] Error in mint on Monadverse: {e}"
                 )
-                await asyncio.sleep(random_pause)
+                if not await self.retry_policy.should_retry(e, retry, "monadverse"):
+                    break
 
         return False
@@ -1,4 +1,3 @@
-import asyncio
 import random
 import string
 from eth_account import Account
@@ -7,8 +6,11 @@ from primp import AsyncClient
 from web3 import AsyncWeb3
 from typing import Dict, Optional, Tuple
 
+from src.utils.circuit_breaker import get_breaker
 from src.utils.config import Config
 from src.utils.constants import RPC_URL, EXPLORER_URL
+from src.utils.provider import create_web3
+from src.utils.retry import RetryPolicy
 from src.model.nad_domains.constants import NAD_CONTRACT_ADDRESS, NAD_API_URL, NAD_ABI, NAD_NFT_ADDRESS, NAD_NFT_ABI
 
 
@@ -25,10 +27,11 @@ class NadDomains:
         self.proxy = proxy
         self.private_key = private_key
         self.config = config
+        self.retry_policy = RetryPolicy(config)
         self.session = session
 
         self.account: Account = Account.from_key(private_key=private_key)
-        self.web3 = AsyncWeb3(AsyncWeb3.AsyncHTTPProvider(RPC_URL))
+        self.web3 = create_web3(RPC_URL)
         
         # Initialize contract using constants
         self.contract = self.web3.eth.contract(
@@ -82,7 +85,7 @@ class NadDomains:
             'sec-fetch-mode': 'cors',
             'sec-fetch-site': 'same-site',
         }
-        print(name)
+        logger.debug("[{}] Requesting signature for {}", self.account_index, name)
         params = {
             'name': name,
             'nameOwner': self.account.address,
@@ -93,8 +96,18 @@ class NadDomains:
             'chainId': '10143',
         }
         
+        breaker = get_breaker("nad.domains API")
+        if not breaker.allow():
+            logger.warning(f"[{self.account_index}] nad.domains API is unavailable, retry in {breaker.retry_in:.0f}s")
+            return None
+
+        response = None
         try:
             response = await self.session.get(NAD_API_URL, params=params, headers=headers)
+            if response.status_code >= 500:
+                breaker.record_failure()
+            else:
+                breaker.record_success()
             
             if response.status_code != 200:
                 logger.error(f"[{self.account_index}] API error: Status code {response.status_code}")
@@ -114,6 +127,9 @@ class NadDomains:
                 return None
                 
         except Exception as e:
+            # Сервис виноват, только если ответа нет; ошибка разбора ответа - нет
+            if response is None:
+                breaker.record_failure()
             logger.error(f"[{self.account_index}] Error getting signature: {str(e)}")
             return None
 
@@ -166,7 +182,7 @@ class NadDomains:
                 })
                 # Add 20% buffer to gas estimate to ensure transaction doesn't run out of gas
                 gas_with_buffer = int(gas_estimate * 1.2)
-                logger.info(f"[{self.account_index}] Estimated gas: {gas_estimate}, with buffer: {gas_with_buffer}")
+                logger.debug("[{}] Estimated gas: {}, with buffer: {}", self.account_index, gas_estimate, gas_with_buffer)
             except Exception as e:
                 # If gas estimation fails, log error and return false
                 logger.error(f"[{self.account_index}] Gas estimation failed: {str(e)}. Cannot proceed with registration.")
@@ -230,6 +246,11 @@ class NadDomains:
                 
             # Continue with registration if no domain is owned
             for retry in range(self.config.SETTINGS.ATTEMPTS):
+                breaker = get_breaker("nad.domains API")
+                if breaker.is_open:
+                    logger.warning(f"[{self.account_index}] nad.domains API is unavailable for all accounts, skipping registration")
+                    return False
+
                 try:
                     # Generate a random name
                     name = self.generate_random_name()
@@ -247,12 +268,9 @@ class NadDomains:
                         continue
                     
                 except Exception as e:
-                    random_pause = random.randint(
-                        self.config.SETTINGS.RANDOM_PAUSE_BETWEEN_ACTIONS[0],
-                        self.config.SETTINGS.RANDOM_PAUSE_BETWEEN_ACTIONS[1]
-                    )
-                    logger.error(f"[{self.account_index}] Error registering domain (attempt {retry+1}/{self.config.SETTINGS.ATTEMPTS}): {str(e)}. Sleeping for {random_pause} seconds")
-                    await asyncio.sleep(random_pause)
+                    logger.error(f"[{self.account_index}] Error registering domain (attempt {retry+1}/{self.config.SETTINGS.ATTEMPTS}): {str(e)}")
+                    if not await self.retry_policy.should_retry(e, retry, "nad_domains"):
+                        break
             
             return False
             
@@ -10,6 +10,8 @@ from src.utils.client import create_client
 from src.utils.config import Config
 from loguru import logger
 from src.utils.constants import RPC_URL, ERC20_ABI
+from src.utils.provider import create_web3
+from src.utils.retry import note_error
 
 
 class Orbiter:
@@ -28,8 +30,8 @@ class Orbiter:
         self.session = session
 
         self.account: Account = Account.from_key(private_key=private_key)
-        self.web3 = AsyncWeb3(AsyncWeb3.AsyncHTTPProvider(SEPOLIA_RPC_URL))
-        self.monad_web3 = AsyncWeb3(AsyncWeb3.AsyncHTTPProvider(RPC_URL))
+        self.web3 = create_web3(SEPOLIA_RPC_URL)
+        self.monad_web3 = create_web3(RPC_URL)
         
         # Initialize ERC20 contract
         self.monad_sepolia = self.monad_web3.eth.contract(
@@ -163,10 +165,12 @@ class Orbiter:
                     return False
                     
             except Exception as e:
+                note_error(e)
                 logger.error(f"[{self.account_index}] Failed to send or confirm transaction: {str(e)}")
                 return False
 
         except Exception as e:
+            note_error(e)
             if "insufficient funds" in str(e).lower():
                 logger.error(f"[{self.account_index}] Insufficient funds to cover bridge and gas costs")
                 return False
@@ -1,5 +1,3 @@
-import asyncio
-import random
 from eth_account import Account
 from loguru import logger
 from primp import AsyncClient
@@ -8,6 +6,8 @@ from typing import Dict
 
 from src.utils.config import Config
 from src.utils.constants import RPC_URL, EXPLORER_URL
+from src.utils.provider import create_web3
+from src.utils.retry import RetryPolicy
 from .constants import DEPLOY_CONTRACT_BYTECODE
 
 
@@ -24,10 +24,11 @@ class Owlto:
         self.proxy = proxy
         self.private_key = private_key
         self.config = config
+        self.retry_policy = RetryPolicy(config)
         self.session = session
 
         self.account: Account = Account.from_key(private_key=private_key)
-        self.web3 = AsyncWeb3(AsyncWeb3.AsyncHTTPProvider(RPC_URL))
+        self.web3 = create_web3(RPC_URL)
 
     async def get_gas_params(self) -> Dict[str, int]:
         """Get current gas parameters from the network."""
@@ -73,7 +74,7 @@ class Owlto:
 
                 # Оцениваем газ
                 estimated_gas = await self.estimate_gas(transaction)
-                logger.info(f"[{self.account_index}] Estimated gas: {estimated_gas}")
+                logger.debug("[{}] Estimated gas: {}", self.account_index, estimated_gas)
 
                 # Добавляем остальные параметры транзакции
                 transaction.update(
@@ -106,13 +107,9 @@ class Owlto:
                 return True
 
             except Exception as e:
-                random_pause = random.uniform(
-                    self.config.SETTINGS.RANDOM_PAUSE_BETWEEN_ACTIONS[0],
-                    self.config.SETTINGS.RANDOM_PAUSE_BETWEEN_ACTIONS[1],
-                )
                 logger.error(
-                    f"[{self.account_index}] Error in deploy_contract Owlto: {e}. Sleeping for {random_pause} seconds"
+                    f"[{self.account_index}] Error in deploy_contract Owlto: {e}"
                 )
-                await asyncio.sleep(random_pause)
-                continue
+                if not await self.retry_policy.should_retry(e, retry, "owlto"):
+                    break
         return False
@@ -6,6 +6,8 @@ from primp import AsyncClient
 from web3 import AsyncWeb3
 from src.utils.config import Config
 from src.utils.constants import EXPLORER_URL, RPC_URL
+from src.utils.provider import create_web3
+from src.utils.retry import RetryPolicy
 from src.model.shmonad.constants import SHMONAD_ADDRESS, SHMONAD_ABI, STAKE_POLICY_ID
 from typing import Dict
 
@@ -26,7 +28,8 @@ class Shmonad:
         self.session = session
 
         self.account: Account = Account.from_key(private_key=private_key)
-        self.web3 = AsyncWeb3(AsyncWeb3.AsyncHTTPProvider(RPC_URL))
+        self.web3 = create_web3(RPC_URL)
+        self.retry_policy = RetryPolicy(config)
 
     async def _get_shmon_balance(self):
         for retry in range(self.config.SETTINGS.ATTEMPTS):
@@ -65,7 +68,7 @@ class Shmonad:
                     logger.error(
                         f"[{self.account_index}] | Failed to get Shmon balance"
                     )
-                    continue
+                    return False
 
                 logger.success(
                     f"[{self.account_index}] | Shmon balance: {shmon_balance_formatted:.6f} shMON"
@@ -89,7 +92,7 @@ class Shmonad:
                             logger.error(
                                 f"[{self.account_index}] | Failed to unstake Shmon"
                             )
-                            continue
+                            return False
 
                         random_pause = random.randint(
                             self.config.SETTINGS.PAUSE_BETWEEN_SWAPS[0],
@@ -104,7 +107,7 @@ class Shmonad:
                             logger.error(
                                 f"[{self.account_index}] | Failed to sell Shmon"
                             )
-                            continue
+                            return False
 
                 # Если включен только buy & stake
                 elif (
@@ -113,7 +116,7 @@ class Shmonad:
                 ):
                     if not await self.buy_shmon():
                         logger.error(f"[{self.account_index}] | Failed to buy Shmon")
-                        continue
+                        return False
 
                     random_pause = random.randint(
                         self.config.SETTINGS.PAUSE_BETWEEN_SWAPS[0],
@@ -126,7 +129,7 @@ class Shmonad:
 
                     if not await self.stake_shmon():
                         logger.error(f"[{self.account_index}] | Failed to stake Shmon")
-                        continue
+                        return False
 
                 # Если включены оба
                 else:
@@ -136,7 +139,7 @@ class Shmonad:
                             logger.error(
                                 f"[{self.account_index}] | Failed to unstake Shmon"
                             )
-                            continue
+                            return False
 
                         random_pause = random.randint(
                             self.config.SETTINGS.PAUSE_BETWEEN_SWAPS[0],
@@ -151,21 +154,21 @@ class Shmonad:
                             logger.error(
                                 f"[{self.account_index}] | Failed to sell Shmon"
                             )
-                            continue
+                            return False
                     elif shmon_balance_formatted > 0.001:
                         # Нет застейканных, но есть обычные - продаем
                         if not await self.sell_shmon():
                             logger.error(
                                 f"[{self.account_index}] | Failed to sell Shmon"
                             )
-                            continue
+                            return False
                     else:
                         # Нет ни застейканных, ни обычных токенов - покупаем и стейкаем
                         if not await self.buy_shmon():
                             logger.error(
                                 f"[{self.account_index}] | Failed to buy Shmon"
                             )
-                            continue
+                            return False
 
                         random_pause = random.randint(
                             self.config.SETTINGS.PAUSE_BETWEEN_SWAPS[0],
@@ -180,14 +183,14 @@ class Shmonad:
                             logger.error(
                                 f"[{self.account_index}] | Failed to stake Shmon"
                             )
-                            continue
+                            return False
 
                 return True
 
             except Exception as e:
                 logger.error(f"[{self.account_index}] | Error swapping Shmonad: {e}")
-                await asyncio.sleep(1)
-                continue
+                if not await self.retry_policy.should_retry(e, retry, "shmonad"):
+                    break
         return False
 
     async def buy_shmon(self) -> bool:
@@ -267,8 +270,8 @@ class Shmonad:
 
             except Exception as e:
                 logger.error(f"[{self.account_index}] | Error buying Shmon: {e}")
-                await asyncio.sleep(1)
-                continue
+                if not await self.retry_policy.should_retry(e, retry, "buy_shmon"):
+                    break
         return False
 
     async def sell_shmon(self) -> bool:
@@ -345,8 +348,8 @@ class Shmonad:
 
             except Exception as e:
                 logger.error(f"[{self.account_index}] | Error selling Shmon: {e}")
-                await asyncio.sleep(1)
-                continue
+                if not await self.retry_policy.should_retry(e, retry, "sell_shmon"):
+                    break
         return False
 
     async def stake_shmon(self) -> bool:
@@ -422,8 +425,8 @@ class Shmonad:
 
             except Exception as e:
                 logger.error(f"[{self.account_index}] | Error bonding Shmon: {e}")
-                await asyncio.sleep(1)
-                continue
+                if not await self.retry_policy.should_retry(e, retry, "stake_shmon"):
+                    break
         return False
 
     async def _get_bonded_balance(self):
@@ -583,8 +586,8 @@ class Shmonad:
 
             except Exception as e:
                 logger.error(f"[{self.account_index}] | Error unstaking Shmon: {e}")
-                await asyncio.sleep(1)
-                continue
+                if not await self.retry_policy.should_retry(e, retry, "unstake_shmon"):
+                    break
         return False
 
     async def get_gas_params(self) -> Dict[str, int]:
@@ -1,7 +1,9 @@
+from eth_account import Account
 from loguru import logger
 import primp
 import random
 import asyncio
+from typing import FrozenSet
 
 from src.model.magiceden.instance import MagicEden
 from src.model.monadking_mint.instance import Monadking
@@ -19,9 +21,13 @@ from src.model.magma.instance import Magma
 from src.model.apriori import Apriori
 from src.model.monad_xyz.instance import MonadXYZ
 from src.model.nad_domains.instance import NadDomains
-from src.utils.client import create_client
+from src.model.help.preflight import prune_tasks
+from src.utils.account_store import ACCOUNT_STORE
+from src.utils.client import CLIENT_POOL
 from src.utils.config import Config
-from src.model.help.stats import WalletStats
+from src.utils.context import current_task
+from src.utils.retry import note_error
+from src.utils.tracing import sleep, span
 
 
 class Start:
@@ -33,6 +39,8 @@ class Start:
         discord_token: str,
         email: str,
         config: Config,
+        done_tasks: FrozenSet[str] = frozenset(),
+        address: str = "",
     ):
         self.account_index = account_index
         self.proxy = proxy
@@ -40,15 +48,23 @@ class Start:
         self.discord_token = discord_token
         self.email = email
         self.config = config
+        # Задачи, которые по preflight проверке уже выполнены
+        self.done_tasks = done_tasks
+        # Адрес уже посчитан в preflight, иначе выводим из ключа
+        self.address = address or Account.from_key(private_key).address
 
         self.session: primp.AsyncClient | None = None
 
     async def initialize(self):
         try:
-            self.session = await create_client(self.proxy)
+            # Сессия хранит cookies аккаунта, поэтому общая только внутри аккаунта
+            self.session = await CLIENT_POOL.acquire(
+                self.proxy, scope=self.account_index
+            )
 
             return True
         except Exception as e:
+            note_error(e)
             logger.error(f"[{self.account_index}] | Error: {e}")
             return False
 
@@ -64,13 +80,19 @@ class Start:
             )
 
             if "farm_faucet" in self.config.FLOW.TASKS:
+                current_task.set("farm_faucet")
                 await monad.faucet()
                 return True
 
             # Заранее определяем все задачи
             planned_tasks = []
             task_plan_msg = []
-            for i, task_item in enumerate(self.config.FLOW.TASKS, 1):
+            tasks = prune_tasks(self.config.FLOW.TASKS, self.done_tasks)
+            if self.done_tasks:
+                logger.info(
+                    f"[{self.account_index}] Already done, skipping: {', '.join(sorted(self.done_tasks))}"
+                )
+            for i, task_item in enumerate(tasks, 1):
                 if isinstance(task_item, list):
                     selected_task = random.choice(task_item)
                     planned_tasks.append((i, selected_task, task_item))
@@ -87,196 +109,203 @@ class Start:
             # Выполняем задачи по плану
             for _, task, _ in planned_tasks:
                 task = task.lower()
-                # Выполняем выбранную задачу
-                if task == "faucet":
-                    if self.config.FAUCET.MONAD_XYZ:
-                        await monad.faucet()
-
-                elif task == "swaps":
-                    await monad.swaps(type="swaps")
-
-                elif task == "ambient":
-                    await monad.swaps(type="ambient")
-
-                elif task == "bean":
-                    await monad.swaps(type="bean")
-                
-                elif task == "izumi":
-                    await monad.swaps(type="izumi")
-
-                elif task == "collect_all_to_monad":
-                    await monad.swaps(type="collect_all_to_monad")
-
-                elif task == "gaszip":
-                    gaszip = Gaszip(
-                        self.account_index,
-                        self.proxy,
-                        self.private_key,
-                        self.config,
-                    )
-                    await gaszip.refuel()
-
-                elif task == "apriori":
-                    apriori = Apriori(
-                        self.account_index,
-                        self.proxy,
-                        self.private_key,
-                        self.config,
-                        self.session,
-                    )
-                    await apriori.stake_mon()
-
-                elif task == "magma":
-                    magma = Magma(
-                        self.account_index,
-                        self.proxy,
-                        self.private_key,
-                        self.config,
-                        self.session,
-                    )
-                    await magma.stake_mon()
-
-                elif task == "owlto":
-                    owlto = Owlto(
-                        self.account_index,
-                        self.proxy,
-                        self.private_key,
-                        self.config,
-                        self.session,
-                    )
-                    await owlto.deploy_contract()
-
-                elif task == "bima":
-                    bima = Bima(
-                        self.account_index,
-                        self.proxy,
-                        self.private_key,
-                        self.config,
-                        self.session,
-                    )
-                    await bima.get_faucet_tokens()
-                    await self.sleep("bima_faucet")
-
-                    if self.config.BIMA.LEND:
-                        await bima.lend()
-
-                elif task == "monadverse_mint":
-                    monadverse_mint = MonadverseMint(
-                        self.account_index,
-                        self.proxy,
-                        self.private_key,
-                        self.config,
-                        self.session,
-                    )
-                    await monadverse_mint.mint()
-
-                elif task == "shmonad":
-                    shmonad = Shmonad(
-                        self.account_index,
-                        self.proxy,
-                        self.private_key,
-                        self.config,
-                        self.session,
-                    )
-                    await shmonad.swaps()
-
-                elif task == "accountable":
-                    accountable = Accountable(
-                        self.account_index,
-                        self.proxy,
-                        self.private_key,
-                        self.config,
-                        self.session,
-                    )
-                    await accountable.mint()
-
-                elif task == "orbiter":
-                    orbiter = Orbiter(
-                        self.account_index,
-                        self.proxy,
-                        self.private_key,
-                        self.config,
-                        self.session,
-                    )
-                    await orbiter.bridge()
-
-                elif task == "logs":
-                    wallet_stats = WalletStats(self.config)
-                    await wallet_stats.get_wallet_stats(
-                        self.private_key, self.account_index
-                    )
-
-                elif task == "nad_domains":
-                    nad_domains = NadDomains(
-                        self.account_index,
-                        self.proxy,
-                        self.private_key,
-                        self.config,
-                        self.session,
-                    )
-                    await nad_domains.register_random_domain()
-
-                elif task == "kintsu":
-                    kintsu = Kintsu(
-                        self.account_index,
-                        self.proxy,
-                        self.private_key,
-                        self.config,
-                        self.session,
-                    )
-                    await kintsu.stake_mon()
-
-                elif task == "lilchogstars":
-                    lilchogstars = Lilchogstars(
-                        self.account_index,
-                        self.proxy,
-                        self.private_key,
-                        self.config,
-                        self.session,
-                    )
-                    await lilchogstars.mint()
-
-                elif task == "demask":
-                    demask = Demask(
-                        self.account_index,
-                        self.proxy,
-                        self.private_key,
-                        self.config,
-                        self.session,
-                    )
-                    await demask.mint()
-
-                elif task == "monadking":
-                    monadking = Monadking(
-                        self.account_index,
-                        self.private_key,
-                        self.config,
-                    )
-                    await monadking.mint()
-
-                elif task == "monadking_unlocked":
-                    monadking_unlocked = Monadking(
-                        self.account_index,
-                        self.private_key,
-                        self.config,
-                    )
-                    await monadking_unlocked.mint_unlocked()
+                current_task.set(task)
+                result = None
+                with span(task, "task", account=self.account_index):
+                    # Выполняем выбранную задачу
+                    if task == "faucet":
+                        if self.config.FAUCET.MONAD_XYZ:
+                            result = await monad.faucet()
+
+                    elif task == "swaps":
+                        result = await monad.swaps(type="swaps")
+
+                    elif task == "ambient":
+                        result = await monad.swaps(type="ambient")
+
+                    elif task == "bean":
+                        result = await monad.swaps(type="bean")
                 
-                elif task == "magiceden":
-                    magiceden = MagicEden(
-                        self.account_index,
-                        self.config,
-                        self.private_key,
-                        self.session,
-                    )
-                    await magiceden.mint()
+                    elif task == "izumi":
+                        result = await monad.swaps(type="izumi")
+
+                    elif task == "collect_all_to_monad":
+                        result = await monad.swaps(type="collect_all_to_monad")
+
+                    elif task == "gaszip":
+                        gaszip = Gaszip(
+                            self.account_index,
+                            self.proxy,
+                            self.private_key,
+                            self.config,
+                        )
+                        result = await gaszip.refuel()
+
+                    elif task == "apriori":
+                        apriori = Apriori(
+                            self.account_index,
+                            self.proxy,
+                            self.private_key,
+                            self.config,
+                            self.session,
+                        )
+                        result = await apriori.stake_mon()
+
+                    elif task == "magma":
+                        magma = Magma(
+                            self.account_index,
+                            self.proxy,
+                            self.private_key,
+                            self.config,
+                            self.session,
+                        )
+                        result = await magma.stake_mon()
+
+                    elif task == "owlto":
+                        owlto = Owlto(
+                            self.account_index,
+                            self.proxy,
+                            self.private_key,
+                            self.config,
+                            self.session,
+                        )
+                        result = await owlto.deploy_contract()
+
+                    elif task == "bima":
+                        bima = Bima(
+                            self.account_index,
+                            self.proxy,
+                            self.private_key,
+                            self.config,
+                            self.session,
+                        )
+                        result = await bima.get_faucet_tokens()
+                        await self.sleep("bima_faucet")
+
+                        if self.config.BIMA.LEND:
+                            result = await bima.lend()
+
+                    elif task == "monadverse_mint":
+                        monadverse_mint = MonadverseMint(
+                            self.account_index,
+                            self.proxy,
+                            self.private_key,
+                            self.config,
+                            self.session,
+                        )
+                        result = await monadverse_mint.mint()
+
+                    elif task == "shmonad":
+                        shmonad = Shmonad(
+                            self.account_index,
+                            self.proxy,
+                            self.private_key,
+                            self.config,
+                            self.session,
+                        )
+                        result = await shmonad.swaps()
+
+                    elif task == "accountable":
+                        accountable = Accountable(
+                            self.account_index,
+                            self.proxy,
+                            self.private_key,
+                            self.config,
+                            self.session,
+                        )
+                        result = await accountable.mint()
+
+                    elif task == "orbiter":
+                        orbiter = Orbiter(
+                            self.account_index,
+                            self.proxy,
+                            self.private_key,
+                            self.config,
+                            self.session,
+                        )
+                        result = await orbiter.bridge()
+
+                    elif task == "logs":
+                        # Статистика собирается для всех кошельков разом
+                        # батчами в конце запуска (FleetStatsCollector)
+                        result = True
+
+                    elif task == "nad_domains":
+                        nad_domains = NadDomains(
+                            self.account_index,
+                            self.proxy,
+                            self.private_key,
+                            self.config,
+                            self.session,
+                        )
+                        result = await nad_domains.register_random_domain()
+
+                    elif task == "kintsu":
+                        kintsu = Kintsu(
+                            self.account_index,
+                            self.proxy,
+                            self.private_key,
+                            self.config,
+                            self.session,
+                        )
+                        result = await kintsu.stake_mon()
+
+                    elif task == "lilchogstars":
+                        lilchogstars = Lilchogstars(
+                            self.account_index,
+                            self.proxy,
+                            self.private_key,
+                            self.config,
+                            self.session,
+                        )
+                        result = await lilchogstars.mint()
+
+                    elif task == "demask":
+                        demask = Demask(
+                            self.account_index,
+                            self.proxy,
+                            self.private_key,
+                            self.config,
+                            self.session,
+                        )
+                        result = await demask.mint()
+
+                    elif task == "monadking":
+                        monadking = Monadking(
+                            self.account_index,
+                            self.private_key,
+                            self.config,
+                        )
+                        result = await monadking.mint()
+
+                    elif task == "monadking_unlocked":
+                        monadking_unlocked = Monadking(
+                            self.account_index,
+                            self.private_key,
+                            self.config,
+                        )
+                        result = await monadking_unlocked.mint_unlocked()
                 
+                    elif task == "magiceden":
+                        magiceden = MagicEden(
+                            self.account_index,
+                            self.config,
+                            self.private_key,
+                            self.session,
+                        )
+                        result = await magiceden.mint()
+
+                # False - задача не выполнена, None и остальное - выполнена
+                await asyncio.to_thread(
+                    ACCOUNT_STORE.record_task, self.address, task, result is not False
+                )
                 await self.sleep(task)
 
             return True
         except Exception as e:
             # import traceback
             # traceback.print_exc()
+            note_error(e)
             logger.error(f"[{self.account_index}] | Error: {e}")
             return False
 
@@ -289,4 +318,4 @@ class Start:
         logger.info(
             f"[{self.account_index}] Sleeping {pause} seconds after {task_name}"
         )
-        await asyncio.sleep(pause)
+        await sleep(pause, "pause_between_actions")
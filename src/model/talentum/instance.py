@@ -9,6 +9,7 @@ from typing import Dict
 
 from src.utils.config import Config
 from src.utils.constants import EXPLORER_URL, RPC_URL
+from src.utils.provider import create_web3
 
 
 class Talentum:
@@ -18,7 +19,7 @@ class Talentum:
         self.config = config
         self.session = session
 
-        self.web3 = AsyncWeb3(AsyncWeb3.AsyncHTTPProvider(RPC_URL))
+        self.web3 = create_web3(RPC_URL)
         self.account = Account.from_key(private_key)
 
     async def login(self):
@@ -1,10 +1,10 @@
 from .client import create_client, create_twitter_client, get_headers
-from .reader import read_abi, read_txt_file
+from .reader import LineIndex, read_abi, read_txt_file
 from .logs import report_error, report_success
 from .output import show_dev_info, show_logo
 from .config import get_config
 from .constants import TOKENS, ERC20_ABI, RPC_URL, EXPLORER_URL
-from .email_parser import SyncEmailChecker
+from .email_parser import AsyncEmailChecker, SyncEmailChecker, get_email_checker
 from .statistics import print_wallets_stats
 
 __all__ = [
@@ -14,5 +14,8 @@ __all__ = [
     "read_abi",
     "read_config",
     "read_txt_file",
+    "LineIndex",
     "SyncEmailChecker",
+    "AsyncEmailChecker",
+    "get_email_checker",
 ]
@@ -0,0 +1,344 @@
+import hashlib
+import json
+import os
+import sqlite3
+from array import array
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from eth_account import Account
+from loguru import logger
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS accounts (
+    id INTEGER PRIMARY KEY,
+    address TEXT NOT NULL UNIQUE,
+    key_hash TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    number INTEGER,
+    active INTEGER NOT NULL DEFAULT 1,
+    proxy TEXT,
+    last_nonce INTEGER,
+    last_balance REAL,
+    last_status TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS accounts_kind_number ON accounts (kind, active, number);
+CREATE UNIQUE INDEX IF NOT EXISTS accounts_key_hash ON accounts (key_hash);
+
+CREATE TABLE IF NOT EXISTS task_status (
+    account_id INTEGER NOT NULL REFERENCES accounts (id),
+    task TEXT NOT NULL,
+    last_status TEXT NOT NULL,
+    last_run_at REAL NOT NULL,
+    last_success_at REAL,
+    runs INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (account_id, task)
+);
+CREATE INDEX IF NOT EXISTS task_status_task_success ON task_status (task, last_success_at);
+
+CREATE TABLE IF NOT EXISTS wallet_history (
+    account_id INTEGER NOT NULL REFERENCES accounts (id),
+    ts INTEGER NOT NULL,
+    balance REAL NOT NULL,
+    nonce INTEGER NOT NULL,
+    tasks TEXT,
+    PRIMARY KEY (account_id, ts)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS wallet_history_ts ON wallet_history (ts);
+"""
+
+def key_hash(private_key: str) -> str:
+    """Ключ в базе не хранится: только sha256 для сопоставления со строкой файла"""
+    normalized = private_key.strip().lower().removeprefix("0x")
+    return hashlib.sha256(normalized.encode()).hexdigest()
+
+
+MAIN = "main"
+FAUCET = "faucet"
+
+
+class AccountStore:
+    """
+    SQLite база аккаунтов: адрес, прокси, последний nonce и баланс, итог
+    последнего запуска и статус каждой задачи. Сами ключи остаются только
+    в текстовых файлах из data/ и берутся оттуда по номеру строки.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self._db: Optional[sqlite3.Connection] = None
+        # Соединение одно на все потоки: запись идет из asyncio.to_thread и
+        # потока RESULT_WRITER, на event loop ее не делаем - ждать замок там нельзя
+        self._lock = threading.Lock()
+
+    def open(self, path: str) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # Запись результатов идет из потока RESULT_WRITER
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._drop_plaintext_keys()
+        self._db.executescript(SCHEMA)
+        self.enabled = True
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+        self.enabled = False
+
+    def _drop_plaintext_keys(self) -> None:
+        """Базы старого формата хранили ключи открытым текстом: заменяем на хеш"""
+        columns = [row[1] for row in self._db.execute("PRAGMA table_info(accounts)")]
+        if "private_key" not in columns:
+            return
+        rows = self._db.execute("SELECT id, private_key FROM accounts").fetchall()
+        with self._transaction():
+            self._db.execute("DROP INDEX IF EXISTS accounts_private_key")
+            self._db.execute("ALTER TABLE accounts ADD COLUMN key_hash TEXT NOT NULL DEFAULT ''")
+            self._db.executemany(
+                "UPDATE accounts SET key_hash = ? WHERE id = ?",
+                [(key_hash(private_key), account_id) for account_id, private_key in rows],
+            )
+            self._db.execute("ALTER TABLE accounts DROP COLUMN private_key")
+        # Освобожденные страницы со старыми ключами не должны остаться в файле
+        self._db.execute("VACUUM")
+        self._db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        logger.info(f"Account store: removed plaintext keys of {len(rows)} accounts")
+
+    def sync_keys(self, kind: str, private_keys: Sequence[str]) -> None:
+        """
+        Импортирует ключи из txt файла. Номер аккаунта - позиция в файле,
+        ключи, которых больше нет в файле, помечаются неактивными.
+        Вызывается через asyncio.to_thread: для новых ключей вычисляется адрес.
+        """
+        now = time.time()
+        hashes = [key_hash(private_key) for private_key in private_keys]
+        with self._lock:
+            known = {row[0] for row in self._db.execute("SELECT key_hash FROM accounts")}
+
+        # Адрес вычисляется только для новых ключей, это самая дорогая часть
+        new_accounts = []
+        for number, (private_key, hashed) in enumerate(zip(private_keys, hashes), 1):
+            if hashed in known:
+                continue
+            try:
+                address = Account.from_key(private_key).address
+            except Exception:
+                logger.error(f"Invalid private key on line {number}, skipping it")
+                continue
+            new_accounts.append((address, hashed, kind, number, now, now))
+            known.add(hashed)
+
+        with self._transaction():
+            self._db.execute(
+                "UPDATE accounts SET active = 0, number = NULL WHERE kind = ?", (kind,)
+            )
+            self._db.executemany(
+                """
+                UPDATE accounts SET kind = ?, number = ?, active = 1, updated_at = ?
+                WHERE key_hash = ?
+                """,
+                [(kind, number, now, hashed) for number, hashed in enumerate(hashes, 1)],
+            )
+            self._db.executemany(
+                """
+                INSERT INTO accounts (address, key_hash, kind, number, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (address) DO UPDATE SET
+                    key_hash = excluded.key_hash,
+                    kind = excluded.kind,
+                    number = excluded.number,
+                    active = 1,
+                    updated_at = excluded.updated_at
+                """,
+                new_accounts,
+            )
+        logger.info(
+            f"Account store: {len(hashes)} {kind} keys synced, {len(new_accounts)} new"
+        )
+
+    def select(
+        self,
+        kind: str,
+        first: int = 0,
+        last: int = 0,
+        numbers: Optional[List[int]] = None,
+        not_done_task: str = "",
+        not_done_hours: float = 0,
+        skip_balance_above: float = 0,
+        skip_nonce_above: int = 0,
+        history_hours: float = 0,
+    ) -> array:
+        """
+        Возвращает номера подходящих аккаунтов, ключ берется из файла по номеру.
+        not_done_task - только аккаунты без успешного выполнения задачи за
+        последние not_done_hours часов. skip_balance_above / skip_nonce_above -
+        пропуск аккаунтов, у которых в последнем снимке истории за history_hours
+        часов баланс или nonce не меньше порога (0 - не проверять).
+        """
+        query = "SELECT a.number FROM accounts a"
+        where = ["a.kind = ?", "a.active = 1"]
+        params: List[Any] = [kind]
+
+        if not_done_task:
+            query += " LEFT JOIN task_status t ON t.account_id = a.id AND t.task = ?"
+            params.insert(0, not_done_task.lower())
+            where.append("(t.last_success_at IS NULL OR t.last_success_at < ?)")
+            params.append(time.time() - not_done_hours * 3600)
+
+        if skip_balance_above or skip_nonce_above:
+            # Последний снимок берется по индексу (account_id, ts)
+            where.append(
+                """
+                NOT EXISTS (
+                    SELECT 1 FROM (
+                        SELECT balance, nonce FROM wallet_history h
+                        WHERE h.account_id = a.id AND h.ts >= ?
+                        ORDER BY h.ts DESC LIMIT 1
+                    ) latest
+                    WHERE (? > 0 AND latest.balance >= ?) OR (? > 0 AND latest.nonce >= ?)
+                )
+                """
+            )
+            params.extend(
+                [
+                    int(time.time() - history_hours * 3600) if history_hours else 0,
+                    skip_balance_above,
+                    skip_balance_above,
+                    skip_nonce_above,
+                    skip_nonce_above,
+                ]
+            )
+
+        if first or last:
+            where.append("a.number BETWEEN ? AND ?")
+            params.extend([first or 1, last or 2**31])
+        elif numbers:
+            where.append(f"a.number IN ({', '.join('?' * len(numbers))})")
+            params.extend(numbers)
+
+        query += " WHERE " + " AND ".join(where) + " ORDER BY a.number"
+        with self._lock:
+            return array("I", (row[0] for row in self._db.execute(query, params)))
+
+    def record_task(self, address: str, task: str, ok: bool) -> None:
+        self.record_tasks([(address, task, ok)])
+
+    def record_tasks(self, records: List[Tuple[str, str, bool]]) -> None:
+        """(адрес, задача, успех) для многих аккаунтов одной транзакцией"""
+        if not self.enabled or not records:
+            return
+        now = time.time()
+        with self._transaction():
+            self._db.executemany(
+                """
+                INSERT INTO task_status (account_id, task, last_status, last_run_at, last_success_at, runs)
+                SELECT id, ?, ?, ?, ?, 1 FROM accounts WHERE address = ?
+                ON CONFLICT (account_id, task) DO UPDATE SET
+                    last_status = excluded.last_status,
+                    last_run_at = excluded.last_run_at,
+                    last_success_at = COALESCE(excluded.last_success_at, last_success_at),
+                    runs = runs + 1
+                """,
+                [
+                    (task, "success" if ok else "error", now, now if ok else None, address)
+                    for address, task, ok in records
+                ],
+            )
+
+    def update_wallet(self, address: str, nonce: int, balance: float) -> None:
+        self.update_wallets([(address, nonce, balance)])
+
+    def update_wallets(
+        self, wallets: List[Tuple[str, int, float]], ts: Optional[int] = None
+    ) -> None:
+        """
+        (адрес, nonce, баланс) для многих кошельков одной транзакцией.
+        Кроме последних значений в accounts, снимок дописывается в
+        wallet_history вместе с числом запусков каждой задачи.
+        """
+        if not self.enabled or not wallets:
+            return
+        now = time.time()
+        ts = ts or int(now)
+        with self._transaction():
+            self._db.executemany(
+                "UPDATE accounts SET last_nonce = ?, last_balance = ?, updated_at = ? WHERE address = ?",
+                [(nonce, balance, now, address) for address, nonce, balance in wallets],
+            )
+            self._db.executemany(
+                """
+                INSERT OR REPLACE INTO wallet_history (account_id, ts, balance, nonce, tasks)
+                SELECT a.id, ?, ?, ?, (
+                    SELECT json_group_object(t.task, t.runs) FROM task_status t
+                    WHERE t.account_id = a.id
+                )
+                FROM accounts a WHERE a.address = ?
+                """,
+                [(ts, balance, nonce, address) for address, nonce, balance in wallets],
+            )
+
+    def wallet_history(self, address: str, since: float = 0) -> List[Dict[str, Any]]:
+        """Снимки одного кошелька по времени, для графиков без запросов к RPC"""
+        with self._lock:
+            rows = self._db.execute(
+                """
+                SELECT h.ts, h.balance, h.nonce, h.tasks FROM wallet_history h
+                JOIN accounts a ON a.id = h.account_id
+                WHERE a.address = ? AND h.ts >= ? ORDER BY h.ts
+                """,
+                (address, int(since)),
+            ).fetchall()
+        return [
+            {"ts": ts, "balance": balance, "nonce": nonce, "tasks": json.loads(tasks or "{}")}
+            for ts, balance, nonce, tasks in rows
+        ]
+
+    def fleet_history(self, since: float = 0) -> List[Tuple[int, int, float, int]]:
+        """(ts снимка, кошельков, сумма балансов, сумма nonce) по каждому сбору статистики"""
+        with self._lock:
+            return self._db.execute(
+                """
+                SELECT ts, COUNT(*), SUM(balance), SUM(nonce) FROM wallet_history
+                WHERE ts >= ? GROUP BY ts ORDER BY ts
+                """,
+                (int(since),),
+            ).fetchall()
+
+    def write(self, records: List[Dict[str, Any]]) -> None:
+        """Sink для RESULT_WRITER: итог аккаунта и прокси, на котором он работал"""
+        with self._transaction():
+            self._db.executemany(
+                "UPDATE accounts SET last_status = ?, proxy = ?, updated_at = ? WHERE address = ?",
+                [
+                    (record["status"], record["proxy"], record["ts"], record["address"])
+                    for record in records
+                ],
+            )
+
+    def _transaction(self):
+        return _Transaction(self._db, self._lock)
+
+
+class _Transaction:
+    def __init__(self, db: sqlite3.Connection, lock: threading.Lock):
+        self.db = db
+        self.lock = lock
+
+    def __enter__(self):
+        self.lock.acquire()
+        self.db.execute("BEGIN")
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            self.db.execute("ROLLBACK" if exc_type else "COMMIT")
+        finally:
+            self.lock.release()
+
+
+ACCOUNT_STORE = AccountStore()
@@ -0,0 +1,155 @@
+import time
+from enum import Enum
+from typing import Dict, Optional
+
+from loguru import logger
+
+from src.utils.metrics import REGISTRY
+from src.utils.retry import ErrorClass
+
+
+class CircuitState(str, Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+CIRCUIT_STATE = REGISTRY.gauge(
+    "circuit_state", "Circuit breaker state (0 closed, 1 half-open, 2 open)", ("service",)
+)
+CIRCUIT_OPENED = REGISTRY.counter(
+    "circuit_opened_total", "Times a circuit breaker has opened", ("service",)
+)
+CIRCUIT_REJECTED = REGISTRY.counter(
+    "circuit_rejected_total", "Calls skipped because the circuit was open", ("service",)
+)
+
+_STATE_VALUES = {
+    CircuitState.CLOSED: 0,
+    CircuitState.HALF_OPEN: 1,
+    CircuitState.OPEN: 2,
+}
+
+
+class CircuitOpenError(Exception):
+    """Сервис недоступен для всех аккаунтов, повторять сейчас бессмысленно"""
+
+    error_class = ErrorClass.DETERMINISTIC
+
+    def __init__(self, service: str, retry_in: float):
+        super().__init__(
+            f"{service} is unavailable, circuit open for another {retry_in:.0f} seconds"
+        )
+        self.service = service
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """
+    Общий для всех аккаунтов предохранитель внешнего сервиса.
+    После failure_threshold ошибок подряд сервис считается недоступным на
+    recovery_timeout секунд, затем пропускается один пробный запрос.
+    """
+
+    def __init__(self, name: str, failure_threshold: int, recovery_timeout: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+
+        self._state = CircuitState.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_started: Optional[float] = None
+        CIRCUIT_STATE.set(0, service=name)
+
+    @property
+    def state(self) -> CircuitState:
+        if (
+            self._state == CircuitState.OPEN
+            and time.monotonic() - self._opened_at >= self.recovery_timeout
+        ):
+            self._set_state(CircuitState.HALF_OPEN)
+        return self._state
+
+    @property
+    def is_open(self) -> bool:
+        """Проверка без занятия слота пробного запроса"""
+        return self.state == CircuitState.OPEN
+
+    @property
+    def retry_in(self) -> float:
+        return max(self.recovery_timeout - (time.monotonic() - self._opened_at), 0)
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == CircuitState.CLOSED:
+            return True
+
+        if state == CircuitState.HALF_OPEN:
+            now = time.monotonic()
+            # Пробный запрос, результат которого так и не пришел, не блокирует навсегда
+            if (
+                self._probe_started is None
+                or now - self._probe_started >= self.recovery_timeout
+            ):
+                self._probe_started = now
+                return True
+
+        CIRCUIT_REJECTED.inc(service=self.name)
+        return False
+
+    def check(self) -> None:
+        """Бросает CircuitOpenError, если запрос к сервису сейчас делать нельзя"""
+        if not self.allow():
+            raise CircuitOpenError(self.name, self.retry_in)
+
+    def record_success(self) -> None:
+        self._failures = 0
+        self._probe_started = None
+        if self._state != CircuitState.CLOSED:
+            logger.info(f"{self.name} is available again, circuit closed")
+            self._set_state(CircuitState.CLOSED)
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        if self._state == CircuitState.HALF_OPEN or (
+            self._state == CircuitState.CLOSED
+            and self._failures >= self.failure_threshold
+        ):
+            self._open()
+
+    def _open(self) -> None:
+        self._opened_at = time.monotonic()
+        self._probe_started = None
+        self._set_state(CircuitState.OPEN)
+        CIRCUIT_OPENED.inc(service=self.name)
+        logger.warning(
+            f"{self.name} looks unavailable after {self._failures} failures, "
+            f"skipping it for {self.recovery_timeout} seconds"
+        )
+
+    def _set_state(self, state: CircuitState) -> None:
+        self._state = state
+        CIRCUIT_STATE.set(_STATE_VALUES[state], service=self.name)
+
+
+# Значения по умолчанию до вызова configure_circuit_breakers
+_settings = {"failure_threshold": 5, "recovery_timeout": 120.0}
+_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def configure_circuit_breakers(failure_threshold: int, recovery_timeout: float) -> None:
+    _settings["failure_threshold"] = failure_threshold
+    _settings["recovery_timeout"] = recovery_timeout
+    for breaker in _breakers.values():
+        breaker.failure_threshold = failure_threshold
+        breaker.recovery_timeout = recovery_timeout
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    """Возвращает общий предохранитель сервиса, создавая его при первом обращении"""
+    breaker = _breakers.get(name)
+    if breaker is None:
+        breaker = CircuitBreaker(name, **_settings)
+        _breakers[name] = breaker
+    return breaker
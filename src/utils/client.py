@@ -1,11 +1,79 @@
-import primp
+import time
+from typing import Callable, Dict, Hashable, Optional, Tuple
+from urllib.parse import urlparse
 
+import primp
 
-async def create_client(proxy: str) -> primp.AsyncClient:
-    session = primp.AsyncClient(impersonate="chrome_131", verify=False)
+from src.utils.metrics import HTTP_ERRORS, HTTP_IN_FLIGHT, HTTP_LATENCY, REGISTRY
+from src.utils.tracing import span
+
+
+POOL_CLIENTS = REGISTRY.gauge("http_pool_clients", "HTTP clients kept in the pool")
+
+# Получает (прокси, запрос прошел) для каждого запроса через прокси
+_proxy_observer: Optional[Callable[[str, bool], None]] = None
+
+
+def set_proxy_observer(observer: Optional[Callable[[str, bool], None]]) -> None:
+    global _proxy_observer
+    _proxy_observer = observer
+
+
+def _path_label(path: str) -> str:
+    """Заменяет id в пути на :id, чтобы не плодить метки"""
+    parts = []
+    for part in path.split("/"):
+        if len(part) > 16 or any(char.isdigit() for char in part):
+            part = ":id"
+        parts.append(part)
+    return "/".join(parts) or "/"
+
+
+class InstrumentedAsyncClient(primp.AsyncClient):
+    """primp.AsyncClient, который пишет метрики по каждому HTTP запросу"""
+
+    proxy_label = ""
+
+    async def request(self, method: str, url: str, **kwargs):
+        parsed = urlparse(url)
+        host = parsed.netloc
+        path = _path_label(parsed.path)
+        HTTP_IN_FLIGHT.inc(host=host)
+        start = time.perf_counter()
+        try:
+            with span(f"{method} {host}{path}", "http"):
+                response = await super().request(method, url, **kwargs)
+        except Exception as e:
+            HTTP_ERRORS.inc(method=method, host=host, error=type(e).__name__)
+            if self.proxy_label and _proxy_observer:
+                _proxy_observer(self.proxy_label, False)
+            raise
+        finally:
+            HTTP_LATENCY.observe(
+                time.perf_counter() - start,
+                method=method,
+                host=host,
+                path=path,
+            )
+            HTTP_IN_FLIGHT.dec(host=host)
+
+        if response.status_code >= 400:
+            HTTP_ERRORS.inc(method=method, host=host, error=f"status_{response.status_code}")
+        if self.proxy_label and _proxy_observer:
+            _proxy_observer(self.proxy_label, response.status_code != 407)
+        return response
+
+
+def _build_client(
+    proxy: str, impersonate: str = "chrome_131", cookie_store: bool = True
+) -> InstrumentedAsyncClient:
+    session = InstrumentedAsyncClient(
+        impersonate=impersonate, verify=False, cookie_store=cookie_store
+    )
 
     if proxy:
         session.proxy = proxy
+        session.proxy_label = proxy
 
     session.timeout = 30
 
@@ -14,6 +82,78 @@ async def create_client(proxy: str) -> primp.AsyncClient:
     return session
 
 
+async def create_client(proxy: str) -> primp.AsyncClient:
+    return _build_client(proxy)
+
+
+class ClientPool:
+    """
+    Пул переиспользуемых HTTP клиентов, чтобы не делать новый TLS handshake
+    через прокси на каждый запрос.
+
+    Клиенты без scope не хранят cookies и общие для всех аккаунтов с одним
+    прокси. Клиенты со scope (номер аккаунта) хранят cookies и принадлежат
+    одному аккаунту, их нужно отпускать через release.
+    """
+
+    def __init__(self, max_clients: int = 200, idle_timeout: float = 300):
+        self.max_clients = max_clients
+        self.idle_timeout = idle_timeout
+        # key -> [клиент, время последнего использования]
+        self._clients: Dict[Tuple, list] = {}
+
+    def configure(self, max_clients: int, idle_timeout: float) -> None:
+        self.max_clients = max_clients
+        self.idle_timeout = idle_timeout
+
+    async def acquire(
+        self,
+        proxy: str,
+        impersonate: str = "chrome_131",
+        scope: Optional[Hashable] = None,
+    ) -> primp.AsyncClient:
+        key = (proxy, impersonate, scope)
+        now = time.monotonic()
+
+        entry = self._clients.get(key)
+        if entry is not None:
+            entry[1] = now
+            return entry[0]
+
+        self._evict_idle(now)
+        if len(self._clients) >= self.max_clients:
+            # Удаляем самый давно использованный клиент
+            oldest = min(self._clients, key=lambda k: self._clients[k][1])
+            del self._clients[oldest]
+
+        client = _build_client(proxy, impersonate, cookie_store=scope is not None)
+        self._clients[key] = [client, now]
+        POOL_CLIENTS.set(len(self._clients))
+        return client
+
+    def release(self, scope: Hashable) -> None:
+        """Отпускает все клиенты аккаунта"""
+        for key in [key for key in self._clients if key[2] == scope]:
+            del self._clients[key]
+        POOL_CLIENTS.set(len(self._clients))
+
+    def _evict_idle(self, now: float) -> None:
+        for key in [
+            key
+            for key, (_, last_used) in self._clients.items()
+            if now - last_used >= self.idle_timeout
+        ]:
+            del self._clients[key]
+        POOL_CLIENTS.set(len(self._clients))
+
+    def close(self) -> None:
+        self._clients.clear()
+        POOL_CLIENTS.set(0)
+
+
+CLIENT_POOL = ClientPool()
+
+
 HEADERS = {
     "accept": "*/*",
     "accept-language": "en-GB,en-US;q=0.9,en;q=0.8,ru;q=0.7,zh-TW;q=0.6,zh;q=0.5",
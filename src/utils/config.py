@@ -52,20 +52,16 @@ class FaucetConfig:
     MONAD_XYZ: bool
     CAPSOLVER_API_KEY: str
     PROXY_FOR_CAPTCHA: str
+    PRESOLVE_TOKENS: int
+    TOKEN_TTL: float
 
 
 @dataclass
-class WalletInfo:
-    account_index: int
-    private_key: str
-    address: str
-    balance: float
-    transactions: int
-
-
-@dataclass
-class WalletsConfig:
-    wallets: List[WalletInfo] = field(default_factory=list)
+class FarmFaucetConfig:
+    CAPTCHA_CONCURRENCY: int
+    CLAIM_CONCURRENCY: int
+    RESULTS_PATH: str
+    SKIP_CLAIMED: bool
 
 
 @dataclass
@@ -100,6 +96,17 @@ class OrbiterConfig:
 @dataclass
 class DisperseConfig:
     MIN_BALANCE_FOR_DISPERSE: Tuple[float, float]
+    PIPELINED: bool
+    BATCH_SIZE: int
+    BURST_SIZE: int
+    PAUSE_BETWEEN_BURSTS: Tuple[float, float]
+    RECEIPT_TIMEOUT: float
+    MULTISEND: bool
+    MULTISEND_BATCH: int
+    MULTISEND_CONTRACT_PATH: str
+    CONCURRENT_SWEEP: bool
+    TX_PER_SECOND: float
+    TX_BURST: int
 
 
 @dataclass
@@ -120,6 +127,95 @@ class MagicEdenConfig:
     NFT_CONTRACTS: List[str]
 
 
+@dataclass
+class MetricsConfig:
+    ENABLED: bool
+    HOST: str
+    PORT: int
+    DUMP_PATH: str
+
+
+@dataclass
+class TracingConfig:
+    ENABLED: bool
+    PATH: str
+
+
+@dataclass
+class LoggingConfig:
+    LEVEL: str
+    JSON_PATH: str
+    SAMPLE_WINDOW: int
+    MAX_REPEATS: int
+
+
+@dataclass
+class RetryConfig:
+    BASE_DELAY: float
+    RATE_LIMIT_DELAY: float
+    MAX_DELAY: float
+    MULTIPLIER: float
+    BUDGET_PER_ACCOUNT: int
+
+
+@dataclass
+class CircuitBreakerConfig:
+    FAILURE_THRESHOLD: int
+    RECOVERY_TIMEOUT: float
+
+
+@dataclass
+class ClientPoolConfig:
+    MAX_CLIENTS: int
+    IDLE_TIMEOUT: float
+
+
+@dataclass
+class ResultsConfig:
+    TEXT_FILES: bool
+    JSON_PATH: str
+    FLUSH_INTERVAL: float
+    BATCH_SIZE: int
+
+
+@dataclass
+class AccountStoreConfig:
+    ENABLED: bool
+    PATH: str
+    NOT_DONE_TASK: str
+    NOT_DONE_HOURS: float
+    SKIP_BALANCE_ABOVE: float
+    SKIP_NONCE_ABOVE: int
+    HISTORY_HOURS: float
+
+
+@dataclass
+class StatsConfig:
+    BATCH_SIZE: int
+    CONCURRENCY: int
+    INTERVAL: float
+    TOP_N: int
+    EXPORT_PATH: str
+
+
+@dataclass
+class PreflightConfig:
+    ENABLED: bool
+    BATCH_SIZE: int
+    CONCURRENCY: int
+
+
+@dataclass
+class ProxyCheckConfig:
+    ENABLED: bool
+    TARGETS: List[str]
+    TIMEOUT: float
+    PROBE_INTERVAL: float
+    MAX_FAILURES: int
+    QUARANTINE_TIME: float
+    CONCURRENCY: int
+
+
 @dataclass
 class Config:
     SETTINGS: SettingsConfig
@@ -129,6 +225,7 @@ class Config:
     KINTSU: KintsuConfig
     BIMA: BimaConfig
     FAUCET: FaucetConfig
+    FARM_FAUCET: FarmFaucetConfig
     GASZIP: GaszipConfig
     SHMONAD: ShmonadConfig
     ACCOUNTABLE: AccountableConfig
@@ -138,7 +235,17 @@ class Config:
     DEMASK: DemaskConfig
     MONADKING: MonadkingConfig
     MAGICEDEN: MagicEdenConfig
-    WALLETS: WalletsConfig = field(default_factory=WalletsConfig)
+    METRICS: MetricsConfig
+    TRACING: TracingConfig
+    LOGGING: LoggingConfig
+    RETRY: RetryConfig
+    CIRCUIT_BREAKER: CircuitBreakerConfig
+    CLIENT_POOL: ClientPoolConfig
+    PROXY_CHECK: ProxyCheckConfig
+    RESULTS: ResultsConfig
+    ACCOUNT_STORE: AccountStoreConfig
+    STATS: StatsConfig
+    PREFLIGHT: PreflightConfig
     lock: asyncio.Lock = field(default_factory=asyncio.Lock)
 
     @classmethod
@@ -194,6 +301,14 @@ class Config:
                 MONAD_XYZ=data["FAUCET"]["MONAD_XYZ"],
                 CAPSOLVER_API_KEY=data["FAUCET"]["CAPSOLVER_API_KEY"],
                 PROXY_FOR_CAPTCHA=data["FAUCET"]["PROXY_FOR_CAPTCHA"],
+                PRESOLVE_TOKENS=data["FAUCET"]["PRESOLVE_TOKENS"],
+                TOKEN_TTL=data["FAUCET"]["TOKEN_TTL"],
+            ),
+            FARM_FAUCET=FarmFaucetConfig(
+                CAPTCHA_CONCURRENCY=data["FARM_FAUCET"]["CAPTCHA_CONCURRENCY"],
+                CLAIM_CONCURRENCY=data["FARM_FAUCET"]["CLAIM_CONCURRENCY"],
+                RESULTS_PATH=data["FARM_FAUCET"]["RESULTS_PATH"],
+                SKIP_CLAIMED=data["FARM_FAUCET"]["SKIP_CLAIMED"],
             ),
             GASZIP=GaszipConfig(
                 NETWORKS_TO_REFUEL_FROM=data["GASZIP"]["NETWORKS_TO_REFUEL_FROM"],
@@ -222,6 +337,17 @@ class Config:
                 MIN_BALANCE_FOR_DISPERSE=tuple(
                     data["DISPERSE"]["MIN_BALANCE_FOR_DISPERSE"]
                 ),
+                PIPELINED=data["DISPERSE"]["PIPELINED"],
+                BATCH_SIZE=data["DISPERSE"]["BATCH_SIZE"],
+                BURST_SIZE=data["DISPERSE"]["BURST_SIZE"],
+                PAUSE_BETWEEN_BURSTS=tuple(data["DISPERSE"]["PAUSE_BETWEEN_BURSTS"]),
+                RECEIPT_TIMEOUT=data["DISPERSE"]["RECEIPT_TIMEOUT"],
+                MULTISEND=data["DISPERSE"]["MULTISEND"],
+                MULTISEND_BATCH=data["DISPERSE"]["MULTISEND_BATCH"],
+                MULTISEND_CONTRACT_PATH=data["DISPERSE"]["MULTISEND_CONTRACT_PATH"],
+                CONCURRENT_SWEEP=data["DISPERSE"]["CONCURRENT_SWEEP"],
+                TX_PER_SECOND=data["DISPERSE"]["TX_PER_SECOND"],
+                TX_BURST=data["DISPERSE"]["TX_BURST"],
             ),
             LILCHOGSTARS=LilchogstarsConfig(
                 MAX_AMOUNT_FOR_EACH_ACCOUNT=tuple(
@@ -241,6 +367,73 @@ class Config:
             MAGICEDEN=MagicEdenConfig(
                 NFT_CONTRACTS=data["MAGICEDEN"]["NFT_CONTRACTS"],
             ),
+            METRICS=MetricsConfig(
+                ENABLED=data["METRICS"]["ENABLED"],
+                HOST=data["METRICS"]["HOST"],
+                PORT=data["METRICS"]["PORT"],
+                DUMP_PATH=data["METRICS"]["DUMP_PATH"],
+            ),
+            TRACING=TracingConfig(
+                ENABLED=data["TRACING"]["ENABLED"],
+                PATH=data["TRACING"]["PATH"],
+            ),
+            LOGGING=LoggingConfig(
+                LEVEL=data["LOGGING"]["LEVEL"],
+                JSON_PATH=data["LOGGING"]["JSON_PATH"],
+                SAMPLE_WINDOW=data["LOGGING"]["SAMPLE_WINDOW"],
+                MAX_REPEATS=data["LOGGING"]["MAX_REPEATS"],
+            ),
+            RETRY=RetryConfig(
+                BASE_DELAY=data["RETRY"]["BASE_DELAY"],
+                RATE_LIMIT_DELAY=data["RETRY"]["RATE_LIMIT_DELAY"],
+                MAX_DELAY=data["RETRY"]["MAX_DELAY"],
+                MULTIPLIER=data["RETRY"]["MULTIPLIER"],
+                BUDGET_PER_ACCOUNT=data["RETRY"]["BUDGET_PER_ACCOUNT"],
+            ),
+            CIRCUIT_BREAKER=CircuitBreakerConfig(
+                FAILURE_THRESHOLD=data["CIRCUIT_BREAKER"]["FAILURE_THRESHOLD"],
+                RECOVERY_TIMEOUT=data["CIRCUIT_BREAKER"]["RECOVERY_TIMEOUT"],
+            ),
+            CLIENT_POOL=ClientPoolConfig(
+                MAX_CLIENTS=data["CLIENT_POOL"]["MAX_CLIENTS"],
+                IDLE_TIMEOUT=data["CLIENT_POOL"]["IDLE_TIMEOUT"],
+            ),
+            PROXY_CHECK=ProxyCheckConfig(
+                ENABLED=data["PROXY_CHECK"]["ENABLED"],
+                TARGETS=data["PROXY_CHECK"]["TARGETS"],
+                TIMEOUT=data["PROXY_CHECK"]["TIMEOUT"],
+                PROBE_INTERVAL=data["PROXY_CHECK"]["PROBE_INTERVAL"],
+                MAX_FAILURES=data["PROXY_CHECK"]["MAX_FAILURES"],
+                QUARANTINE_TIME=data["PROXY_CHECK"]["QUARANTINE_TIME"],
+                CONCURRENCY=data["PROXY_CHECK"]["CONCURRENCY"],
+            ),
+            RESULTS=ResultsConfig(
+                TEXT_FILES=data["RESULTS"]["TEXT_FILES"],
+                JSON_PATH=data["RESULTS"]["JSON_PATH"],
+                FLUSH_INTERVAL=data["RESULTS"]["FLUSH_INTERVAL"],
+                BATCH_SIZE=data["RESULTS"]["BATCH_SIZE"],
+            ),
+            ACCOUNT_STORE=AccountStoreConfig(
+                ENABLED=data["ACCOUNT_STORE"]["ENABLED"],
+                PATH=data["ACCOUNT_STORE"]["PATH"],
+                NOT_DONE_TASK=data["ACCOUNT_STORE"]["NOT_DONE_TASK"],
+                NOT_DONE_HOURS=data["ACCOUNT_STORE"]["NOT_DONE_HOURS"],
+                SKIP_BALANCE_ABOVE=data["ACCOUNT_STORE"]["SKIP_BALANCE_ABOVE"],
+                SKIP_NONCE_ABOVE=data["ACCOUNT_STORE"]["SKIP_NONCE_ABOVE"],
+                HISTORY_HOURS=data["ACCOUNT_STORE"]["HISTORY_HOURS"],
+            ),
+            STATS=StatsConfig(
+                BATCH_SIZE=data["STATS"]["BATCH_SIZE"],
+                CONCURRENCY=data["STATS"]["CONCURRENCY"],
+                INTERVAL=data["STATS"]["INTERVAL"],
+                TOP_N=data["STATS"]["TOP_N"],
+                EXPORT_PATH=data["STATS"]["EXPORT_PATH"],
+            ),
+            PREFLIGHT=PreflightConfig(
+                ENABLED=data["PREFLIGHT"]["ENABLED"],
+                BATCH_SIZE=data["PREFLIGHT"]["BATCH_SIZE"],
+                CONCURRENCY=data["PREFLIGHT"]["CONCURRENCY"],
+            ),
         )
 
 
@@ -0,0 +1,8 @@
+from contextvars import ContextVar
+from typing import Optional
+
+
+# Номер аккаунта и текущая задача для логов, метрик и трейсинга.
+# Каждый аккаунт работает в своей asyncio задаче, поэтому значения не пересекаются.
+current_account: ContextVar[Optional[int]] = ContextVar("current_account", default=None)
+current_task: ContextVar[str] = ContextVar("current_task", default="")
@@ -1,8 +1,8 @@
 import re
-from typing import Optional
+from typing import Dict, List, Optional, Set
 import asyncio
 from loguru import logger
-from imap_tools import MailBox
+from imap_tools import AND, MailBox
 from datetime import datetime, timedelta
 import pytz
 import time
@@ -15,7 +15,8 @@ class SyncEmailChecker:
         self.imap_server = self._get_imap_server(email)
         self.search_start_time = datetime.now(pytz.UTC)
 
-    def _get_imap_server(self, email: str) -> str:
+    @staticmethod
+    def _get_imap_server(email: str) -> str:
         """Returns the IMAP server based on the email domain."""
         if email.endswith("@rambler.ru"):
             return "imap.rambler.ru"
@@ -132,3 +133,177 @@ class SyncEmailChecker:
                 f"Account: {self.email} | Failed to check email for code: {error}"
             )
             return None
+
+
+# Код из 6 заглавных букв и цифр
+CODE_PATTERN = re.compile(r"\b[A-Z0-9]{6}\b")
+SPAM_FOLDERS = ("SPAM", "Spam", "spam", "Junk", "junk", "Spamverdacht")
+
+
+def _as_utc(date: datetime) -> datetime:
+    return date.replace(tzinfo=pytz.UTC) if date.tzinfo is None else date
+
+
+class AsyncEmailChecker:
+    """
+    Асинхронная проверка почты на одном IMAP соединении.
+    Поиск идет на сервере (SINCE/FROM), скачиваются только новые UID: сначала
+    заголовки, тело - только у подходящих по дате писем. Между проверками
+    ждем push от сервера через IDLE, если сервер его поддерживает.
+    Блокирующие вызовы imap_tools выполняются в отдельном потоке.
+    """
+
+    # Сервер может молча закрыть IDLE, поэтому ждем не дольше этого
+    IDLE_TIMEOUT = 60
+
+    def __init__(self, email: str, password: str):
+        self.email = email
+        self.password = password
+        self.imap_server = SyncEmailChecker._get_imap_server(email)
+        self.search_start_time = datetime.now(pytz.UTC)
+
+        self._mailbox: Optional[MailBox] = None
+        # Соединение одно, команды по нему идут строго по очереди
+        self._lock = asyncio.Lock()
+        # folder -> уже просмотренные UID
+        self._seen: Dict[str, Set[str]] = {}
+
+    async def check_email_for_code(
+        self,
+        max_attempts: int = 20,
+        delay_seconds: int = 3,
+        sender: Optional[str] = None,
+    ) -> Optional[str]:
+        """
+        Ждет код не дольше max_attempts * delay_seconds секунд.
+        sender - адрес отправителя для поиска на сервере.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + max_attempts * delay_seconds
+        try:
+            async with self._lock:
+                while True:
+                    code = await asyncio.to_thread(self._search_new, "INBOX", sender)
+                    if code:
+                        return code
+
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    await self._wait_for_new_mail(min(remaining, self.IDLE_TIMEOUT), delay_seconds)
+
+                logger.warning(
+                    f"Account: {self.email} | Code not found after {max_attempts * delay_seconds} seconds, searching in spam folder..."
+                )
+                for spam_folder in SPAM_FOLDERS:
+                    code = await asyncio.to_thread(self._search_new, spam_folder, sender)
+                    if code:
+                        logger.success(f"Account: {self.email} | Found code in spam: {code}")
+                        return code
+
+            logger.error(f"Account: {self.email} | Code not found in any folder")
+            return None
+
+        except Exception as error:
+            logger.error(f"Account: {self.email} | Failed to check email for code: {error}")
+            await self.close()
+            return None
+
+    async def close(self) -> None:
+        mailbox, self._mailbox = self._mailbox, None
+        if mailbox is not None:
+            try:
+                await asyncio.to_thread(mailbox.logout)
+            except Exception:
+                pass
+
+    async def _wait_for_new_mail(self, timeout: float, delay_seconds: int) -> None:
+        mailbox = await asyncio.to_thread(self._connect)
+        if "IDLE" in mailbox.client.capabilities:
+            await asyncio.to_thread(mailbox.idle.wait, timeout)
+        else:
+            await asyncio.sleep(min(delay_seconds, timeout))
+
+    def _connect(self) -> MailBox:
+        """Переиспользует соединение, переподключается, если оно оборвалось"""
+        if self._mailbox is not None:
+            try:
+                self._mailbox.client.noop()
+            except Exception:
+                self._mailbox = None
+
+        if self._mailbox is None:
+            self._mailbox = MailBox(self.imap_server).login(self.email, self.password)
+        return self._mailbox
+
+    def _search_new(self, folder: str, sender: Optional[str]) -> Optional[str]:
+        mailbox = self._connect()
+        if folder != "INBOX":
+            if not mailbox.folder.exists(folder):
+                return None
+            mailbox.folder.set(folder)
+
+        try:
+            time_threshold = self.search_start_time - timedelta(seconds=60)
+            # SINCE на сервере работает с точностью до дня и в часовом поясе
+            # сервера, поэтому берем на день раньше, точнее фильтруем по заголовкам
+            criteria = AND(date_gte=(time_threshold - timedelta(days=1)).date())
+            if sender:
+                criteria = AND(criteria, from_=sender)
+
+            seen = self._seen.setdefault(folder, set())
+            new_uids = [uid for uid in mailbox.uids(criteria) if uid not in seen]
+            if not new_uids:
+                return None
+
+            candidates = []
+            for msg in mailbox.fetch(
+                AND(uid=new_uids), headers_only=True, mark_seen=False, bulk=True
+            ):
+                if _as_utc(msg.date) >= time_threshold:
+                    candidates.append(msg)
+                else:
+                    # Письмо старше запроса кода: проверять его больше незачем
+                    seen.add(msg.uid)
+            candidates.sort(key=lambda msg: _as_utc(msg.date), reverse=True)
+            return self._find_code(mailbox, [msg.uid for msg in candidates], seen)
+        finally:
+            if folder != "INBOX":
+                mailbox.folder.set("INBOX")
+
+    def _find_code(self, mailbox: MailBox, uids: List[str], seen: Set[str]) -> Optional[str]:
+        """Письмо попадает в seen только после того, как его текст проверен"""
+        for uid in uids:
+            for msg in mailbox.fetch(AND(uid=uid), mark_seen=False):
+                body = msg.text or msg.html
+                if not body:
+                    continue
+                matches = CODE_PATTERN.findall(body)
+                if matches:
+                    seen.add(uid)
+                    return matches[0]
+            seen.add(uid)
+        return None
+
+
+_checkers: Dict[str, AsyncEmailChecker] = {}
+
+
+def get_email_checker(email: str, password: str) -> AsyncEmailChecker:
+    """
+    Проверка почты на одном соединении для каждого аккаунта.
+    Вызывать перед запросом кода: письма ищутся начиная с этого момента.
+    """
+    checker = _checkers.get(email)
+    if checker is None or checker.password != password:
+        checker = AsyncEmailChecker(email, password)
+        _checkers[email] = checker
+    else:
+        checker.search_start_time = datetime.now(pytz.UTC)
+    return checker
+
+
+async def close_email_checkers() -> None:
+    checkers = list(_checkers.values())
+    _checkers.clear()
+    await asyncio.gather(*(checker.close() for checker in checkers))
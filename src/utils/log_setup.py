@@ -0,0 +1,136 @@
+import json
+import os
+import sys
+import time
+from typing import Dict, Tuple
+
+from loguru import logger
+
+from src.utils.config import Config
+from src.utils.context import current_account, current_task
+
+
+CONSOLE_FORMAT = (
+    "<light-cyan>{time:HH:mm:ss}</light-cyan> | <level>{level: <8}</level> | "
+    "<fg #ffffff>{name}:{line}</fg #ffffff> - <bold>{message}</bold>"
+)
+FILE_FORMAT = "{time:YYYY-MM-DD HH:mm:ss} | {level} | {name}:{line} - {message}"
+
+# Ошибки уровня CRITICAL никогда не сэмплируются
+NEVER_SAMPLED = {"CRITICAL"}
+
+
+class RepeatSampler:
+    """
+    Ограничивает количество одинаковых сообщений (одна и та же строка кода
+    у одного аккаунта) в пределах окна. Подавленные сообщения считаются, и их
+    количество добавляется к следующему пропущенному сообщению.
+    """
+
+    def __init__(self, window: float, max_repeats: int):
+        self.window = window
+        self.max_repeats = max_repeats
+        # key -> [начало окна, пропущено, подавлено]
+        self._state: Dict[Tuple, list] = {}
+
+    def allow(self, record: dict) -> bool:
+        if self.max_repeats <= 0 or record["level"].name in NEVER_SAMPLED:
+            return True
+
+        key = (record["extra"].get("account"), record["name"], record["line"])
+        now = time.monotonic()
+        state = self._state.get(key)
+        if state is None or now - state[0] >= self.window:
+            suppressed = state[2] if state else 0
+            self._state[key] = [now, 1, 0]
+            if suppressed:
+                record["extra"]["suppressed"] = suppressed
+            return True
+
+        if state[1] < self.max_repeats:
+            state[1] += 1
+            return True
+
+        state[2] += 1
+        return False
+
+
+class JsonLinesSink:
+    """Структурированный лог: одна JSON запись на строку с полями аккаунта и задачи"""
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8")
+
+    def write(self, message) -> None:
+        record = message.record
+        extra = {
+            key: value for key, value in record["extra"].items() if key != "sampled_out"
+        }
+        entry = {
+            "time": record["time"].isoformat(),
+            "level": record["level"].name,
+            "module": record["name"],
+            "line": record["line"],
+            "message": record["message"],
+            **extra,
+        }
+        if record["exception"]:
+            entry["exception"] = str(record["exception"].value)
+        self._file.write(json.dumps(entry, ensure_ascii=False, default=str) + "\n")
+
+    def flush(self) -> None:
+        self._file.flush()
+
+
+def setup_logging(config: Config) -> None:
+    """
+    Настраивает логирование: консоль, текстовый и JSONL файлы.
+    Все синки работают через очередь (enqueue=True), поэтому запись на диск
+    выполняется в отдельном потоке, а не в event loop.
+    """
+    sampler = RepeatSampler(
+        config.LOGGING.SAMPLE_WINDOW, config.LOGGING.MAX_REPEATS
+    )
+
+    def patch_record(record: dict) -> None:
+        extra = record["extra"]
+        extra.setdefault("account", current_account.get())
+        extra.setdefault("task", current_task.get())
+        # Решение принимается один раз, а синки только читают его
+        extra["sampled_out"] = not sampler.allow(record)
+
+    def not_sampled_out(record: dict) -> bool:
+        return not record["extra"].get("sampled_out")
+
+    logger.remove()
+    logger.configure(patcher=patch_record)
+
+    level = config.LOGGING.LEVEL.upper()
+    logger.add(
+        sys.stdout,
+        colorize=True,
+        format=CONSOLE_FORMAT,
+        level=level,
+        filter=not_sampled_out,
+        enqueue=True,
+    )
+    logger.add(
+        "logs/app.log",
+        rotation="10 MB",
+        retention="1 month",
+        format=FILE_FORMAT,
+        level=level,
+        filter=not_sampled_out,
+        enqueue=True,
+    )
+    if config.LOGGING.JSON_PATH:
+        logger.add(
+            JsonLinesSink(config.LOGGING.JSON_PATH),
+            format="{message}",
+            level=level,
+            filter=not_sampled_out,
+            enqueue=True,
+        )
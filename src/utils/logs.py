@@ -1,65 +1,193 @@
+import asyncio
+import json
 import os
-from typing import Dict, Any
+import time
+from collections import defaultdict
+from typing import Dict, Any, List, Optional
 from asyncio import Lock
 
+from eth_account import Account
+from loguru import logger
+
+from src.utils.context import current_account
+from src.utils.metrics import REGISTRY
+
+
+RESULTS_WRITTEN = REGISTRY.counter(
+    "results_written_total", "Account results flushed to disk", ("status",)
+)
+RESULTS_PENDING = REGISTRY.gauge(
+    "results_pending", "Account results waiting in the writer buffer"
+)
+
+SUCCESS = "success"
+ERROR = "error"
+
+
+class TextFilesSink:
+    """
+    Старый формат: private_keys.txt, proxies.txt и discord_tokens.txt
+    в data/success_data и data/error_data.
+    """
+
+    BASE_DIRS = {SUCCESS: "data/success_data", ERROR: "data/error_data"}
+    FIELDS = {
+        "private_keys.txt": "private_key",
+        "proxies.txt": "proxy",
+        "discord_tokens.txt": "discord_token",
+    }
+
+    def write(self, records: List[Dict[str, Any]]) -> None:
+        # Одно открытие файла на пачку вместо трех на каждый аккаунт
+        lines = defaultdict(list)
+        for record in records:
+            base_dir = self.BASE_DIRS[record["status"]]
+            for filename, field in self.FIELDS.items():
+                if record[field]:  # Only write if data is not empty
+                    lines[os.path.join(base_dir, filename)].append(f"{record[field]}\n")
+
+        for filepath, data in lines.items():
+            os.makedirs(os.path.dirname(filepath), exist_ok=True)
+            with open(filepath, "a", encoding="utf-8") as f:
+                f.writelines(data)
+
+
+class JsonLinesResultSink:
+    """Структурированные результаты: номер аккаунта, адрес, статус, прокси. Без ключей"""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def write(self, records: List[Dict[str, Any]]) -> None:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            for record in records:
+                f.write(
+                    json.dumps(
+                        {
+                            "ts": record["ts"],
+                            "account": record["account"],
+                            "address": record["address"],
+                            "status": record["status"],
+                            "proxy": record["proxy"].rsplit("@", 1)[-1],
+                        }
+                    )
+                    + "\n"
+                )
+
+
+class ResultWriter:
+    """
+    Копит результаты аккаунтов и пишет их пачками в фоне, вне event loop.
+    Сброс каждые flush_interval секунд, при batch_size записях и при close.
+    """
+
+    def __init__(self):
+        self.sinks: List[Any] = [TextFilesSink()]
+        self.flush_interval = 2.0
+        self.batch_size = 100
+
+        self._buffer: List[Dict[str, Any]] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+
+    def configure(self, sinks: List[Any], flush_interval: float, batch_size: int) -> None:
+        self.sinks = sinks
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+
+    def submit(self, record: Dict[str, Any]) -> None:
+        self._buffer.append(record)
+        RESULTS_PENDING.set(len(self._buffer))
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+        if len(self._buffer) >= self.batch_size:
+            self._wakeup.set()
+
+    async def flush(self) -> None:
+        batch, self._buffer = self._buffer, []
+        RESULTS_PENDING.set(0)
+        if not batch:
+            return
+
+        for sink in self.sinks:
+            try:
+                await asyncio.to_thread(sink.write, batch)
+            except Exception as e:
+                logger.error(f"Failed to save {len(batch)} results with {type(sink).__name__}: {e}")
+        for record in batch:
+            RESULTS_WRITTEN.inc(status=record["status"])
+
+    async def close(self) -> None:
+        # Даем фоновой задаче дописать текущую пачку, а не отменяем ее посреди записи
+        if self._task is not None and not self._task.done():
+            self._closing = True
+            self._wakeup.set()
+            await self._task
+        self._task = None
+        self._closing = False
+        await self.flush()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+            if self._closing:
+                return
+
+
+RESULT_WRITER = ResultWriter()
+
+
+def _record(status: str, private_key: str, proxy: str, discord_token: str) -> Dict[str, Any]:
+    try:
+        address = Account.from_key(private_key).address
+    except Exception:
+        address = ""
+    return {
+        "ts": round(time.time(), 3),
+        "account": current_account.get(),
+        "address": address,
+        "status": status,
+        "private_key": private_key,
+        "proxy": proxy,
+        "discord_token": discord_token,
+    }
+
 
 async def report_success(
     lock: Lock, private_key: str, proxy: str, discord_token: str
 ) -> None:
     """
-    Log successful operations to separate files in data/success_data directory.
-    Uses asyncio lock to prevent race conditions.
+    Log successful operations to data/success_data and the structured results file.
+    Records are buffered and written in the background by RESULT_WRITER.
 
     Args:
-        lock: Asyncio lock for thread-safe file operations
+        lock: Kept for compatibility, writes are serialized by the writer
         private_key: The private key to log
         proxy: The proxy to log
         discord_token: The Discord token to log
     """
-    base_dir = "data/success_data"
-    async with lock:
-        os.makedirs(base_dir, exist_ok=True)
-
-        # Write each type of data to its respective file
-        files_data = {
-            "private_keys.txt": private_key,
-            "proxies.txt": proxy,
-            "discord_tokens.txt": discord_token,
-        }
-
-        for filename, data in files_data.items():
-            if data:  # Only write if data is not empty
-                filepath = os.path.join(base_dir, filename)
-                with open(filepath, "a", encoding="utf-8") as f:
-                    f.write(f"{data}\n")
+    RESULT_WRITER.submit(_record(SUCCESS, private_key, proxy, discord_token))
 
 
 async def report_error(
     lock: Lock, private_key: str, proxy: str, discord_token: str
 ) -> None:
     """
-    Log failed operations to separate files in data/error_data directory.
-    Uses asyncio lock to prevent race conditions.
+    Log failed operations to data/error_data and the structured results file.
+    Records are buffered and written in the background by RESULT_WRITER.
 
     Args:
-        lock: Asyncio lock for thread-safe file operations
+        lock: Kept for compatibility, writes are serialized by the writer
         private_key: The private key to log
         proxy: The proxy to log
         discord_token: The Discord token to log
     """
-    base_dir = "data/error_data"
-    async with lock:
-        os.makedirs(base_dir, exist_ok=True)
-
-        # Write each type of data to its respective file
-        files_data = {
-            "private_keys.txt": private_key,
-            "proxies.txt": proxy,
-            "discord_tokens.txt": discord_token,
-        }
-
-        for filename, data in files_data.items():
-            if data:  # Only write if data is not empty
-                filepath = os.path.join(base_dir, filename)
-                with open(filepath, "a", encoding="utf-8") as f:
-                    f.write(f"{data}\n")
\ No newline at end of file
+    RESULT_WRITER.submit(_record(ERROR, private_key, proxy, discord_token))
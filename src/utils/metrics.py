@@ -0,0 +1,236 @@
+import asyncio
+import os
+from bisect import bisect_left
+from typing import Dict, List, Optional, Tuple
+
+from loguru import logger
+
+
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+PREFIX = "monadbot_"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labels: Tuple[str, ...] = ()):
+        self.name = PREFIX + name
+        self.documentation = documentation
+        self.labels = labels
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labels)
+
+    def render(self) -> List[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}",
+        ]
+
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: Tuple[str, ...] = ()):
+        super().__init__(name, documentation, labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        for key, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labels, key)} {value}")
+        return lines
+
+
+class Gauge(Counter):
+    type_name = "gauge"
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels) -> None:
+        self._values[self._key(labels)] = value
+
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+        # key -> [счетчики по бакетам..., +Inf, сумма]
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        data = self._values.get(key)
+        if data is None:
+            data = [0] * (len(self.buckets) + 2)
+            self._values[key] = data
+        data[bisect_left(self.buckets, value)] += 1
+        data[-1] += value
+
+    def count(self, **labels) -> int:
+        data = self._values.get(self._key(labels))
+        return int(sum(data[:-1])) if data else 0
+
+    def total(self, **labels) -> float:
+        data = self._values.get(self._key(labels))
+        return data[-1] if data else 0
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        for key, data in sorted(self._values.items()):
+            cumulative = 0
+            for bound, hits in zip(self.buckets, data):
+                cumulative += hits
+                labels = _format_labels(self.labels, key, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            cumulative += data[len(self.buckets)]
+            labels = _format_labels(self.labels, key, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {data[-1]}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _register(self, metric: _Metric) -> _Metric:
+        return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, documentation: str, labels: Tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labels))
+
+    def gauge(self, name: str, documentation: str, labels: Tuple[str, ...] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labels))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labels: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labels, buckets))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+RPC_LATENCY = REGISTRY.histogram(
+    "rpc_request_duration_seconds", "JSON-RPC request latency", ("method", "endpoint")
+)
+RPC_ERRORS = REGISTRY.counter(
+    "rpc_errors_total", "Failed JSON-RPC requests", ("method", "endpoint", "error")
+)
+RPC_IN_FLIGHT = REGISTRY.gauge(
+    "rpc_in_flight_requests", "JSON-RPC requests in progress", ("endpoint",)
+)
+HTTP_LATENCY = REGISTRY.histogram(
+    "http_request_duration_seconds", "HTTP request latency", ("method", "host", "path")
+)
+HTTP_ERRORS = REGISTRY.counter(
+    "http_errors_total", "Failed HTTP requests", ("method", "host", "error")
+)
+HTTP_IN_FLIGHT = REGISTRY.gauge(
+    "http_in_flight_requests", "HTTP requests in progress", ("host",)
+)
+RECEIPT_WAIT = REGISTRY.histogram(
+    "receipt_wait_duration_seconds", "Time spent waiting for tx receipts", ("task",)
+)
+TX_SUBMITTED = REGISTRY.counter(
+    "tx_submitted_total", "Transactions accepted by the node", ("task",)
+)
+TX_CONFIRMED = REGISTRY.counter(
+    "tx_confirmed_total", "Transactions mined with status 1", ("task",)
+)
+TX_FAILED = REGISTRY.counter(
+    "tx_failed_total", "Transactions rejected on submit or reverted", ("task",)
+)
+
+
+def dump_metrics(path: str) -> None:
+    """Сохраняет текущие метрики в файл в формате Prometheus"""
+    try:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(REGISTRY.render())
+        logger.info(f"Metrics saved to {path}")
+    except Exception as e:
+        logger.error(f"Failed to save metrics to {path}: {e}")
+
+
+async def _handle_metrics_request(
+    reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+) -> None:
+    try:
+        request_line = await reader.readline()
+        # Пропускаем заголовки запроса
+        while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+            pass
+
+        parts = request_line.decode("latin-1").split()
+        if len(parts) >= 2 and parts[1].split("?")[0] == "/metrics":
+            status = "200 OK"
+            body = REGISTRY.render().encode()
+        else:
+            status = "404 Not Found"
+            body = b"Not Found\n"
+
+        writer.write(
+            f"HTTP/1.1 {status}\r\n"
+            f"Content-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: close\r\n\r\n".encode()
+            + body
+        )
+        await writer.drain()
+    except Exception as e:
+        logger.debug(f"Metrics request failed: {e}")
+    finally:
+        writer.close()
+
+
+async def start_metrics_server(host: str, port: int) -> Optional[asyncio.AbstractServer]:
+    """Запускает локальный HTTP сервер с эндпоинтом /metrics"""
+    try:
+        server = await asyncio.start_server(_handle_metrics_request, host, port)
+        logger.info(f"Metrics available at http://{host}:{port}/metrics")
+        return server
+    except Exception as e:
+        logger.error(f"Failed to start metrics server on {host}:{port}: {e}")
+        return None
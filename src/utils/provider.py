@@ -0,0 +1,116 @@
+import time
+from typing import Any, List, Tuple
+from urllib.parse import urlparse
+
+from web3 import AsyncHTTPProvider, AsyncWeb3
+from web3.eth import AsyncEth
+from web3.main import get_async_default_modules
+from web3.types import RPCEndpoint, RPCResponse
+
+from src.utils.constants import RPC_URL
+from src.utils.context import current_task
+from src.utils.metrics import (
+    RECEIPT_WAIT,
+    RPC_ERRORS,
+    RPC_IN_FLIGHT,
+    RPC_LATENCY,
+    TX_CONFIRMED,
+    TX_FAILED,
+    TX_SUBMITTED,
+)
+from src.utils.tracing import span
+
+
+class InstrumentedHTTPProvider(AsyncHTTPProvider):
+    """AsyncHTTPProvider, который пишет метрики по каждому RPC запросу"""
+
+    def __init__(self, endpoint_uri: str, *args, **kwargs):
+        super().__init__(endpoint_uri, *args, **kwargs)
+        self.endpoint_label = urlparse(str(endpoint_uri)).netloc or str(endpoint_uri)
+
+    async def make_request(self, method: RPCEndpoint, params: Any) -> RPCResponse:
+        RPC_IN_FLIGHT.inc(endpoint=self.endpoint_label)
+        start = time.perf_counter()
+        try:
+            with span(method, "rpc", endpoint=self.endpoint_label):
+                response = await super().make_request(method, params)
+        except Exception as e:
+            RPC_ERRORS.inc(method=method, endpoint=self.endpoint_label, error=type(e).__name__)
+            if method == "eth_sendRawTransaction":
+                TX_FAILED.inc(task=current_task.get())
+            raise
+        finally:
+            RPC_LATENCY.observe(
+                time.perf_counter() - start, method=method, endpoint=self.endpoint_label
+            )
+            RPC_IN_FLIGHT.dec(endpoint=self.endpoint_label)
+
+        self._track_response(method, response)
+        return response
+
+    async def make_batch_request(
+        self, batch_requests: List[Tuple[RPCEndpoint, Any]]
+    ) -> List[RPCResponse] | RPCResponse:
+        RPC_IN_FLIGHT.inc(endpoint=self.endpoint_label)
+        start = time.perf_counter()
+        try:
+            with span("batch", "rpc", endpoint=self.endpoint_label, size=len(batch_requests)):
+                return await super().make_batch_request(batch_requests)
+        except Exception as e:
+            RPC_ERRORS.inc(method="batch", endpoint=self.endpoint_label, error=type(e).__name__)
+            raise
+        finally:
+            RPC_LATENCY.observe(
+                time.perf_counter() - start, method="batch", endpoint=self.endpoint_label
+            )
+            RPC_IN_FLIGHT.dec(endpoint=self.endpoint_label)
+
+    def _track_response(self, method: str, response: RPCResponse) -> None:
+        if "error" in response:
+            RPC_ERRORS.inc(method=method, endpoint=self.endpoint_label, error="rpc_error")
+            if method == "eth_sendRawTransaction":
+                TX_FAILED.inc(task=current_task.get())
+            return
+
+        if method == "eth_sendRawTransaction":
+            TX_SUBMITTED.inc(task=current_task.get())
+
+
+def record_receipt(receipt: Any) -> None:
+    """
+    Учитывает итог транзакции по квитанции. Вызывается там, где квитанция
+    используется, а не на каждый eth_getTransactionReceipt: повторный опрос
+    той же транзакции не должен считаться еще раз.
+    """
+    if receipt["status"] == 1:
+        TX_CONFIRMED.inc(task=current_task.get())
+    else:
+        TX_FAILED.inc(task=current_task.get())
+
+
+class InstrumentedAsyncEth(AsyncEth):
+    """AsyncEth, который отдельно учитывает ожидание подтверждения транзакций"""
+
+    async def wait_for_transaction_receipt(self, transaction_hash, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            tx_hash = (
+                transaction_hash.hex()
+                if isinstance(transaction_hash, bytes)
+                else str(transaction_hash)
+            )
+            with span("wait_for_receipt", "receipt", tx_hash=tx_hash):
+                receipt = await super().wait_for_transaction_receipt(
+                    transaction_hash, *args, **kwargs
+                )
+            record_receipt(receipt)
+            return receipt
+        finally:
+            RECEIPT_WAIT.observe(time.perf_counter() - start, task=current_task.get())
+
+
+def create_web3(rpc_url: str = RPC_URL) -> AsyncWeb3:
+    """Создает AsyncWeb3 с инструментированным провайдером"""
+    modules = get_async_default_modules()
+    modules["eth"] = InstrumentedAsyncEth
+    return AsyncWeb3(InstrumentedHTTPProvider(rpc_url), modules=modules)
@@ -0,0 +1,233 @@
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from loguru import logger
+from tabulate import tabulate
+
+from src.utils.client import _build_client, set_proxy_observer
+from src.utils.metrics import REGISTRY
+
+
+PROXY_PROBES = REGISTRY.counter(
+    "proxy_probes_total", "Proxy health probes by outcome", ("result",)
+)
+PROXY_HEALTHY = REGISTRY.gauge("proxy_healthy", "Proxies currently not quarantined")
+PROXY_QUARANTINED = REGISTRY.counter(
+    "proxy_quarantined_total", "Times a proxy was quarantined"
+)
+PROXY_REASSIGNED = REGISTRY.counter(
+    "proxy_reassigned_total", "Accounts moved to another proxy mid-run"
+)
+
+# Вес нового замера в скользящем среднем
+EWMA_ALPHA = 0.3
+
+
+@dataclass
+class ProxyStats:
+    proxy: str
+    success_rate: float = 1.0
+    latency: Optional[float] = None
+    successes: int = 0
+    failures: int = 0
+    consecutive_failures: int = 0
+    quarantined_until: float = 0.0
+    quarantines: int = 0
+    accounts: int = 0
+
+    @property
+    def quarantined(self) -> bool:
+        return time.monotonic() < self.quarantined_until
+
+    @property
+    def score(self) -> float:
+        """Чем больше, тем лучше: доля успешных запросов на секунду задержки"""
+        return self.success_rate / max(self.latency or 1.0, 0.05)
+
+
+class ProxyChecker:
+    """
+    Проверяет прокси запросами к целевым сайтам до старта и периодически во
+    время работы. Медленные прокси получают меньший score, после MAX_FAILURES
+    ошибок подряд прокси уходит в карантин. Аккаунт получает прокси в момент
+    старта, а не заранее, и может быть переведен на другой, если его прокси
+    перестал работать.
+    """
+
+    def __init__(self):
+        self.targets: List[str] = []
+        self.timeout = 10.0
+        self.probe_interval = 300.0
+        self.max_failures = 3
+        self.quarantine_time = 600.0
+        self.concurrency = 50
+
+        self.enabled = False
+        self._stats: Dict[str, ProxyStats] = {}
+        # номер аккаунта -> прокси
+        self._assigned: Dict[int, str] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def configure(self, proxies: List[str], settings) -> None:
+        self.enabled = settings.ENABLED
+        self.targets = settings.TARGETS
+        self.timeout = settings.TIMEOUT
+        self.probe_interval = settings.PROBE_INTERVAL
+        self.max_failures = settings.MAX_FAILURES
+        self.quarantine_time = settings.QUARANTINE_TIME
+        self.concurrency = settings.CONCURRENCY
+        self._stats = {proxy: ProxyStats(proxy) for proxy in dict.fromkeys(proxies)}
+        if self.enabled:
+            # Ошибки соединения в обычных запросах тоже учитываются
+            set_proxy_observer(self.record)
+        self._update_gauge()
+
+    async def preflight(self) -> None:
+        logger.info(f"Checking {len(self._stats)} proxies against {', '.join(self.targets)}...")
+        await self.probe_all()
+        healthy = sum(not stats.quarantined for stats in self._stats.values())
+        logger.info(f"Proxy check finished: {healthy}/{len(self._stats)} proxies are healthy")
+
+    def start(self) -> None:
+        """Периодическая проверка в фоне, в том числе прокси в карантине"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        set_proxy_observer(None)
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def probe_all(self) -> None:
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def probe(proxy: str) -> None:
+            async with semaphore:
+                await self.probe(proxy)
+
+        await asyncio.gather(*(probe(proxy) for proxy in self._stats))
+
+    async def probe(self, proxy: str) -> None:
+        # Отдельный клиент без пула: пробы не должны занимать клиентов аккаунтов
+        client = _build_client(proxy, cookie_store=False)
+        client.timeout = self.timeout
+        # Результат пробы записывается ниже, не через наблюдатель клиента
+        client.proxy_label = ""
+        for target in self.targets:
+            start = time.perf_counter()
+            try:
+                response = await client.get(target)
+                # 407 - прокси не принял авторизацию, 5xx - часто ошибка самого прокси
+                ok = response.status_code < 500 and response.status_code != 407
+            except Exception:
+                ok = False
+            PROXY_PROBES.inc(result="ok" if ok else "failed")
+            self.record(proxy, ok, time.perf_counter() - start if ok else None)
+
+    def record(self, proxy: str, ok: bool, latency: Optional[float] = None) -> None:
+        stats = self._stats.get(proxy)
+        if stats is None:
+            return
+
+        stats.success_rate += EWMA_ALPHA * ((1.0 if ok else 0.0) - stats.success_rate)
+        if ok:
+            stats.successes += 1
+            stats.consecutive_failures = 0
+            if latency is not None:
+                stats.latency = (
+                    latency
+                    if stats.latency is None
+                    else stats.latency + EWMA_ALPHA * (latency - stats.latency)
+                )
+            if stats.quarantined_until:
+                stats.quarantined_until = 0.0
+                logger.info(f"Proxy {_short(proxy)} is working again")
+        else:
+            stats.failures += 1
+            stats.consecutive_failures += 1
+            if stats.consecutive_failures >= self.max_failures and not stats.quarantined:
+                stats.quarantined_until = time.monotonic() + self.quarantine_time
+                stats.quarantines += 1
+                PROXY_QUARANTINED.inc()
+                logger.warning(
+                    f"Proxy {_short(proxy)} failed {stats.consecutive_failures} times in a row, "
+                    f"quarantined for {self.quarantine_time:.0f} seconds"
+                )
+        self._update_gauge()
+
+    def is_healthy(self, proxy: str) -> bool:
+        stats = self._stats.get(proxy)
+        return stats is None or not stats.quarantined
+
+    def assign(self, account_index: int, exclude: Optional[str] = None) -> str:
+        """Наименее загруженный рабочий прокси, при равенстве - с лучшим score"""
+        candidates = [
+            stats
+            for stats in self._stats.values()
+            if not stats.quarantined and stats.proxy != exclude
+        ]
+        if not candidates:
+            # Рабочих нет: берем тот, что раньше всех выйдет из карантина
+            candidates = [min(self._stats.values(), key=lambda s: s.quarantined_until)]
+            logger.warning(f"[{account_index}] No healthy proxies left, using the least bad one")
+
+        best = min(candidates, key=lambda s: (s.accounts, -s.score))
+        best.accounts += 1
+        self._assigned[account_index] = best.proxy
+        return best.proxy
+
+    def reassign(self, account_index: int) -> str:
+        current = self.release(account_index)
+        PROXY_REASSIGNED.inc()
+        return self.assign(account_index, exclude=current)
+
+    def release(self, account_index: int) -> Optional[str]:
+        proxy = self._assigned.pop(account_index, None)
+        if proxy in self._stats:
+            self._stats[proxy].accounts -= 1
+        return proxy
+
+    def log_report(self) -> None:
+        if not self.enabled or not self._stats:
+            return
+
+        rows = [
+            [
+                _short(stats.proxy),
+                "quarantined" if stats.quarantined else "ok",
+                f"{stats.latency * 1000:.0f}" if stats.latency is not None else "-",
+                f"{stats.success_rate:.0%}",
+                stats.successes,
+                stats.failures,
+                stats.quarantines,
+            ]
+            for stats in sorted(self._stats.values(), key=lambda s: -s.score)
+        ]
+        table = tabulate(
+            rows,
+            headers=["Proxy", "Status", "Latency ms", "Success", "OK", "Errors", "Quarantines"],
+            tablefmt="double_grid",
+            stralign="center",
+            numalign="center",
+        )
+        logger.info(f"\n{'='*50}\n         Proxy quality ({len(rows)} proxies)\n{'='*50}\n{table}")
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.probe_interval)
+            await self.probe_all()
+
+    def _update_gauge(self) -> None:
+        PROXY_HEALTHY.set(sum(not stats.quarantined for stats in self._stats.values()))
+
+
+def _short(proxy: str) -> str:
+    """Прокси без логина и пароля для логов"""
+    return proxy.rsplit("@", 1)[-1]
+
+
+PROXY_CHECKER = ProxyChecker()
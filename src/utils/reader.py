@@ -1,4 +1,9 @@
 import json
+import mmap
+import os
+from array import array
+from typing import Iterator
+
 import yaml
 from loguru import logger
 
@@ -11,6 +16,52 @@ def read_txt_file(file_name: str, file_path: str) -> list:
     return items
 
 
+class LineIndex:
+    """
+    Строки файла по номеру без загрузки файла в память: файл отображается
+    через mmap, в памяти только массив смещений начала строк (8 байт на строку).
+    Ведет себя как список строк: len, [i], итерация.
+    """
+
+    def __init__(self, file_name: str, file_path: str):
+        self.file_path = file_path
+        self._file = open(file_path, "rb")
+        self._offsets = array("Q")
+        self._mm = None
+
+        if os.fstat(self._file.fileno()).st_size:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            position = 0
+            size = len(self._mm)
+            while position < size:
+                self._offsets.append(position)
+                end = self._mm.find(b"\n", position)
+                position = size if end == -1 else end + 1
+        # Конец последней строки
+        self._offsets.append(len(self._mm) if self._mm is not None else 0)
+
+        logger.success(f"Successfully indexed {len(self)} {file_name}.")
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index: int) -> str:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(f"{self.file_path} has no line {index + 1}")
+        return self._mm[self._offsets[index] : self._offsets[index + 1]].decode().strip()
+
+    def __iter__(self) -> Iterator[str]:
+        for index in range(len(self)):
+            yield self[index]
+
+    def close(self) -> None:
+        if self._mm is not None:
+            self._mm.close()
+        self._file.close()
+
+
 def split_list(lst, chunk_size=90):
     return [lst[i:i + chunk_size] for i in range(0, len(lst), chunk_size)]
 
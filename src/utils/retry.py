@@ -0,0 +1,215 @@
+import random
+import re
+from contextvars import ContextVar
+from enum import Enum
+from typing import Optional, Union
+
+from loguru import logger
+
+from src.utils.config import Config
+from src.utils.context import current_account, current_task
+from src.utils.metrics import REGISTRY
+from src.utils.tracing import sleep
+
+
+class ErrorClass(str, Enum):
+    TRANSIENT = "transient"  # таймауты, обрывы соединения, ошибки ноды - повторяем
+    RATE_LIMIT = "rate_limit"  # 429 и лимиты API - повторяем с большей паузой
+    DETERMINISTIC = "deterministic"  # повтор даст тот же результат
+    FATAL = "fatal"  # аккаунт дальше обрабатывать бессмысленно
+
+
+# Проверяются по порядку, первое совпадение выигрывает
+ERROR_PATTERNS = (
+    (
+        ErrorClass.FATAL,
+        (
+            "invalid private key",
+            "non-hexadecimal",
+            "odd-length string",
+            "proxy authentication required",
+        ),
+    ),
+    (
+        ErrorClass.DETERMINISTIC,
+        (
+            "insufficient funds",
+            "insufficient balance",
+            "exceeds balance",
+            "max mints per wallet",
+            "max mint",
+            "mint limit",
+            "already minted",
+            "already claimed",
+            "already registered",
+            "not eligible",
+            "sale not active",
+        ),
+    ),
+    (
+        ErrorClass.RATE_LIMIT,
+        ("too many requests", "rate limit", "rate-limit", "request limit"),
+    ),
+)
+
+# 429 только как HTTP статус: "429" встречается и в хешах, адресах, calldata
+RATE_LIMIT_STATUS = re.compile(
+    r"^\s*429\b|\b(?:status|status code|http|code|error)\W{0,3}429\b", re.IGNORECASE
+)
+
+RETRIES = REGISTRY.counter(
+    "retries_total", "Retries scheduled by the retry policy", ("task", "error_class")
+)
+RETRY_GIVEUPS = REGISTRY.counter(
+    "retry_giveups_total", "Operations abandoned by the retry policy", ("task", "reason")
+)
+
+
+def classify_error(error: Union[BaseException, str, None]) -> ErrorClass:
+    """
+    Определяет класс ошибки. Исключение может задать класс явно
+    через атрибут error_class, иначе класс определяется по тексту.
+    """
+    if error is None:
+        return ErrorClass.TRANSIENT
+
+    error_class = getattr(error, "error_class", None)
+    if isinstance(error_class, ErrorClass):
+        return error_class
+
+    if _status_code(error) == 429:
+        return ErrorClass.RATE_LIMIT
+
+    message = str(error).lower()
+    for error_class, patterns in ERROR_PATTERNS:
+        if any(pattern in message for pattern in patterns):
+            return error_class
+    if RATE_LIMIT_STATUS.search(message):
+        return ErrorClass.RATE_LIMIT
+    return ErrorClass.TRANSIENT
+
+
+def _status_code(error: Union[BaseException, str]) -> Optional[int]:
+    """HTTP статус из исключения клиента (status_code, status или response.status_code)"""
+    for source in (error, getattr(error, "response", None)):
+        for attribute in ("status_code", "status"):
+            value = getattr(source, attribute, None)
+            if isinstance(value, int):
+                return value
+    return None
+
+
+class RetryBudget:
+    """Общий на весь аккаунт лимит повторов, чтобы вложенные ретраи не перемножались"""
+
+    def __init__(self, total: int):
+        self.total = total
+        self.spent = 0
+        self.last_error: Optional[ErrorClass] = None
+
+    @property
+    def remaining(self) -> int:
+        return max(self.total - self.spent, 0)
+
+    def spend(self) -> bool:
+        if self.spent >= self.total:
+            return False
+        self.spent += 1
+        return True
+
+
+_budget: ContextVar[Optional[RetryBudget]] = ContextVar("retry_budget", default=None)
+
+
+def start_retry_budget(total: int) -> RetryBudget:
+    """Создает бюджет повторов для текущего аккаунта"""
+    budget = RetryBudget(total)
+    _budget.set(budget)
+    return budget
+
+
+def current_budget() -> Optional[RetryBudget]:
+    return _budget.get()
+
+
+def note_error(error: Union[BaseException, str, None]) -> ErrorClass:
+    """
+    Классифицирует ошибку и запоминает ее в бюджете аккаунта, чтобы вызывающий
+    код видел причину неудачи даже если метод вернул только False
+    """
+    budget = _budget.get()
+    if error is None:
+        if budget and budget.last_error:
+            return budget.last_error
+        return ErrorClass.TRANSIENT
+
+    error_class = classify_error(error)
+    if budget:
+        budget.last_error = error_class
+    return error_class
+
+
+def reset_last_error() -> None:
+    budget = _budget.get()
+    if budget:
+        budget.last_error = None
+
+
+class RetryPolicy:
+    """Экспоненциальная пауза с джиттером и ранний выход для безнадежных ошибок"""
+
+    def __init__(self, config: Config):
+        self.settings = config.RETRY
+        self.attempts = config.SETTINGS.ATTEMPTS
+
+    def delay(self, attempt: int, error_class: ErrorClass) -> float:
+        base = (
+            self.settings.RATE_LIMIT_DELAY
+            if error_class == ErrorClass.RATE_LIMIT
+            else self.settings.BASE_DELAY
+        )
+        cap = min(self.settings.MAX_DELAY, base * self.settings.MULTIPLIER**attempt)
+        # Половина паузы фиксирована, вторая половина случайна
+        return random.uniform(cap / 2, cap)
+
+    async def should_retry(
+        self,
+        error: Union[BaseException, str, None],
+        attempt: int,
+        label: str,
+    ) -> bool:
+        """
+        Решает, повторять ли операцию после неудачной попытки номер attempt
+        (с нуля). Если да - выдерживает паузу и возвращает True.
+        Без error используется последняя ошибка, записанная через note_error.
+        """
+        account_index = current_account.get()
+        task = current_task.get()
+        error_class = note_error(error)
+
+        if error_class in (ErrorClass.DETERMINISTIC, ErrorClass.FATAL):
+            logger.warning(
+                f"[{account_index}] | {label}: {error_class.value} error, not retrying"
+            )
+            RETRY_GIVEUPS.inc(task=task, reason=error_class.value)
+            return False
+
+        if attempt >= self.attempts - 1:
+            RETRY_GIVEUPS.inc(task=task, reason="attempts")
+            return False
+
+        budget = _budget.get()
+        if budget and not budget.spend():
+            logger.warning(
+                f"[{account_index}] | {label}: retry budget of {budget.total} exhausted, giving up"
+            )
+            RETRY_GIVEUPS.inc(task=task, reason="budget")
+            return False
+
+        pause = self.delay(attempt, error_class)
+        logger.info(
+            f"[{account_index}] | {label}: {error_class.value} error, retrying in {pause:.1f} seconds ({attempt + 1}/{self.attempts})"
+        )
+        RETRIES.inc(task=task, error_class=error_class.value)
+        await sleep(pause, "retry_backoff")
+        return True
@@ -1,80 +1,257 @@
+import csv
+import heapq
+import os
+import threading
+from array import array
+from typing import Any, List, Optional, Tuple
+
 from tabulate import tabulate
-from typing import List, Optional
 from loguru import logger
 
-from src.utils.config import Config, WalletInfo
+
+EXPORT_FIELDS = ["account", "address", "private_key", "balance", "transactions"]
+
+
+def mask_key(private_key: str) -> str:
+    # Маскируем приватный ключ (последние 5 символов)
+    return "•" * 3 + private_key[-5:]
+
+
+def percentile(sorted_values, q: float) -> float:
+    """Перцентиль по методу ближайшего ранга, значения уже отсортированы"""
+    if not sorted_values:
+        return 0.0
+    rank = max(int(round(q / 100 * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
 
 
-def print_wallets_stats(config: Config):
+class WalletStatsAggregator:
     """
-    Выводит статистику по всем кошелькам в виде таблицы
+    Статистика кошельков по мере поступления: суммы, пустые кошельки,
+    перцентили и top-N / bottom-N по балансу. Ключи и адреса хранятся
+    только для N лучших и N худших, от остальных остаются два числа.
     """
-    try:
-        # Сортируем кошельки по индексу
-        sorted_wallets = sorted(config.WALLETS.wallets, key=lambda x: x.account_index)
-
-        # Подготавливаем данные для таблицы
-        table_data = []
-        total_balance = 0
-        total_transactions = 0
-
-        for wallet in sorted_wallets:
-            # Маскируем приватный ключ (последние 5 символов)
-            masked_key = "•" * 3 + wallet.private_key[-5:]
-
-            total_balance += wallet.balance
-            total_transactions += wallet.transactions
-
-            row = [
-                str(wallet.account_index),  # Просто номер без ведущего нуля
-                wallet.address,  # Полный адрес
-                masked_key,
-                f"{wallet.balance:.4f} MON",
-                f"{wallet.transactions:,}",  # Форматируем число с разделителями
-            ]
-            table_data.append(row)
-
-        # Если есть данные - выводим таблицу и статистику
-        if table_data:
-            # Создаем заголовки для таблицы
-            headers = [
-                "№ Account",
-                "Wallet Address",
-                "Private Key",
-                "Balance (MON)",
-                "Total Txs",
-            ]
 
-            # Формируем таблицу с улучшенным форматированием
-            table = tabulate(
-                table_data,
-                headers=headers,
-                tablefmt="double_grid",  # Более красивые границы
-                stralign="center",  # Центрирование строк
-                numalign="center",  # Центрирование чисел
+    PERCENTILES = (10, 50, 90, 99)
+
+    def __init__(self, top_n: int = 10):
+        self.top_n = top_n
+        self.count = 0
+        self.total_balance = 0.0
+        self.total_transactions = 0
+        self.empty = 0
+        self.balances = array("d")
+        self.transactions = array("Q")
+        # Мин-куча из N самых богатых и мин-куча по -balance из N самых бедных
+        self._top: List[Tuple[float, int, Tuple[Any, ...]]] = []
+        self._bottom: List[Tuple[float, int, Tuple[Any, ...]]] = []
+
+    def add(self, wallet) -> None:
+        self.count += 1
+        self.total_balance += wallet.balance
+        self.total_transactions += wallet.transactions
+        if wallet.balance == 0:
+            self.empty += 1
+        self.balances.append(wallet.balance)
+        self.transactions.append(wallet.transactions)
+
+        if self.top_n <= 0:
+            return
+        row = (
+            wallet.account_index,
+            wallet.address,
+            mask_key(wallet.private_key),
+            wallet.balance,
+            wallet.transactions,
+        )
+        # Номер аккаунта во втором поле, чтобы при равном балансе не сравнивать строки
+        self._push(self._top, (wallet.balance, -wallet.account_index, row))
+        self._push(self._bottom, (-wallet.balance, wallet.account_index, row))
+
+    def _push(self, heap: list, item: tuple) -> None:
+        if len(heap) < self.top_n:
+            heapq.heappush(heap, item)
+        elif item > heap[0]:
+            heapq.heapreplace(heap, item)
+
+    def top(self) -> List[Tuple[Any, ...]]:
+        return [row for _, _, row in sorted(self._top, reverse=True)]
+
+    def bottom(self) -> List[Tuple[Any, ...]]:
+        return [row for _, _, row in sorted(self._bottom, reverse=True)]
+
+    def balance_percentiles(self) -> List[Tuple[int, float]]:
+        values = sorted(self.balances)
+        return [(q, percentile(values, q)) for q in self.PERCENTILES]
+
+    def transaction_percentiles(self) -> List[Tuple[int, float]]:
+        values = sorted(self.transactions)
+        return [(q, percentile(values, q)) for q in self.PERCENTILES]
+
+
+class CsvStatsExporter:
+    """Строки кошельков пишутся в CSV по мере сбора, файл заменяется целиком в close"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._tmp_path = f"{path}.tmp"
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._file = open(self._tmp_path, "w", encoding="utf-8", newline="")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(EXPORT_FIELDS)
+        self._lock = threading.Lock()
+
+    def write(self, wallets: list) -> None:
+        with self._lock:
+            self._writer.writerows(
+                (
+                    wallet.account_index,
+                    wallet.address,
+                    mask_key(wallet.private_key),
+                    wallet.balance,
+                    wallet.transactions,
+                )
+                for wallet in wallets
             )
 
-            # Считаем средние значения
-            wallets_count = len(sorted_wallets)
-            avg_balance = total_balance / wallets_count
-            avg_transactions = total_transactions / wallets_count
-
-            # Выводим таблицу и статистику
-            logger.info(
-                f"\n{'='*50}\n"
-                f"         Wallets Statistics ({wallets_count} wallets)\n"
-                f"{'='*50}\n"
-                f"{table}\n"
-                f"{'='*50}\n"
-                f"{'='*50}"
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+            os.replace(self._tmp_path, self.path)
+
+
+class ParquetStatsExporter:
+    """То же в Parquet: каждая пачка кошельков - отдельная row group"""
+
+    def __init__(self, path: str):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self._pa = pa
+        self.path = path
+        self._tmp_path = f"{path}.tmp"
+        self.schema = pa.schema(
+            [
+                ("account", pa.uint32()),
+                ("address", pa.string()),
+                ("private_key", pa.string()),
+                ("balance", pa.float64()),
+                ("transactions", pa.uint64()),
+            ]
+        )
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._writer = pq.ParquetWriter(self._tmp_path, self.schema)
+        self._lock = threading.Lock()
+
+    def write(self, wallets: list) -> None:
+        table = self._pa.Table.from_pydict(
+            {
+                "account": [wallet.account_index for wallet in wallets],
+                "address": [wallet.address for wallet in wallets],
+                "private_key": [mask_key(wallet.private_key) for wallet in wallets],
+                "balance": [wallet.balance for wallet in wallets],
+                "transactions": [wallet.transactions for wallet in wallets],
+            },
+            schema=self.schema,
+        )
+        with self._lock:
+            self._writer.write_table(table)
+
+    def close(self) -> None:
+        with self._lock:
+            self._writer.close()
+            os.replace(self._tmp_path, self.path)
+
+
+def create_stats_exporter(path: str):
+    """Формат по расширению файла, "" - без экспорта. Parquet требует pyarrow"""
+    if not path:
+        return None
+    if path.endswith(".parquet"):
+        try:
+            return ParquetStatsExporter(path)
+        except ImportError:
+            csv_path = path[: -len(".parquet")] + ".csv"
+            logger.warning(
+                f"pyarrow is not installed, exporting wallet stats to {csv_path} instead"
             )
+            path = csv_path
+    return CsvStatsExporter(path)
+
 
-            logger.info(f"Average balance: {avg_balance:.4f} MON")
-            logger.info(f"Average transactions: {avg_transactions:.1f}")
-            logger.info(f"Total balance: {total_balance:.4f} MON")
-            logger.info(f"Total transactions: {total_transactions:,}")
-        else:
+def _wallets_table(rows: List[Tuple[Any, ...]]) -> str:
+    headers = [
+        "№ Account",
+        "Wallet Address",
+        "Private Key",
+        "Balance (MON)",
+        "Total Txs",
+    ]
+    table_data = [
+        [
+            str(account_index),
+            address,
+            masked_key,
+            f"{balance:.4f} MON",
+            f"{transactions:,}",  # Форматируем число с разделителями
+        ]
+        for account_index, address, masked_key, balance, transactions in rows
+    ]
+    return tabulate(
+        table_data,
+        headers=headers,
+        tablefmt="double_grid",  # Более красивые границы
+        stralign="center",  # Центрирование строк
+        numalign="center",  # Центрирование чисел
+    )
+
+
+def print_wallets_stats(stats: Optional[WalletStatsAggregator], export_path: str = ""):
+    """
+    Выводит сводку по кошелькам: итоги, перцентили, top-N и bottom-N по балансу.
+    Полный список кошельков - в файле экспорта
+    """
+    try:
+        if stats is None or not stats.count:
             logger.info("\nNo wallet statistics available")
+            return
+
+        percentiles = tabulate(
+            [
+                [f"p{q}", f"{balance:.4f} MON", f"{transactions:,.0f}"]
+                for (q, balance), (_, transactions) in zip(
+                    stats.balance_percentiles(), stats.transaction_percentiles()
+                )
+            ],
+            headers=["Percentile", "Balance (MON)", "Total Txs"],
+            tablefmt="double_grid",
+            stralign="center",
+            numalign="center",
+        )
+
+        # Если кошельков не больше 2N, нижняя таблица повторяет верхнюю
+        sections = [f"Top {len(stats.top())} wallets by balance\n{_wallets_table(stats.top())}"]
+        if stats.count > stats.top_n:
+            sections.append(
+                f"Bottom {len(stats.bottom())} wallets by balance\n{_wallets_table(stats.bottom())}"
+            )
+
+        logger.info(
+            f"\n{'='*50}\n"
+            f"         Wallets Statistics ({stats.count} wallets)\n"
+            f"{'='*50}\n"
+            f"{percentiles}\n"
+            + "\n".join(sections)
+            + f"\n{'='*50}"
+        )
+
+        logger.info(f"Average balance: {stats.total_balance / stats.count:.4f} MON")
+        logger.info(f"Average transactions: {stats.total_transactions / stats.count:.1f}")
+        logger.info(f"Total balance: {stats.total_balance:.4f} MON")
+        logger.info(f"Total transactions: {stats.total_transactions:,}")
+        logger.info(f"Empty wallets: {stats.empty:,}")
+        if export_path:
+            logger.info(f"Per-wallet statistics saved to {export_path}")
 
     except Exception as e:
         logger.error(f"Error while printing statistics: {e}")
@@ -0,0 +1,122 @@
+import asyncio
+import itertools
+import json
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from loguru import logger
+
+from src.utils.context import current_account
+
+
+@dataclass
+class Span:
+    span_id: int
+    parent_id: Optional[int]
+    name: str
+    category: str
+    start: float
+    args: Dict[str, Any] = field(default_factory=dict)
+
+
+class Tracer:
+    """
+    Пишет спаны в формате Chrome trace (chrome://tracing, ui.perfetto.dev).
+    Каждое событие - отдельная строка, поэтому файл можно читать и как JSONL.
+    """
+
+    FLUSH_EVERY = 200
+
+    def __init__(self):
+        self.enabled = False
+        self.path = ""
+        self._buffer: List[str] = []
+        self._ids = itertools.count(1)
+        self._pid = os.getpid()
+        self._origin = time.perf_counter()
+
+    def configure(self, path: str) -> None:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Chrome trace допускает массив без закрывающей скобки
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("[\n")
+        self.path = path
+        self.enabled = True
+        logger.info(f"Tracing enabled, spans will be written to {path}")
+
+    def next_id(self) -> int:
+        return next(self._ids)
+
+    def record(self, span: Span, end: float) -> None:
+        account = current_account.get()
+        event = {
+            "name": span.name,
+            "cat": span.category,
+            "ph": "X",
+            "ts": round((span.start - self._origin) * 1_000_000),
+            "dur": round((end - span.start) * 1_000_000),
+            "pid": self._pid,
+            # Отдельная строка в просмотрщике на каждый аккаунт
+            "tid": account if account is not None else 0,
+            "args": {"span_id": span.span_id, "parent_id": span.parent_id, **span.args},
+        }
+        self._buffer.append(json.dumps(event, default=str) + ",\n")
+        if len(self._buffer) >= self.FLUSH_EVERY:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._buffer or not self.path:
+            return
+        try:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.writelines(self._buffer)
+        except Exception as e:
+            logger.error(f"Failed to write trace file {self.path}: {e}")
+        self._buffer.clear()
+
+    def close(self) -> None:
+        self.flush()
+        self.enabled = False
+
+
+TRACER = Tracer()
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+@contextmanager
+def span(name: str, category: str = "task", **args):
+    """Открывает дочерний спан текущего спана. Без включенного трейсинга ничего не делает"""
+    if not TRACER.enabled:
+        yield None
+        return
+
+    parent = _current_span.get()
+    current = Span(
+        span_id=TRACER.next_id(),
+        parent_id=parent.span_id if parent else None,
+        name=name,
+        category=category,
+        start=time.perf_counter(),
+        args=args,
+    )
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.args["error"] = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        _current_span.reset(token)
+        TRACER.record(current, time.perf_counter())
+
+
+async def sleep(seconds: float, reason: str = "sleep") -> None:
+    """asyncio.sleep, который попадает в трейс отдельным спаном"""
+    with span(reason, "sleep", seconds=seconds):
+        await asyncio.sleep(seconds)
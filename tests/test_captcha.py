@@ -0,0 +1,79 @@
+import asyncio
+from types import SimpleNamespace
+
+from src.model.help.captcha import CaptchaSolver, _pollers
+
+
+class FakeSolver(CaptchaSolver):
+    """Решение готово после ready_after опросов, каждый запрос к API идет delay секунд"""
+
+    POLL_INTERVAL = 0.02
+
+    def __init__(self, api_key: str, delay: float = 0.05, ready_after: int = 3):
+        super().__init__(api_key)
+        self.delay = delay
+        self.ready_after = ready_after
+        self.polls = 0
+        self._request = self._fake_request
+
+    async def _fake_request(self, method, url, **kwargs):
+        await asyncio.sleep(self.delay)
+        return SimpleNamespace(content=b"")
+
+    async def create_task(self, sitekey, pageurl, **kwargs):
+        await self._request("POST", "createTask")
+        return f"task-{self.api_key}"
+
+    async def _check_result(self, task_id):
+        await self._request("POST", "getTaskResult")
+        self.polls += 1
+        if self.polls >= self.ready_after:
+            return True, "token"
+        return False, None
+
+
+async def _tick(ticks: list, stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        ticks.append(1)
+        await asyncio.sleep(0.005)
+
+
+def test_pending_solve_does_not_block_event_loop():
+    async def run():
+        solver = FakeSolver("ticker")
+        ticks = []
+        stop = asyncio.Event()
+        ticker = asyncio.create_task(_tick(ticks, stop))
+
+        token = await solver.solve("sitekey", "https://example.com")
+        ticks_during_solve = len(ticks)
+        stop.set()
+        await ticker
+        return token, ticks_during_solve, solver.polls
+
+    token, ticks, polls = asyncio.run(run())
+    assert token == "token"
+    assert polls == 3
+    # Решение занимает ~0.3 с, тикер с шагом 5 мс успевает много раз
+    assert ticks >= 20
+    _pollers.clear()
+
+
+def test_cancelled_solve_is_removed_from_poller():
+    async def run():
+        solver = FakeSolver("cancel", ready_after=10**6)
+        task = asyncio.create_task(solver.solve("sitekey", "https://example.com"))
+        poller = solver._poller()
+
+        while "task-cancel" not in poller._pending:
+            await asyncio.sleep(0.005)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        return poller
+
+    poller = asyncio.run(run())
+    assert "task-cancel" not in poller._pending
+    _pollers.clear()
@@ -0,0 +1,74 @@
+from web3 import AsyncWeb3
+
+from src.model.disperse_one_one.utils import UnusedIndex, WalletInfo, plan_wallet_groups
+
+
+def wallet(name: str, balance_eth: float) -> WalletInfo:
+    balance_wei = AsyncWeb3.to_wei(balance_eth, "ether")
+    return WalletInfo(f"0x{name}", f"key-{name}", balance_wei, balance_eth)
+
+
+def funded(group) -> int:
+    return group.main_wallet.balance_wei + sum(w.balance_wei for w in group.farm_wallets)
+
+
+def test_every_deficit_is_covered_when_farm_is_enough():
+    main = [wallet("m1", 0.1), wallet("m2", 0.5), wallet("m3", 1.0), wallet("m4", 0.0)]
+    farm = [wallet(f"f{i}", 0.3) for i in range(10)]
+
+    groups, underfunded = plan_wallet_groups(main, farm, (1.0, 1.0))
+
+    target = AsyncWeb3.to_wei(1.0, "ether")
+    assert underfunded == 0
+    # m3 уже на цели, остальные в порядке главных кошельков
+    assert [group.main_wallet.address for group in groups] == ["0xm1", "0xm2", "0xm4"]
+    assert all(funded(group) >= target for group in groups)
+    used = [w.address for group in groups for w in group.farm_wallets]
+    assert len(used) == len(set(used))
+
+
+def test_best_fit_takes_smallest_covering_wallet():
+    main = [wallet("m1", 0.6)]
+    farm = [wallet("small", 0.1), wallet("fit", 0.4), wallet("big", 0.9)]
+
+    groups, underfunded = plan_wallet_groups(main, farm, (1.0, 1.0))
+
+    assert underfunded == 0
+    assert [w.address for w in groups[0].farm_wallets] == ["0xfit"]
+
+
+def test_uncovered_deficit_takes_largest_first():
+    main = [wallet("m1", 0.0)]
+    farm = [wallet("a", 0.2), wallet("b", 0.5), wallet("c", 0.4)]
+
+    groups, _ = plan_wallet_groups(main, farm, (0.8, 0.8))
+
+    # 0.8 не закрывается одним: 0.5, затем остаток 0.3 закрывает 0.4
+    assert [w.address for w in groups[0].farm_wallets] == ["0xb", "0xc"]
+
+
+def test_underfunded_count():
+    main = [wallet("m1", 0.0), wallet("m2", 0.0), wallet("m3", 0.0)]
+    farm = [wallet("a", 1.0), wallet("b", 0.3), wallet("c", 0.2)]
+
+    groups, underfunded = plan_wallet_groups(main, farm, (1.0, 1.0))
+
+    # Первый главный получает 1.0, второй - остаток 0.5, третьему не остается ничего
+    assert len(groups) == 2
+    assert underfunded == 1
+    assert sorted(funded(group) for group in groups) == [
+        AsyncWeb3.to_wei(0.5, "ether"),
+        AsyncWeb3.to_wei(1.0, "ether"),
+    ]
+
+
+def test_unused_index_skips_taken_positions():
+    unused = UnusedIndex(5)
+    for index in (1, 2, 4):
+        unused.take(index)
+    assert unused.next(1) == 3
+    assert unused.next(4) == 5
+    assert unused.prev(2) == 0
+    assert unused.prev(4) == 3
+    unused.take(0)
+    assert unused.prev(2) == -1
@@ -0,0 +1,132 @@
+import pytest
+
+from src.model.disperse_from_one.multisend import (
+    _OPCODES,
+    INIT_CODE,
+    MAX_AMOUNT,
+    RUNTIME_CODE,
+    assemble,
+    pack_recipients,
+)
+
+
+CALLER = 0xCA11E5
+FIRST = "0x1111111111111111111111111111111111111111"
+SECOND = "0x2222222222222222222222222222222222222222"
+NAMES = {code: name for name, code in _OPCODES.items()}
+
+
+def execute(code: bytes, calldata: bytes = b"", balance: int = 0, failing=()):
+    """
+    Минимальный интерпретатор опкодов из _OPCODES. CALL на адрес из failing
+    возвращает 0. Результат - (STOP/RETURN/REVERT, вызовы (адрес, value), вывод).
+    """
+    stack, memory, calls = [], bytearray(), []
+    pc = 0
+    while pc < len(code):
+        op = code[pc]
+        pc += 1
+        if 0x60 <= op <= 0x7F:
+            size = op - 0x5F
+            stack.append(int.from_bytes(code[pc : pc + size], "big"))
+            pc += size
+            continue
+
+        name = NAMES[op]
+        if name in ("STOP", "REVERT"):
+            return name, calls, b""
+        if name == "RETURN":
+            offset, size = stack.pop(), stack.pop()
+            return name, calls, bytes(memory[offset : offset + size])
+        if name == "ADD":
+            stack.append((stack.pop() + stack.pop()) % (1 << 256))
+        elif name == "GT":
+            a, b = stack.pop(), stack.pop()
+            stack.append(int(a > b))
+        elif name == "ISZERO":
+            stack.append(int(stack.pop() == 0))
+        elif name == "AND":
+            stack.append(stack.pop() & stack.pop())
+        elif name == "SHR":
+            shift, value = stack.pop(), stack.pop()
+            stack.append(value >> shift)
+        elif name == "CALLER":
+            stack.append(CALLER)
+        elif name == "CALLDATALOAD":
+            offset = stack.pop()
+            stack.append(int.from_bytes(calldata[offset : offset + 32].ljust(32, b"\0"), "big"))
+        elif name == "CALLDATASIZE":
+            stack.append(len(calldata))
+        elif name == "CODECOPY":
+            destination, offset, size = stack.pop(), stack.pop(), stack.pop()
+            memory.extend(b"\0" * max(destination + size - len(memory), 0))
+            memory[destination : destination + size] = code[offset : offset + size]
+        elif name == "SELFBALANCE":
+            stack.append(balance)
+        elif name == "POP":
+            stack.pop()
+        elif name in ("JUMP", "JUMPI"):
+            destination = stack.pop()
+            if name == "JUMP" or stack.pop():
+                assert code[destination] == _OPCODES["JUMPDEST"]
+                pc = destination
+        elif name == "GAS":
+            stack.append(10**9)
+        elif name == "JUMPDEST":
+            pass
+        elif name.startswith("DUP"):
+            stack.append(stack[-int(name[3:])])
+        elif name == "CALL":
+            _, to, value = stack.pop(), stack.pop(), stack.pop()
+            del stack[-4:]
+            success = value <= balance and to not in failing
+            if success:
+                balance -= value
+                calls.append((to, value))
+            stack.append(int(success))
+    return "STOP", calls, b""
+
+
+def test_assemble_resolves_label_offsets():
+    code = assemble(
+        ["PUSH1", 1, ("push", "end"), "JUMP", ("label", "end"), "JUMPDEST", "STOP"]
+    )
+    # Метка стоит после PUSH1 1 (2 байта), PUSH1 метки (2 байта) и JUMP
+    assert code == bytes([0x60, 1, 0x60, 5, 0x56, 0x5B, 0x00])
+
+
+def test_assemble_pads_wide_push_arguments():
+    assert assemble(["PUSH12", 1]) == bytes([0x6B]) + (1).to_bytes(12, "big")
+
+
+def test_init_code_returns_runtime_code():
+    result, _, output = execute(INIT_CODE)
+    assert result == "RETURN"
+    assert output == RUNTIME_CODE
+    assert INIT_CODE[11:] == RUNTIME_CODE
+
+
+def test_multisend_pays_recipients_and_refunds_rest():
+    calldata = pack_recipients([(FIRST, 5), (SECOND, MAX_AMOUNT)])
+    result, calls, _ = execute(RUNTIME_CODE, calldata, balance=MAX_AMOUNT + 100)
+    assert result == "STOP"
+    assert calls == [(int(FIRST, 16), 5), (int(SECOND, 16), MAX_AMOUNT), (CALLER, 95)]
+
+
+def test_multisend_reverts_when_a_call_fails():
+    calldata = pack_recipients([(FIRST, 5), (SECOND, 7)])
+    result, _, _ = execute(RUNTIME_CODE, calldata, balance=100, failing={int(SECOND, 16)})
+    assert result == "REVERT"
+
+
+def test_pack_recipients_word_layout():
+    word = pack_recipients([(SECOND, MAX_AMOUNT)])
+    value = int.from_bytes(word, "big")
+    assert len(word) == 32
+    assert value >> 96 == int(SECOND, 16)
+    assert value & MAX_AMOUNT == MAX_AMOUNT
+
+
+def test_pack_recipients_rejects_uint96_overflow():
+    with pytest.raises(ValueError):
+        pack_recipients([(FIRST, MAX_AMOUNT + 1)])
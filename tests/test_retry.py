@@ -0,0 +1,28 @@
+from types import SimpleNamespace
+
+from src.utils.retry import ErrorClass, classify_error
+
+
+class HTTPStatusError(Exception):
+    def __init__(self, message: str, status_code: int):
+        super().__init__(message)
+        self.response = SimpleNamespace(status_code=status_code)
+
+
+def test_rate_limit_by_http_status():
+    assert classify_error("429 Client Error: Too Many Requests for url") == ErrorClass.RATE_LIMIT
+    assert classify_error("Status code: 429") == ErrorClass.RATE_LIMIT
+    assert classify_error("HTTP 429") == ErrorClass.RATE_LIMIT
+    assert classify_error(HTTPStatusError("request failed", 429)) == ErrorClass.RATE_LIMIT
+
+
+def test_429_inside_hash_or_address_is_not_rate_limit():
+    assert (
+        classify_error("Transaction 0xab429f00c1 reverted") == ErrorClass.TRANSIENT
+    )
+    assert (
+        classify_error("execution reverted, to 0x0000429000000000000000000000000000000000")
+        == ErrorClass.TRANSIENT
+    )
+    assert classify_error("nonce 14290 is not ready") == ErrorClass.TRANSIENT
+    assert classify_error(HTTPStatusError("request failed", 500)) == ErrorClass.TRANSIENT
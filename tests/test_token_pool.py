@@ -0,0 +1,53 @@
+import asyncio
+
+from src.model.monad_xyz.token_pool import TurnstileTokenPool
+from src.utils.circuit_breaker import CircuitBreaker
+
+
+class FakeTurnstileSolver:
+    def __init__(self):
+        self.solved = 0
+
+    async def solve_turnstile(self, sitekey, pageurl, invisible):
+        self.solved += 1
+        await asyncio.sleep(0.01)
+        return f"token-{self.solved}"
+
+
+def _pool(size: int) -> TurnstileTokenPool:
+    pool = TurnstileTokenPool(FakeTurnstileSolver(), size, ttl=60)
+    pool.breaker = CircuitBreaker("test faucet", failure_threshold=1, recovery_timeout=60)
+    return pool
+
+
+def test_presolve_is_capped_by_pending_accounts():
+    async def run():
+        pool = _pool(size=5)
+        pool.pending = 2
+        tokens = []
+        for _ in range(2):
+            pool.account_started()
+            tokens.append(await pool.get())
+        await asyncio.sleep(0.05)
+        await pool.close()
+        return tokens, pool.solver.solved
+
+    tokens, solved = asyncio.run(run())
+    assert all(tokens)
+    # Два аккаунта - два токена, без запаса до size
+    assert solved == 2
+
+
+def test_no_presolve_while_breaker_is_open():
+    async def run():
+        pool = _pool(size=5)
+        pool.breaker.record_failure()
+        token = await pool.get()
+        await asyncio.sleep(0.05)
+        await pool.close()
+        return token, pool.solver.solved
+
+    token, solved = asyncio.run(run())
+    # Решается только токен для ожидающего
+    assert token
+    assert solved == 1